@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class ProjectConfig(AppConfig):
+    name = "config"
+
+    def ready(self):
+        """Регистрирует системные проверки проекта."""
+        import config.checks  # noqa: F401
@@ -0,0 +1,34 @@
+"""
+Системные проверки проекта (python manage.py check --deploy).
+"""
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Проверяет, что кэш по умолчанию общий для всех процессов.
+
+    В кэше хранятся снимок трекера, отметки о его устаревании и ведра
+    токенов ограничения частоты запросов. С LocMemCache у каждого процесса
+    свой кэш: изменения, сделанные в одном воркере, не обновляют снимок
+    другого, а каждый воркер ограничивает клиента отдельно.
+    """
+    if not isinstance(caches["default"], LocMemCache):
+        return []
+    return [
+        Warning(
+            (
+                "Кэш по умолчанию LocMemCache не общий для процессов: "
+                "снимок трекера и ограничение частоты запросов ведутся "
+                "в каждом процессе отдельно."
+            ),
+            hint=(
+                "При нескольких воркерах укажите общий кэш: CACHE_BACKEND="
+                "django.core.cache.backends.redis.RedisCache и CACHE_LOCATION."
+            ),
+            id="config.W001",
+        )
+    ]
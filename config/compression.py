@@ -0,0 +1,225 @@
+"""
+Сжатие ответов gzip и Brotli.
+
+Кодировка выбирается по заголовку Accept-Encoding с учетом весов q:
+из Brotli (если он установлен) и gzip берется кодировка с наибольшим
+весом, при равных весах - Brotli. gzip выполняет GZipMiddleware Django,
+в том числе со случайными байтами в заголовке gzip против атаки BREACH.
+Ответы меньше COMPRESSION_MIN_SIZE байт не сжимаются, потоковые ответы
+сжимаются по частям. Степень сжатия и затраченное процессорное время
+попадают в заголовок Server-Timing и в журнал config.compression.
+"""
+
+import logging
+import secrets
+import time
+import zlib
+from gzip import GzipFile
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.text import StreamingBuffer
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+def parse_accept_encoding(header):
+    """Возвращает веса кодировок, которые клиент готов принять.
+
+    Аргументы:
+        header (str): Значение заголовка Accept-Encoding.
+
+    Возвращает:
+        dict: Вес q каждой названной кодировки (без веса - 1.0).
+    """
+    weights = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        weight = 1.0
+        if params.strip().startswith("q="):
+            try:
+                weight = float(params.strip()[2:])
+            except ValueError:
+                weight = 0.0
+        if name.strip():
+            weights[name.strip().lower()] = weight
+    return weights
+
+
+def choose_encoding(request, allow_brotli=True):
+    """Выбирает кодировку ответа с наибольшим весом.
+
+    Аргументы:
+        request (HttpRequest): Входящий запрос.
+        allow_brotli (bool): Можно ли сжимать ответ Brotli.
+
+    Возвращает:
+        str: "br", "gzip" или None, если клиент не принимает ни одну.
+    """
+    weights = parse_accept_encoding(request.headers.get("Accept-Encoding", ""))
+    default = weights.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli is not None and allow_brotli else ["gzip"]
+    # max() берет первую кодировку с наибольшим весом, Brotli идет первым.
+    encoding = max(candidates, key=lambda name: weights.get(name, default))
+    return encoding if weights.get(encoding, default) > 0 else None
+
+
+def add_server_timing(response, metric):
+    """Добавляет метрику в заголовок Server-Timing, сохраняя прежние."""
+    existing = response.get("Server-Timing")
+    response.headers["Server-Timing"] = f"{existing}, {metric}" if existing else metric
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Сжимает ответы Brotli или gzip в зависимости от Accept-Encoding.
+
+    Тела ответов gzip сжимает родительский GZipMiddleware, Brotli -
+    brotli.Compressor. Синхронные потоки (например, text/event-stream)
+    сжимаются со сбросом после каждой части: compress_sequence Django
+    копит данные в буфере компрессора. Асинхронные потоковые ответы
+    сжимаются только gzip, родительский класс сжимает каждую часть
+    отдельным членом gzip.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding") or request.method == "HEAD":
+            return response
+        if not response.streaming and len(response.content) < (
+            settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+        is_async = getattr(response, "is_async", False)
+        encoding = choose_encoding(request, allow_brotli=not is_async)
+        if encoding is None:
+            patch_vary_headers(response, ("Accept-Encoding",))
+            return response
+        if is_async:
+            return super().process_response(request, response)
+        if response.streaming:
+            return self.compress_stream(request, response, encoding)
+        original = len(response.content)
+        started = time.thread_time()
+        if encoding == "gzip":
+            response = super().process_response(request, response)
+            if not response.has_header("Content-Encoding"):
+                return response
+        else:
+            content = brotli.compress(
+                response.content, quality=settings.COMPRESSION_BROTLI_QUALITY
+            )
+            if len(content) >= original:
+                patch_vary_headers(response, ("Accept-Encoding",))
+                return response
+            response.content = content
+            response.headers["Content-Length"] = str(len(content))
+            self.mark_encoded(response, encoding)
+        cpu_time = time.thread_time() - started
+        compressed = len(response.content)
+        self.report(request.path, encoding, original, compressed, cpu_time)
+        add_server_timing(
+            response,
+            f'compress;dur={cpu_time * 1000:.2f};desc="{encoding} '
+            f'{original}/{compressed}"',
+        )
+        return response
+
+    def compress_stream(self, request, response, encoding):
+        """Сжимает синхронный потоковый ответ по частям.
+
+        После каждой части данные сбрасываются, чтобы клиент получал их
+        без задержки. Статистика пишется в журнал по окончании потока,
+        время получения исходных частей в процессорное время не входит.
+        """
+        meter = {"original": 0, "source_time": 0.0}
+        response.streaming_content = self.read_stream(response.streaming_content, meter)
+        compress = self.gzip_stream if encoding == "gzip" else self.brotli_stream
+        response.streaming_content = compress(response.streaming_content)
+        if response.has_header("Content-Length"):
+            del response.headers["Content-Length"]
+        self.mark_encoded(response, encoding)
+        response.streaming_content = self.measure_stream(
+            request.path, encoding, response.streaming_content, meter
+        )
+        return response
+
+    @staticmethod
+    def mark_encoded(response, encoding):
+        """Проставляет заголовки сжатого ответа так же, как GZipMiddleware."""
+        patch_vary_headers(response, ("Accept-Encoding",))
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            # Сжатое представление не совпадает побайтно с исходным.
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+
+    def gzip_stream(self, chunks):
+        """Сжимает части потока gzip со сбросом после каждой части.
+
+        Как и GZipMiddleware, добавляет в заголовок gzip имя файла
+        случайной длины (защита от BREACH).
+        """
+        buffer = StreamingBuffer()
+        filename = b"a" * secrets.randbelow(self.max_random_bytes)
+        with GzipFile(
+            filename=filename, mode="wb", compresslevel=6, fileobj=buffer, mtime=0
+        ) as compressor:
+            for chunk in chunks:
+                compressor.write(chunk)
+                compressor.flush(zlib.Z_SYNC_FLUSH)
+                yield buffer.read()
+        yield buffer.read()
+
+    @staticmethod
+    def brotli_stream(chunks):
+        """Сжимает части потока Brotli со сбросом после каждой части."""
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+
+    @staticmethod
+    def read_stream(chunks, meter):
+        """Передает исходные части, считая их размер и время получения."""
+        iterator = iter(chunks)
+        while True:
+            started = time.thread_time()
+            chunk = next(iterator, None)
+            meter["source_time"] += time.thread_time() - started
+            if chunk is None:
+                return
+            meter["original"] += len(chunk)
+            yield chunk
+
+    def measure_stream(self, path, encoding, chunks, meter):
+        """Передает сжатые части и пишет статистику по окончании потока."""
+        iterator = iter(chunks)
+        compressed, cpu_time = 0, 0.0
+        while True:
+            started = time.thread_time()
+            data = next(iterator, None)
+            cpu_time += time.thread_time() - started
+            if data is None:
+                break
+            compressed += len(data)
+            yield data
+        cpu_time -= meter["source_time"]
+        self.report(path, encoding, meter["original"], compressed, cpu_time)
+
+    @staticmethod
+    def report(path, encoding, original, compressed, cpu_time):
+        """Записывает в журнал степень сжатия и процессорное время."""
+        logger.info(
+            "%s %s: %d -> %d bytes (ratio %.2f), cpu %.2f ms",
+            path,
+            encoding,
+            original,
+            compressed,
+            original / compressed if compressed else 0,
+            cpu_time * 1000,
+        )
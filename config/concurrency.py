@@ -0,0 +1,255 @@
+"""
+Оптимистичная блокировка для представлений редактирования.
+
+Модель должна иметь поле version. Запись выполняется одним запросом
+UPDATE ... WHERE pk = %s AND version = %s, поэтому параллельные изменения
+одной записи не затирают друг друга, а проигравший получает ответ 412.
+Та же версия служит ETag для условных GET и HEAD запросов.
+
+Версию проверяют только запросы к API через OptimisticUpdateMixin.
+Model.save() (админка, команды, код на ORM) увеличивает версию без
+проверки, такие сохранения по-прежнему перезаписывают запись целиком.
+"""
+
+from django.db import connections, router
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound, ParseError
+from rest_framework.response import Response
+
+from config.object_cache import get_record, set_record
+
+
+class PreconditionFailed(APIException):
+    """Версия записи не совпадает с версией, переданной клиентом."""
+
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "Запись была изменена другим запросом."
+    default_code = "precondition_failed"
+
+
+class IfNull:
+    """Значение поля, которое записывается, только если поле в записи пустое.
+
+    Позволяет не читать запись перед условным обновлением, например,
+    чтобы не затереть уже отмеченное время завершения.
+
+    Атрибуты:
+        value: Записываемое значение.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+
+def make_etag(version):
+    """Возвращает ETag для версии записи."""
+    return f'"{version}"'
+
+
+def parse_if_match(request):
+    """Возвращает версию из заголовка If-Match.
+
+    Заголовок без номера версии дает ответ 400: 412 означает, что условие
+    проверено и не выполнено. Список из нескольких версий тоже дает 400:
+    условный UPDATE проверяет одну версию, а проверка только первой из
+    них нарушала бы смысл заголовка (RFC 9110, 13.1.1).
+
+    Аргументы:
+        request (Request): Входящий запрос.
+
+    Возвращает:
+        int | None: Версия записи или None, если заголовок не передан или равен "*".
+    """
+    header = request.headers.get("If-Match", "").strip()
+    if not header:
+        return None
+    tags = parse_etags(header)
+    if tags == ["*"]:
+        return None
+    if len(tags) > 1:
+        raise ParseError("Заголовок If-Match должен содержать одну версию.")
+    value = tags[0].removeprefix("W/").strip('"') if tags else ""
+    try:
+        return int(value)
+    except ValueError:
+        raise ParseError("Некорректный заголовок If-Match.")
+
+
+def _update_returning(model, pk, version, values, connection):
+    """Выполняет условный UPDATE ... RETURNING и собирает экземпляр модели."""
+    meta = model._meta
+    qn = connection.ops.quote_name
+    assignments, params = [], []
+    for name, value in values.items():
+        field = meta.get_field(name)
+        column = qn(field.column)
+        if isinstance(value, IfNull):
+            assignments.append(f"{column} = COALESCE({column}, %s)")
+            value = value.value
+        else:
+            assignments.append(f"{column} = %s")
+        if hasattr(value, "prepare_database_save"):
+            value = value.prepare_database_save(field)
+        params.append(field.get_db_prep_save(value, connection))
+    version_column = qn(meta.get_field("version").column)
+    assignments.append(f"{version_column} = {version_column} + 1")
+    fields = meta.concrete_fields
+    sql = (
+        f"UPDATE {qn(meta.db_table)} SET {', '.join(assignments)} "
+        f"WHERE {qn(meta.pk.column)} = %s AND {version_column} = %s "
+        f"RETURNING {', '.join(qn(field.column) for field in fields)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + [pk, version])
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    converted = []
+    for field, value in zip(fields, row):
+        column = field.get_col(meta.db_table)
+        converters = connection.ops.get_db_converters(column)
+        converters += field.get_db_converters(connection)
+        for converter in converters:
+            value = converter(value, column, connection)
+        converted.append(value)
+    return model.from_db(
+        connection.alias, [field.attname for field in fields], converted
+    )
+
+
+def conditional_update(model, pk, version, values):
+    """Обновляет запись, только если ее версия равна ожидаемой.
+
+    На PostgreSQL и SQLite обновление и получение новой версии записи
+    выполняются одним запросом UPDATE ... RETURNING. После записи
+    отправляется сигнал post_save, чтобы обработчики приложений узнали
+    об изменении.
+
+    Аргументы:
+        model (Model): Класс модели с полем version.
+        pk (int): Идентификатор записи.
+        version (int): Ожидаемая версия записи.
+        values (dict): Новые значения полей.
+
+    Возвращает:
+        Model | None: Обновленный экземпляр или None, если версия не совпала
+        или записи не существует.
+    """
+    using = router.db_for_write(model)
+    connection = connections[using]
+    if connection.vendor in ("postgresql", "sqlite"):
+        instance = _update_returning(model, pk, version, values, connection)
+    else:
+        manager = model._default_manager.db_manager(using)
+        values = {
+            name: (
+                Coalesce(F(name), Value(value.value, model._meta.get_field(name)))
+                if isinstance(value, IfNull)
+                else value
+            )
+            for name, value in values.items()
+        }
+        updated = manager.filter(pk=pk, version=version).update(
+            **values, version=version + 1
+        )
+        instance = manager.get(pk=pk) if updated else None
+    if instance is not None:
+        post_save.send(
+            sender=model,
+            instance=instance,
+            created=False,
+            update_fields=frozenset(values),
+            raw=False,
+            using=using,
+        )
+    return instance
+
+
+class OptimisticUpdateMixin:
+    """Примесь для UpdateAPIView с оптимистичной блокировкой.
+
+    Если клиент передал версию в заголовке If-Match, запись обновляется без
+    предварительного чтения: сериализатор проверяет данные на заготовке
+    экземпляра с одним лишь идентификатором. Без заголовка запись читается
+    как обычно, а ее текущая версия используется в условии UPDATE.
+    При несовпадении версии возвращается 412, успешный ответ содержит ETag
+    новой версии. Значения, которые модель вычисляет сама (например, время
+    смены статуса), представление добавляет в get_update_values: Model.save()
+    при условном обновлении не вызывается.
+    """
+
+    def get_update_values(self, validated_data):
+        """Возвращает значения полей для условного UPDATE.
+
+        Аргументы:
+            validated_data (dict): Проверенные данные сериализатора.
+
+        Возвращает:
+            dict: Значения полей, в том числе IfNull.
+        """
+        return dict(validated_data)
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop("partial", False)
+        model = self.get_queryset().model
+        version = parse_if_match(request)
+        if version is None:
+            instance = self.get_object()
+            version = instance.version
+        else:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            instance = model(pk=self.kwargs[lookup_url_kwarg], version=version)
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        values = self.get_update_values(serializer.validated_data)
+        updated = conditional_update(model, instance.pk, version, values)
+        if updated is None:
+            if not self.get_queryset().filter(pk=instance.pk).exists():
+                raise NotFound()
+            raise PreconditionFailed()
+        return Response(
+            self.get_serializer(updated).data,
+            headers={"ETag": make_etag(updated.version)},
+        )
+
+
+class ConditionalRetrieveMixin:
+    """Примесь для RetrieveAPIView с условными GET и HEAD запросами.
+
+    Сначала по идентификатору читается только версия записи (покрывающий
+    индекс id + version). Если она совпадает с If-None-Match, возвращается
+    304 без загрузки и сериализации записи. HEAD запрос отвечает только
+    заголовком ETag. Сериализованная запись берется из кэша по версии,
+    общего с пакетным получением (config.object_cache).
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        version = (
+            self.get_queryset()
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .values_list("version", flat=True)
+            .first()
+        )
+        if version is None:
+            raise NotFound()
+        etag = make_etag(version)
+        # Слабое сравнение: сжатые ответы отдаются со слабым ETag.
+        if_none_match = {
+            tag.removeprefix("W/")
+            for tag in parse_etags(request.headers.get("If-None-Match", ""))
+        }
+        if etag in if_none_match or "*" in if_none_match:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        if request.method == "HEAD":
+            return Response(headers={"ETag": etag})
+        model = self.get_queryset().model
+        data = get_record(model, self.kwargs[lookup_url_kwarg], version)
+        if data is None:
+            data = self.get_serializer(self.get_object()).data
+            set_record(model, data)
+        return Response(data, headers={"ETag": make_etag(data["version"])})
@@ -0,0 +1,133 @@
+"""
+Маршрутизация чтения на реплики базы данных.
+
+Реплики перечисляются в DATABASE_REPLICAS. Чтение уходит на реплику только
+внутри представлений с ReplicaReadMixin (списки, просмотр, аналитика),
+остальные запросы, включая чтение перед записью, выполняются на основной
+базе. После успешного изменяющего запроса клиент на REPLICA_PIN_SECONDS
+секунд закрепляется за основной базой, чтобы сразу видеть свои изменения
+несмотря на отставание реплик. Представления, которые принимают POST
+только для чтения (пакетное получение), задают pins_primary = False и
+клиента не закрепляют.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+_replica_reads = ContextVar("replica_reads", default=False)
+
+PIN_KEY = "db:primary_pin:{}"
+
+
+@contextmanager
+def replica_reads():
+    """Направляет чтение внутри блока на реплики."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def client_key(request):
+    """Возвращает ключ клиента для закрепления за основной базой.
+
+    Аргументы:
+        request (HttpRequest): Входящий запрос.
+
+    Возвращает:
+        str: Идентификатор пользователя или IP-адрес анонимного клиента.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def pin_primary(request):
+    """Закрепляет чтение клиента за основной базой на REPLICA_PIN_SECONDS."""
+    cache.set(PIN_KEY.format(client_key(request)), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(request):
+    """Проверяет, закреплен ли клиент за основной базой."""
+    return cache.get(PIN_KEY.format(client_key(request)), False)
+
+
+class ReplicaRouter:
+    """Маршрутизатор, отправляющий чтение на случайную реплику.
+
+    Запись, миграции и чтение вне replica_reads() выполняются на основной
+    базе. Без настроенных реплик маршрутизатор ни на что не влияет.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if replicas and _replica_reads.get():
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+def pins_primary(request):
+    """Проверяет, закрепляет ли представление запроса клиента за основной базой."""
+    match = getattr(request, "resolver_match", None)
+    view_class = getattr(match and match.func, "view_class", None)
+    return getattr(view_class, "pins_primary", True)
+
+
+class ReadYourWritesMiddleware:
+    """Закрепляет клиента за основной базой после изменяющего запроса.
+
+    Запросы к представлениям с атрибутом pins_primary = False клиента не
+    закрепляют, даже если это POST.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method not in ("GET", "HEAD", "OPTIONS")
+            and response.status_code < 400
+            and pins_primary(request)
+        ):
+            pin_primary(request)
+        return response
+
+
+class ReplicaReadMixin:
+    """Примесь для представлений DRF, читающих данные с реплик.
+
+    Проверка закрепления выполняется после аутентификации, поэтому
+    учитывает пользователя, определенного по токену.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if settings.DATABASE_REPLICAS and not is_pinned(request):
+            self._replica_token = _replica_reads.set(True)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            token = self.__dict__.pop("_replica_token", None)
+            if token is not None:
+                _replica_reads.reset(token)
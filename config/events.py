@@ -0,0 +1,273 @@
+"""
+Публикация событий изменений и их доставка клиентам по Server-Sent Events.
+
+События публикуются в брокер EVENTS_BROKER. LocalBroker раздает их
+подписчикам своего процесса, RedisBroker пересылает их через канал
+Redis подписчикам всех процессов. У каждого подписчика своя очередь на
+EVENTS_QUEUE_SIZE событий и свой фильтр: медленный клиент не задерживает
+публикацию, а при переполнении очереди старые события отбрасываются и
+клиент получает событие overflow, после которого должен перечитать
+данные. Поток событий работает и под WSGI (синхронный генератор), и
+под ASGI (асинхронный генератор без отдельного потока на клиента).
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils.module_loading import import_string
+from rest_framework.renderers import BaseRenderer
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+class Subscription:
+    """Подписка на события с ограниченной очередью.
+
+    Атрибуты:
+        match (callable): Фильтр событий, None - все события.
+        maxsize (int): Наибольшее количество событий в очереди.
+    """
+
+    def __init__(self, broker, match=None, maxsize=None):
+        self.match = match
+        self.maxsize = maxsize or settings.EVENTS_QUEUE_SIZE
+        self._broker = broker
+        self._events = deque()
+        self._dropped = 0
+        self._condition = threading.Condition()
+        self._loop = None
+        self._ready = None
+
+    def put(self, event):
+        """Кладет событие в очередь, если оно проходит фильтр.
+
+        При переполнении очереди отбрасывается самое старое событие.
+        """
+        if self.match is not None and not self.match(event):
+            return
+        with self._condition:
+            if len(self._events) >= self.maxsize:
+                self._events.popleft()
+                self._dropped += 1
+            self._events.append(event)
+            self._condition.notify()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._ready.set)
+
+    def get(self, timeout):
+        """Ждет события не дольше timeout секунд.
+
+        Возвращает:
+            tuple: Список накопленных событий и количество отброшенных
+            с прошлого вызова.
+        """
+        with self._condition:
+            if not self._events:
+                self._condition.wait(timeout)
+            return self._drain()
+
+    async def aget(self, timeout):
+        """Асинхронный вариант get без блокировки цикла событий."""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._ready = asyncio.Event()
+        with self._condition:
+            if self._events:
+                return self._drain()
+            self._ready.clear()
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        with self._condition:
+            return self._drain()
+
+    def close(self):
+        """Отписывается от брокера."""
+        self._broker.unsubscribe(self)
+
+    def _drain(self):
+        """Забирает события из очереди, блокировка уже захвачена."""
+        events, dropped = list(self._events), self._dropped
+        self._events.clear()
+        self._dropped = 0
+        return events, dropped
+
+
+class LocalBroker:
+    """Брокер событий в памяти процесса."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    @property
+    def active(self):
+        """Проверяет, есть ли кому доставлять события."""
+        return bool(self._subscribers)
+
+    def subscribe(self, match=None, maxsize=None):
+        """Создает подписку с фильтром match."""
+        subscription = Subscription(self, match, maxsize)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event):
+        """Публикует событие, словарь с ключом type."""
+        self.deliver(event)
+
+    def deliver(self, event):
+        """Раздает событие подписчикам процесса."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(event)
+
+
+class RedisBroker(LocalBroker):
+    """Брокер событий через канал Redis EVENTS_REDIS_CHANNEL.
+
+    События публикуются в канал, фоновый поток процесса слушает канал и
+    раздает события подписчикам процесса. Требует пакет redis.
+    """
+
+    def __init__(self):
+        super().__init__()
+        try:
+            import redis
+        except ImportError as error:
+            raise ImproperlyConfigured(
+                "Для RedisBroker установите пакет redis."
+            ) from error
+        self._redis = redis.Redis.from_url(settings.EVENTS_REDIS_URL)
+        self._listener = None
+
+    @property
+    def active(self):
+        # Подписчики могут быть в других процессах.
+        return True
+
+    def subscribe(self, match=None, maxsize=None):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, daemon=True)
+                self._listener.start()
+        return super().subscribe(match, maxsize)
+
+    def publish(self, event):
+        self._redis.publish(
+            settings.EVENTS_REDIS_CHANNEL, json.dumps(event, cls=DjangoJSONEncoder)
+        )
+
+    def _listen(self):
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(settings.EVENTS_REDIS_CHANNEL)
+        for message in pubsub.listen():
+            self.deliver(json.loads(message["data"]))
+
+
+def get_broker():
+    """Возвращает брокер событий EVENTS_BROKER процесса."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.EVENTS_BROKER)()
+    return _broker
+
+
+def format_event(event_type, data):
+    """Возвращает событие в формате text/event-stream."""
+    payload = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return f"event: {event_type}\ndata: {payload}\n\n".encode()
+
+
+def _stream_chunks(events, dropped):
+    """Возвращает части потока для пачки событий."""
+    chunks = []
+    if dropped:
+        chunks.append(format_event("overflow", {"dropped": dropped}))
+    chunks.extend(format_event(event["type"], event) for event in events)
+    return chunks
+
+
+def event_stream(match):
+    """Синхронный поток событий для WSGI.
+
+    Поток закрывается через EVENTS_STREAM_SECONDS, браузер переподключается
+    сам через указанный в начале потока интервал retry. Пока событий нет,
+    раз в EVENTS_HEARTBEAT_SECONDS отправляется комментарий, чтобы
+    прокси не закрывали соединение.
+    """
+    subscription = get_broker().subscribe(match)
+    try:
+        yield b"retry: 3000\n\n"
+        deadline = time.monotonic() + settings.EVENTS_STREAM_SECONDS
+        while time.monotonic() < deadline:
+            events, dropped = subscription.get(settings.EVENTS_HEARTBEAT_SECONDS)
+            chunks = _stream_chunks(events, dropped)
+            yield b"".join(chunks) if chunks else b": heartbeat\n\n"
+    finally:
+        subscription.close()
+
+
+async def aevent_stream(match):
+    """Асинхронный поток событий для ASGI, аналог event_stream."""
+    subscription = get_broker().subscribe(match)
+    try:
+        yield b"retry: 3000\n\n"
+        deadline = time.monotonic() + settings.EVENTS_STREAM_SECONDS
+        while time.monotonic() < deadline:
+            events, dropped = await subscription.aget(settings.EVENTS_HEARTBEAT_SECONDS)
+            chunks = _stream_chunks(events, dropped)
+            yield b"".join(chunks) if chunks else b": heartbeat\n\n"
+    finally:
+        subscription.close()
+
+
+def event_stream_response(request, match=None):
+    """Возвращает потоковый ответ с событиями, прошедшими фильтр match.
+
+    Аргументы:
+        request (HttpRequest): Входящий запрос, по нему выбирается
+            синхронный или асинхронный поток.
+        match (callable): Фильтр событий.
+
+    Возвращает:
+        StreamingHttpResponse: Ответ text/event-stream.
+    """
+    stream = aevent_stream if isinstance(request, ASGIRequest) else event_stream
+    return StreamingHttpResponse(
+        stream(match),
+        content_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Рендерер для запросов с Accept: text/event-stream (EventSource).
+
+    Сам поток отдается StreamingHttpResponse, рендерер нужен для
+    согласования формата и ответов с ошибками.
+    """
+
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
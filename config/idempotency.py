@@ -0,0 +1,131 @@
+"""
+Идемпотентные изменяющие запросы по заголовку Idempotency-Key.
+
+Результат первого запроса с ключом сохраняется в кэше на IDEMPOTENCY_TTL
+секунд. Повтор с тем же ключом и тем же телом получает сохраненный ответ
+без выполнения представления и обращения к базе данных. Ключи действуют
+в пределах клиента (пользователя или IP-адреса) и адреса запроса.
+Отпечаток запроса включает заголовок If-Match: повтор с другой ожидаемой
+версией считается другим запросом.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from config.db_router import client_key
+
+IN_PROGRESS = "in_progress"
+REPLAYED_HEADERS = ("ETag", "Location")
+
+
+class IdempotencyConflict(APIException):
+    """Запрос с тем же ключом еще выполняется."""
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Запрос с этим Idempotency-Key еще выполняется."
+    default_code = "idempotency_conflict"
+
+
+class IdempotencyKeyReused(APIException):
+    """Ключ уже использован для запроса с другим телом."""
+
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = "Idempotency-Key уже использован с другими данными."
+    default_code = "idempotency_key_reused"
+
+
+class IdempotentReplay(Exception):
+    """Сохраненный ответ на повтор запроса."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+def request_fingerprint(request):
+    """Возвращает отпечаток метода, заголовка If-Match и тела запроса."""
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    if_match = request.headers.get("If-Match", "")
+    value = f"{request.method}:{if_match}:{body}"
+    return hashlib.sha256(value.encode()).hexdigest()[:32]
+
+
+class IdempotencyMixin:
+    """Примесь для представлений DRF с поддержкой Idempotency-Key.
+
+    Ключ проверяется после аутентификации и ограничения частоты. Пока
+    первый запрос выполняется, повтор получает 409, повтор с другим телом
+    получает 422. Ответы с кодом 5xx не сохраняются, а при необработанном
+    исключении блокировка снимается, чтобы запрос можно было повторить.
+    """
+
+    cache_format = "idempotency:{}"
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        key = request.headers.get("Idempotency-Key")
+        if not key or request.method in ("GET", "HEAD", "OPTIONS"):
+            return
+        scope = f"{client_key(request)}:{request.path}:{key}"
+        cache_key = self.cache_format.format(hashlib.sha256(scope.encode()).hexdigest())
+        fingerprint = request_fingerprint(request)
+        if cache.add(cache_key, IN_PROGRESS, settings.IDEMPOTENCY_LOCK_TIMEOUT):
+            self._idempotency = (cache_key, fingerprint)
+            return
+        stored = cache.get(cache_key)
+        if stored is None or stored == IN_PROGRESS:
+            raise IdempotencyConflict()
+        stored_fingerprint, status_code, data, headers = stored
+        if stored_fingerprint != fingerprint:
+            raise IdempotencyKeyReused()
+        raise IdempotentReplay(
+            Response(
+                data,
+                status=status_code,
+                headers={**headers, "Idempotent-Replayed": "true"},
+            )
+        )
+
+    def handle_exception(self, exc):
+        if isinstance(exc, IdempotentReplay):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            # Необработанное исключение минует finalize_response.
+            idempotency = self.__dict__.pop("_idempotency", None)
+            if idempotency is not None:
+                cache.delete(idempotency[0])
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        idempotency = self.__dict__.pop("_idempotency", None)
+        if idempotency is not None:
+            cache_key, fingerprint = idempotency
+            if response.status_code >= 500:
+                cache.delete(cache_key)
+            else:
+                headers = {
+                    name: response[name]
+                    for name in REPLAYED_HEADERS
+                    if response.has_header(name)
+                }
+                cache.set(
+                    cache_key,
+                    (
+                        fingerprint,
+                        response.status_code,
+                        getattr(response, "data", None),
+                        headers,
+                    ),
+                    settings.IDEMPOTENCY_TTL,
+                )
+        return super().finalize_response(request, response, *args, **kwargs)
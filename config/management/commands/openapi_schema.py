@@ -0,0 +1,45 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from config.schema import SCHEMA_FILES, generate_schema
+
+
+class Command(BaseCommand):
+    """Собирает схему OpenAPI в файлы OPENAPI_SCHEMA_DIR.
+
+    С флагом --check файлы не перезаписываются, а команда завершается
+    с ошибкой, если сохраненная схема расходится с кодом.
+    """
+
+    help = "Собирает схему OpenAPI для /swagger/ и /redoc/."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Проверить, что сохраненная схема совпадает с кодом.",
+        )
+
+    def handle(self, *args, **options):
+        schema_dir = Path(settings.OPENAPI_SCHEMA_DIR)
+        schema = generate_schema()
+        if options["check"]:
+            stale = [
+                SCHEMA_FILES[schema_format]
+                for schema_format, content in schema.items()
+                if not (schema_dir / SCHEMA_FILES[schema_format]).is_file()
+                or (schema_dir / SCHEMA_FILES[schema_format]).read_bytes() != content
+            ]
+            if stale:
+                raise CommandError(
+                    f"Схема OpenAPI устарела ({', '.join(stale)}), "
+                    f"выполните python manage.py openapi_schema."
+                )
+            self.stdout.write("Схема OpenAPI актуальна.")
+            return
+        schema_dir.mkdir(parents=True, exist_ok=True)
+        for schema_format, content in schema.items():
+            (schema_dir / SCHEMA_FILES[schema_format]).write_bytes(content)
+        self.stdout.write(f"Схема OpenAPI записана в {schema_dir}.")
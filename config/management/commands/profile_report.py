@@ -0,0 +1,77 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from config.profiling import aggregate, function_totals, read_profiles
+
+
+class Command(BaseCommand):
+    """Выводит отчет по профилям запросов.
+
+    Профили группируются по имени маршрута. Для каждого маршрута
+    выводятся количество запросов, средняя длительность и функции с
+    наибольшей долей снимков: собственной (функция выполнялась) и
+    включающей (функция была в стеке). Свернутые стеки можно сохранить
+    в файл для построения flame graph.
+    """
+
+    help = "Отчет по выборочным профилям запросов по маршрутам."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            default=settings.PROFILING_LOG,
+            help="Файл профилей, по умолчанию PROFILING_LOG.",
+        )
+        parser.add_argument(
+            "--url-name",
+            help="Имя маршрута, например task_tracker:tracker.",
+        )
+        parser.add_argument(
+            "--top", type=int, default=15, help="Количество функций в отчете."
+        )
+        parser.add_argument(
+            "--folded",
+            help="Файл для свернутых стеков (flamegraph.pl, speedscope).",
+        )
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Очистить файл профилей после вывода отчета.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["file"])
+        routes = aggregate(read_profiles(path))
+        if options["url_name"]:
+            routes = {
+                name: route
+                for name, route in routes.items()
+                if name == options["url_name"]
+            }
+        folded = []
+        for name, route in sorted(
+            routes.items(), key=lambda item: -item[1]["duration_ms"]
+        ):
+            samples = sum(route["stacks"].values())
+            self.stdout.write(
+                f"\n{name}: запросов {route['requests']}, среднее "
+                f"{route['duration_ms'] / route['requests']:.1f} мс, снимков {samples}"
+            )
+            own, inclusive = function_totals(route["stacks"])
+            for title, totals in (("Собственное", own), ("Включающее", inclusive)):
+                self.stdout.write(f"  {title} время:")
+                for function, count in totals.most_common(options["top"]):
+                    self.stdout.write(f"{count / max(samples, 1):8.1%}  {function}")
+            folded.extend(
+                f"{name};{stack} {count}" for stack, count in route["stacks"].items()
+            )
+        if not routes:
+            self.stdout.write("Профилей нет.")
+        if options["folded"]:
+            Path(options["folded"]).write_text("".join(f"{line}\n" for line in folded))
+            self.stdout.write(f"Свернутые стеки записаны в {options['folded']}")
+        if options["reset"] and path.exists():
+            path.unlink()
+            self.stdout.write("Профили очищены.")
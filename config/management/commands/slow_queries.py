@@ -0,0 +1,68 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from config.slow_queries import aggregate, read_records
+
+
+class Command(BaseCommand):
+    """Выводит отчет по журналу медленных запросов.
+
+    Запросы группируются по отпечатку нормализованного SQL и выводятся
+    по убыванию суммарной длительности с количеством, средней и
+    наибольшей длительностью и представлениями, из которых они
+    выполнялись.
+    """
+
+    help = "Самые дорогие запросы из журнала медленных запросов."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            default=settings.SLOW_QUERY_LOG,
+            help="Файл журнала, по умолчанию SLOW_QUERY_LOG.",
+        )
+        parser.add_argument(
+            "--top", type=int, default=10, help="Количество запросов в отчете."
+        )
+        parser.add_argument(
+            "--plan",
+            action="store_true",
+            help="Выводить план самого долгого выполнения запроса.",
+        )
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Очистить журнал после вывода отчета.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["file"]:
+            raise CommandError("Файл журнала не задан (SLOW_QUERY_LOG).")
+        path = Path(options["file"])
+        groups = aggregate(read_records(path))
+        self.stdout.write(
+            f"Медленных запросов: {sum(group['count'] for group in groups)}, "
+            f"различных: {len(groups)}"
+        )
+        for group in groups[: options["top"]]:
+            views = ", ".join(
+                f"{view} ({count})"
+                for view, count in sorted(
+                    group["views"].items(), key=lambda item: -item[1]
+                )
+            )
+            self.stdout.write(
+                f"\n{group['fingerprint']}  всего {group['total_ms']:.1f} мс, "
+                f"запросов {group['count']}, среднее {group['avg_ms']:.1f} мс, "
+                f"максимум {group['max_ms']:.1f} мс"
+            )
+            self.stdout.write(f"  Представления: {views}")
+            self.stdout.write(f"  {group['sql']}")
+            if options["plan"] and group["plan"]:
+                for line in group["plan"].splitlines():
+                    self.stdout.write(f"    {line}")
+        if options["reset"] and path.exists():
+            path.unlink()
+            self.stdout.write("Журнал очищен.")
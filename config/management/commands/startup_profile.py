@@ -0,0 +1,135 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+# Код, выполняемый в отдельном процессе: запуск Django, загрузка URL
+# и, если передан адрес, первый запрос к нему через тестовый клиент.
+STARTUP_SNIPPET = """
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+ready = time.perf_counter()
+status = None
+if sys.argv[1]:
+    from django.test import Client
+    status = Client().get(sys.argv[1], HTTP_HOST="localhost").status_code
+done = time.perf_counter()
+print(json.dumps({"setup": ready - started, "first_response": done - started, "status": status}))
+"""
+
+
+def parse_importtime(output):
+    """Разбирает вывод python -X importtime.
+
+    Аргументы:
+        output (str): Поток ошибок процесса, запущенного с -X importtime.
+
+    Возвращает:
+        list: Кортежи (module, self_us, cumulative_us) в порядке импорта.
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        modules.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return modules
+
+
+class Command(BaseCommand):
+    """Профилирует запуск воркера.
+
+    Запускает Django в отдельном процессе с -X importtime и выводит время
+    импорта по пакетам и самые дорогие модули, затем несколько раз
+    измеряет холодный старт до первого ответа без профилирования импорта.
+    """
+
+    help = "Профиль импорта модулей и холодного старта до первого ответа."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--settings-module",
+            default=os.environ.get("DJANGO_SETTINGS_MODULE", "config.settings"),
+            help="Модуль настроек профилируемого процесса, например config.settings_api.",
+        )
+        parser.add_argument(
+            "--url",
+            default="",
+            help="Адрес первого запроса, например /task_tracker/list/.",
+        )
+        parser.add_argument(
+            "--top", type=int, default=20, help="Количество строк в отчетах."
+        )
+        parser.add_argument(
+            "--runs", type=int, default=5, help="Количество замеров холодного старта."
+        )
+
+    def _run(self, options, *python_options):
+        """Запускает профилируемый процесс и возвращает его результат и время."""
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=options["settings_module"])
+        started = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, *python_options, "-c", STARTUP_SNIPPET, options["url"]],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        elapsed = time.perf_counter() - started
+        if process.returncode != 0:
+            errors = [
+                line
+                for line in process.stderr.splitlines()
+                if not line.startswith("import time:")
+            ]
+            raise CommandError(
+                errors[-1] if errors else "Процесс завершился с ошибкой."
+            )
+        return (
+            json.loads(process.stdout.strip().splitlines()[-1]),
+            process.stderr,
+            elapsed,
+        )
+
+    def handle(self, *args, **options):
+        _, stderr, _ = self._run(options, "-X", "importtime")
+        modules = parse_importtime(stderr)
+        packages = {}
+        for name, self_us, _ in modules:
+            package = name.split(".")[0]
+            packages[package] = packages.get(package, 0) + self_us
+        top = options["top"]
+        self.stdout.write(f"Профиль настроек: {options['settings_module']}")
+        self.stdout.write("Импорт по пакетам (собственное время), мс:")
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[
+            :top
+        ]:
+            self.stdout.write(f"{self_us / 1000:10.1f}  {package}")
+        self.stdout.write("Самые дорогие модули (суммарное время), мс:")
+        for name, self_us, cumulative_us in sorted(modules, key=lambda item: -item[2])[
+            :top
+        ]:
+            self.stdout.write(
+                f"{cumulative_us / 1000:10.1f}  {self_us / 1000:8.1f}  {name}"
+            )
+
+        runs = [self._run(options) for _ in range(max(options["runs"], 1))]
+        self.stdout.write(
+            f"Холодный старт (медиана, замеров: {len(runs)}), мс: "
+            f"django.setup {statistics.median(r[0]['setup'] for r in runs) * 1000:.1f}, "
+            f"первый ответ {statistics.median(r[0]['first_response'] for r in runs) * 1000:.1f}, "
+            f"процесс целиком {statistics.median(r[2] for r in runs) * 1000:.1f}"
+        )
+        if options["url"]:
+            self.stdout.write(f"Статус первого ответа: {runs[-1][0]['status']}")
@@ -0,0 +1,114 @@
+"""
+Кэш сериализованных записей по версии.
+
+Ключ кэша включает версию записи, поэтому после любого изменения
+записи старое значение просто перестает читаться и не требует
+инвалидации. Кэш общий для просмотра одной записи
+(ConditionalRetrieveMixin) и пакетного получения (BulkRetrieveMixin).
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.fields import IntegerField, ListField
+from rest_framework.response import Response
+from rest_framework.serializers import Serializer
+
+
+def record_key(model, pk, version):
+    """Возвращает ключ кэша сериализованной записи."""
+    return f"record:{model._meta.label_lower}:{pk}:{version}"
+
+
+def get_record(model, pk, version):
+    """Возвращает сериализованную запись из кэша или None."""
+    return cache.get(record_key(model, pk, version))
+
+
+def set_record(model, data):
+    """Сохраняет сериализованную запись в кэш."""
+    cache.set(
+        record_key(model, data["id"], data["version"]),
+        data,
+        settings.RECORD_CACHE_TIMEOUT,
+    )
+
+
+def get_records(queryset, ids, serializer_class):
+    """Возвращает сериализованные записи по списку идентификаторов.
+
+    Версии записей читаются одним запросом по покрывающему индексу,
+    найденные в кэше записи берутся оттуда, остальные загружаются одним
+    запросом in_bulk, сериализуются и кладутся в кэш.
+
+    Аргументы:
+        queryset (QuerySet): Набор записей с полем version.
+        ids (list): Идентификаторы в порядке запроса.
+        serializer_class (Serializer): Сериализатор записей.
+
+    Возвращает:
+        tuple: Записи в порядке запроса и список ненайденных идентификаторов.
+    """
+    model = queryset.model
+    ids = list(dict.fromkeys(ids))
+    versions = dict(queryset.filter(pk__in=ids).values_list("pk", "version"))
+    keys = {pk: record_key(model, pk, version) for pk, version in versions.items()}
+    cached = cache.get_many(keys.values())
+    records = {pk: cached[key] for pk, key in keys.items() if key in cached}
+    misses = [pk for pk in versions if pk not in records]
+    if misses:
+        objects = queryset.in_bulk(misses)
+        fresh = serializer_class(list(objects.values()), many=True).data
+        cache.set_many(
+            {record_key(model, data["id"], data["version"]): data for data in fresh},
+            settings.RECORD_CACHE_TIMEOUT,
+        )
+        records.update((data["id"], data) for data in fresh)
+    results = [records[pk] for pk in ids if pk in records]
+    missing = [pk for pk in ids if pk not in records]
+    return results, missing
+
+
+class BulkIdsSerializer(Serializer):
+    """Сериализатор списка идентификаторов для пакетного получения.
+
+    Атрибуты:
+        ids (ListField): Идентификаторы, не больше BULK_RETRIEVE_MAX_IDS.
+    """
+
+    ids = ListField(
+        child=IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.BULK_RETRIEVE_MAX_IDS,
+    )
+
+
+class BulkRetrieveMixin:
+    """Примесь для пакетного получения записей по списку идентификаторов.
+
+    Идентификаторы передаются параметром ?ids=1,2,3 или в теле POST
+    запроса {"ids": [1, 2, 3]}. Ответ содержит записи в порядке запроса
+    (повторы отбрасываются) и список ненайденных идентификаторов.
+    Представление задает queryset и serializer_class. POST здесь только
+    читает данные, поэтому не закрепляет клиента за основной базой.
+    """
+
+    queryset = None
+    serializer_class = None
+    pins_primary = False
+
+    def get(self, request):
+        """Возвращает записи по параметру ids."""
+        value = request.query_params.get("ids", "")
+        return self.bulk_retrieve({"ids": [item for item in value.split(",") if item]})
+
+    def post(self, request):
+        """Возвращает записи по списку ids из тела запроса."""
+        return self.bulk_retrieve(request.data)
+
+    def bulk_retrieve(self, data):
+        serializer = BulkIdsSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        results, missing = get_records(
+            self.queryset.all(), serializer.validated_data["ids"], self.serializer_class
+        )
+        return Response({"results": results, "missing": missing})
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор с оценочным количеством строк для больших таблиц.
+
+    Для запроса без фильтров на PostgreSQL количество строк берется из
+    статистики планировщика (pg_class.reltuples) вместо COUNT(*). Если
+    оценка меньше ADMIN_ESTIMATED_COUNT_THRESHOLD, выполняется точный
+    подсчет.
+    """
+
+    @cached_property
+    def count(self):
+        """Возвращает оценочное или точное количество строк."""
+        queryset = self.object_list
+        query = getattr(queryset, "query", None)
+        if query is not None and not query.where:
+            connection = connections[queryset.db]
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                        [queryset.model._meta.db_table],
+                    )
+                    row = cursor.fetchone()
+                if row and row[0] >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                    return int(row[0])
+        return super().count
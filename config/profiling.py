@@ -0,0 +1,212 @@
+"""
+Выборочное профилирование представлений API.
+
+ProfilingMiddleware снимает стеки вызовов представлений из приложений
+PROFILING_APPS: по заголовку X-Profile от сотрудника (is_staff) или для
+PROFILING_SAMPLE_PERCENT процентов запросов. Фоновый поток раз в
+PROFILING_INTERVAL_MS миллисекунд снимает стек потока, обрабатывающего
+запрос, поэтому непрофилируемые запросы ничего не теряют, а
+профилируемые замедляются незначительно. Стеки в свернутом формате
+(collapsed stacks, как у flamegraph.pl) построчно записываются в JSON-файл
+PROFILING_LOG, отчет по маршрутам строит python manage.py profile_report.
+"""
+
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+PROFILE_HEADER = "X-Profile"
+
+_write_lock = threading.Lock()
+
+
+def collapse(frame):
+    """Возвращает стек кадра в свернутом формате: функции от внешней
+    к внутренней через точку с запятой."""
+    names = []
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "?")
+        names.append(f"{module}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """Выборочный профилировщик одного потока.
+
+    Атрибуты:
+        thread_id (int): Идентификатор профилируемого потока.
+        interval (float): Интервал снятия стека в секундах.
+        stacks (Counter): Количество снимков каждого свернутого стека.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """Запускает снятие стеков."""
+        self._thread.start()
+
+    def stop(self):
+        """Останавливает снятие стеков и возвращает собранные стеки."""
+        self._stopped.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse(frame)] += 1
+
+
+def is_staff(request):
+    """Проверяет, что запрос выполняет сотрудник.
+
+    Пользователь определяется аутентификацией DRF по умолчанию, так как
+    промежуточный слой выполняется раньше представления. Ошибка
+    аутентификации (например, неверные учетные данные) означает, что
+    запрос выполняет не сотрудник: ответ с ошибкой вернет само
+    представление.
+    """
+    try:
+        user = Request(
+            request,
+            authenticators=[
+                auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+            ],
+        ).user
+    except APIException:
+        return False
+    return bool(user and user.is_staff)
+
+
+def should_profile(request):
+    """Решает, профилировать ли запрос."""
+    if request.headers.get(PROFILE_HEADER) and is_staff(request):
+        return True
+    return random.random() * 100 < settings.PROFILING_SAMPLE_PERCENT
+
+
+def write_profile(record):
+    """Дописывает профиль запроса в файл PROFILING_LOG."""
+    path = Path(settings.PROFILING_LOG)
+    line = json.dumps(record, ensure_ascii=False)
+    with _write_lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as log:
+            log.write(line + "\n")
+
+
+def read_profiles(path):
+    """Читает профили запросов из файла.
+
+    Аргументы:
+        path (str): Путь к файлу профилей.
+
+    Возвращает:
+        list: Профили в порядке записи, пустой список, если файла нет.
+    """
+    path = Path(path)
+    if not path.exists():
+        return []
+    with path.open(encoding="utf-8") as log:
+        return [json.loads(line) for line in log if line.strip()]
+
+
+def aggregate(profiles):
+    """Группирует профили запросов по имени маршрута.
+
+    Аргументы:
+        profiles (list): Профили запросов.
+
+    Возвращает:
+        dict: Для каждого маршрута количество запросов, суммарная
+        длительность в миллисекундах и сложенные свернутые стеки.
+    """
+    routes = {}
+    for profile in profiles:
+        route = routes.setdefault(
+            profile["url_name"],
+            {"requests": 0, "duration_ms": 0.0, "stacks": Counter()},
+        )
+        route["requests"] += 1
+        route["duration_ms"] += profile["duration_ms"]
+        route["stacks"].update(profile["stacks"])
+    return routes
+
+
+def function_totals(stacks):
+    """Считает снимки по функциям.
+
+    Аргументы:
+        stacks (Counter): Свернутые стеки и количество их снимков.
+
+    Возвращает:
+        tuple: Собственные снимки функций (функция на вершине стека) и
+        включающие снимки (функция где-либо в стеке).
+    """
+    own, inclusive = Counter(), Counter()
+    for stack, count in stacks.items():
+        names = stack.split(";")
+        own[names[-1]] += count
+        for name in set(names):
+            inclusive[name] += count
+    return own, inclusive
+
+
+class ProfilingMiddleware:
+    """Профилирует выбранные запросы к представлениям PROFILING_APPS.
+
+    Снятие стеков начинается перед вызовом представления и заканчивается
+    после формирования ответа. В ответ профилированного запроса
+    добавляется заголовок X-Profile-Samples с количеством снимков.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        sampler = request.__dict__.pop("_stack_sampler", None)
+        if sampler is not None:
+            stacks = sampler.stop()
+            write_profile(
+                {
+                    "time": timezone.now().isoformat(),
+                    "url_name": request.resolver_match.view_name,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                    "interval_ms": settings.PROFILING_INTERVAL_MS,
+                    "stacks": stacks,
+                }
+            )
+            response["X-Profile-Samples"] = sum(stacks.values())
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            request.resolver_match.app_name in settings.PROFILING_APPS
+            and should_profile(request)
+        ):
+            sampler = StackSampler(
+                threading.get_ident(), settings.PROFILING_INTERVAL_MS / 1000
+            )
+            sampler.start()
+            request._stack_sampler = sampler
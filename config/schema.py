@@ -0,0 +1,92 @@
+"""
+Документация API на основе заранее собранной схемы OpenAPI.
+
+Схема генерируется командой ``python manage.py openapi_schema`` в файлы
+OPENAPI_SCHEMA_DIR и хранится в репозитории. Представления /swagger/ и
+/redoc/ отдают ее как есть, с ETag и долгим кэшированием, без разбора
+представлений и сериализаторов на каждый запрос. Если файла нет, схема
+строится на лету, как раньше.
+"""
+
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.renderers import _SpecRenderer
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+SCHEMA_INFO = openapi.Info(
+    title="Документация API",
+    default_version="v1",
+    description="Описание вашего API",
+    terms_of_service="https://www.example.com/policies/terms/",
+    contact=openapi.Contact(email="contact@example.com"),
+    license=openapi.License(name="BSD License"),
+)
+
+SCHEMA_FILES = {"json": "openapi.json", "yaml": "openapi.yaml"}
+
+
+def generate_schema():
+    """Строит схему OpenAPI по текущему коду.
+
+    Возвращает:
+        dict: Содержимое файлов схемы по формату ('json', 'yaml').
+    """
+    generator = OpenAPISchemaGenerator(SCHEMA_INFO)
+    schema = generator.get_schema(request=None, public=True)
+    return {
+        "json": OpenAPICodecJson(validators=[], pretty=True).encode(schema),
+        "yaml": OpenAPICodecYaml(validators=[]).encode(schema),
+    }
+
+
+@lru_cache
+def load_schema(schema_format):
+    """Читает собранную схему с диска один раз за время жизни процесса.
+
+    Аргументы:
+        schema_format (str): Формат схемы, 'json' или 'yaml'.
+
+    Возвращает:
+        tuple | None: Содержимое файла и его ETag или None, если файла нет.
+    """
+    path = Path(settings.OPENAPI_SCHEMA_DIR) / SCHEMA_FILES[schema_format]
+    try:
+        content = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    return content, f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+class SchemaView(
+    get_schema_view(
+        SCHEMA_INFO, public=True, permission_classes=(permissions.AllowAny,)
+    )
+):
+    """Представление схемы, отдающее заранее собранный файл."""
+
+    def get(self, request, version="", format=None):
+        """Отдает собранную схему с ETag или строит ее, если файла нет."""
+        renderer = request.accepted_renderer
+        if isinstance(renderer, _SpecRenderer):
+            schema_format = "yaml" if renderer.format.endswith("yaml") else "json"
+            prebuilt = load_schema(schema_format)
+            if prebuilt is not None:
+                content, etag = prebuilt
+                if etag in request.headers.get("If-None-Match", ""):
+                    response = HttpResponseNotModified()
+                else:
+                    response = HttpResponse(content, content_type=renderer.media_type)
+                response["ETag"] = etag
+                response["Cache-Control"] = (
+                    f"public, max-age={settings.OPENAPI_SCHEMA_MAX_AGE}"
+                )
+                return response
+        return super().get(request, version, format)
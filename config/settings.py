@@ -35,6 +35,7 @@ INSTALLED_APPS = [
     "rest_framework",
     "drf_yasg",
     "django_filters",
+    "config",
     "users.apps.UsersConfig",
     "employees.apps.EmployeesConfig",
     "task_tracker.apps.TaskTrackerConfig",
@@ -42,12 +43,16 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "config.compression.CompressionMiddleware",
+    "config.slow_queries.SlowQueryMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "config.db_router.ReadYourWritesMiddleware",
+    "config.profiling.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -85,6 +90,47 @@ DATABASES = {
     }
 }
 
+# Реплики только для чтения: хосты через запятую в POSTGRES_REPLICA_HOSTS,
+# остальные параметры подключения берутся у основной базы. В тестах
+# реплики указывают на тестовую основную базу.
+DATABASE_REPLICAS = []
+for number, host in enumerate(
+    filter(None, os.getenv("POSTGRES_REPLICA_HOSTS", "").split(",")), start=1
+):
+    alias = f"replica_{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["config.db_router.ReplicaRouter"]
+
+# Сколько секунд после изменяющего запроса чтение клиента выполняется
+# на основной базе.
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 5))
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# LocMemCache хранит данные в памяти процесса. При нескольких воркерах
+# нужен общий кэш (Redis, Memcached): через него согласуется снимок
+# трекера (python manage.py check --deploy предупреждает об этом).
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
+
+# Пользователи входят по email (users.User), по этой же модели выдаются
+# JWT-токены и выполняется вход в админку. Перевод существующей базы
+# описан в ReadMe (миграция users 0003).
+AUTH_USER_MODEL = "users.User"
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -143,3 +189,131 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
 }
+
+# Максимальная устарелость снимка трекера (/task_tracker/tracker/) в секундах.
+# Изменения задач применяются к снимку не позже, чем через это время.
+TRACKER_SNAPSHOT_MAX_STALENESS = int(os.getenv("TRACKER_SNAPSHOT_MAX_STALENESS", 5))
+
+# Время хранения в кэше одного интервала аналитики загрузки в секундах.
+ANALYTICS_CACHE_TIMEOUT = int(os.getenv("ANALYTICS_CACHE_TIMEOUT", 300))
+
+# Начиная с этого количества строк (по статистике PostgreSQL) списки
+# в админке показывают оценочное количество вместо COUNT(*).
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(
+    os.getenv("ADMIN_ESTIMATED_COUNT_THRESHOLD", 100000)
+)
+
+# Каталог с собранной схемой OpenAPI (python manage.py openapi_schema)
+# и время ее кэширования клиентами в секундах.
+OPENAPI_SCHEMA_DIR = BASE_DIR / "config" / "openapi"
+OPENAPI_SCHEMA_MAX_AGE = int(os.getenv("OPENAPI_SCHEMA_MAX_AGE", 86400))
+
+# Веса оценки кандидатов в исполнители (/task_tracker/recommend/{id}/):
+# штраф за каждую активную и просроченную задачу, бонус за каждую задачу
+# среди соседних и дочерних и бонус за совпадение должности.
+RECOMMENDATION_WEIGHTS = {
+    "active": 1.0,
+    "overdue": 2.0,
+    "related": 1.5,
+    "post": 3.0,
+}
+RECOMMENDATION_MAX_K = 50
+
+# Архивирование завершенных задач (python manage.py archive_tasks):
+# через сколько дней после завершения задача переносится в архив
+# и сколько задач переносится за одну транзакцию.
+TASK_ARCHIVE_HORIZON_DAYS = int(os.getenv("TASK_ARCHIVE_HORIZON_DAYS", 90))
+TASK_ARCHIVE_BATCH_SIZE = int(os.getenv("TASK_ARCHIVE_BATCH_SIZE", 1000))
+
+# План загрузки (python manage.py capacity_plan): сколько задач читается
+# из базы данных за один запрос и обрабатывается за одну пачку.
+CAPACITY_PLAN_BATCH_SIZE = int(os.getenv("CAPACITY_PLAN_BATCH_SIZE", 50000))
+
+# Пакетная запись статусов (/task_tracker/status/{id}/): интервал сбора
+# пачки в миллисекундах и режим подтверждения. В надежном режиме ответ
+# отдается после записи пачки в базу данных, иначе сразу.
+TASK_STATUS_BUFFER_INTERVAL_MS = int(os.getenv("TASK_STATUS_BUFFER_INTERVAL_MS", 5))
+TASK_STATUS_BUFFER_DURABLE = os.getenv("TASK_STATUS_BUFFER_DURABLE", "True") == "True"
+
+# Сжатие ответов: минимальный размер тела в байтах и качество Brotli
+# (0-11). Brotli используется, если установлен, gzip сжимает
+# GZipMiddleware Django.
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+
+REST_FRAMEWORK = {
+    "DEFAULT_THROTTLE_CLASSES": ["config.throttling.TokenBucketThrottle"],
+}
+
+# Ведро токенов на клиента: (емкость, пополнение токенов в секунду)
+# для пользователей и анонимных клиентов. Стоимость запроса задается
+# атрибутом throttle_cost представления.
+THROTTLE_RATES = {
+    "user": (
+        int(os.getenv("THROTTLE_USER_CAPACITY", 120)),
+        float(os.getenv("THROTTLE_USER_REFILL", 2)),
+    ),
+    "anon": (
+        int(os.getenv("THROTTLE_ANON_CAPACITY", 60)),
+        float(os.getenv("THROTTLE_ANON_REFILL", 1)),
+    ),
+}
+
+# Ограничение параллельных тяжелых запросов (max_concurrency представления):
+# через сколько секунд повторить запрос и время жизни счетчика.
+THROTTLE_CONCURRENCY_RETRY_AFTER = 1
+THROTTLE_INFLIGHT_TIMEOUT = 60
+
+# Через сколько секунд префиксный индекс подсказок сотрудников
+# (/employees/autocomplete/) перестраивается из базы данных.
+EMPLOYEE_INDEX_TTL = int(os.getenv("EMPLOYEE_INDEX_TTL", 300))
+
+# Расписание дерева задач (/task_tracker/schedule/{id}/): сколько дней
+# занимает активная задача после завершения подзадач и время хранения
+# расчета в кэше в секундах.
+TASK_SCHEDULE_DURATION_DAYS = int(os.getenv("TASK_SCHEDULE_DURATION_DAYS", 1))
+TASK_SCHEDULE_CACHE_TIMEOUT = int(os.getenv("TASK_SCHEDULE_CACHE_TIMEOUT", 300))
+
+# Кэш сериализованных записей по версии (просмотр и пакетное получение)
+# и наибольшее количество идентификаторов в пакетном запросе.
+RECORD_CACHE_TIMEOUT = int(os.getenv("RECORD_CACHE_TIMEOUT", 300))
+BULK_RETRIEVE_MAX_IDS = int(os.getenv("BULK_RETRIEVE_MAX_IDS", 500))
+
+# Идемпотентные запросы (заголовок Idempotency-Key): сколько секунд
+# хранится результат и сколько держится блокировка выполняемого запроса.
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", 86400))
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", 60))
+
+# Журнал медленных запросов к базе данных (python manage.py slow_queries):
+# порог длительности запроса в миллисекундах, файл журнала и как часто
+# (в секундах) снимать план запросов с одним отпечатком. Пустой
+# SLOW_QUERY_LOG отключает запись в файл, остается только журнал
+# config.slow_queries.
+SLOW_QUERY_THRESHOLD_MS = int(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+SLOW_QUERY_LOG = os.getenv(
+    "SLOW_QUERY_LOG", str(BASE_DIR / "logs" / "slow_queries.jsonl")
+)
+SLOW_QUERY_PLAN_INTERVAL = int(os.getenv("SLOW_QUERY_PLAN_INTERVAL", 300))
+
+# Выборочное профилирование представлений (python manage.py profile_report):
+# приложения, процент профилируемых запросов (кроме запросов сотрудников
+# с заголовком X-Profile), интервал снятия стеков в миллисекундах и файл
+# профилей.
+PROFILING_APPS = ("task_tracker", "employees")
+PROFILING_SAMPLE_PERCENT = float(os.getenv("PROFILING_SAMPLE_PERCENT", 0))
+PROFILING_INTERVAL_MS = int(os.getenv("PROFILING_INTERVAL_MS", 5))
+PROFILING_LOG = os.getenv("PROFILING_LOG", str(BASE_DIR / "logs" / "profiles.jsonl"))
+
+# Поток событий изменений (/task_tracker/events/): брокер
+# (config.events.LocalBroker в памяти процесса или config.events.RedisBroker
+# для нескольких процессов, требует пакет redis), очередь подписчика,
+# интервал пустых сообщений и время жизни потока в секундах.
+EVENTS_BROKER = os.getenv("EVENTS_BROKER", "config.events.LocalBroker")
+EVENTS_REDIS_URL = os.getenv("EVENTS_REDIS_URL", "redis://localhost:6379/0")
+EVENTS_REDIS_CHANNEL = os.getenv("EVENTS_REDIS_CHANNEL", "events")
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", 100))
+EVENTS_HEARTBEAT_SECONDS = int(os.getenv("EVENTS_HEARTBEAT_SECONDS", 15))
+EVENTS_STREAM_SECONDS = int(os.getenv("EVENTS_STREAM_SECONDS", 300))
+
+# Запуск тестов с отчетом о времени прогона и самых долгих тестах.
+TEST_RUNNER = "config.test_runner.TimedTestRunner"
@@ -0,0 +1,27 @@
+"""
+Облегченный профиль настроек для воркеров, обслуживающих только API.
+
+Подключается через DJANGO_SETTINGS_MODULE=config.settings_api. В отличие от
+config.settings, не загружает административный интерфейс, документацию
+API (drf-yasg) и django-filter, а использует конфигурацию URL config.urls_api.
+"""
+
+from config.settings import *  # noqa: F401,F403
+from config.settings import INSTALLED_APPS, MIDDLEWARE
+
+SLIM_EXCLUDED_APPS = (
+    "django.contrib.admin",
+    "django.contrib.messages",
+    "drf_yasg",
+    "django_filters",
+)
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in SLIM_EXCLUDED_APPS]
+
+MIDDLEWARE = [
+    middleware
+    for middleware in MIDDLEWARE
+    if middleware != "django.contrib.messages.middleware.MessageMiddleware"
+]
+
+ROOT_URLCONF = "config.urls_api"
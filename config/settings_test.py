@@ -0,0 +1,25 @@
+"""
+Профиль настроек для быстрого локального запуска тестов.
+
+Подключается через DJANGO_SETTINGS_MODULE=config.settings_test. Тестовая
+база данных SQLite создается в памяти, поэтому PostgreSQL не нужен, а
+пароли хешируются быстрым алгоритмом. Тесты, которые проверяют
+возможности PostgreSQL (триграммные индексы, оценка количества строк,
+планы запросов), на SQLite пропускаются, перед слиянием набор тестов
+нужно прогнать и на PostgreSQL с config.settings.
+"""
+
+from config.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+        # Таблицы создаются по моделям: миграции с SQL для PostgreSQL
+        # на SQLite не выполняются.
+        "TEST": {"MIGRATE": False},
+    }
+}
+DATABASE_REPLICAS = []
+
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
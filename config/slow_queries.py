@@ -0,0 +1,237 @@
+"""
+Журнал медленных запросов к базе данных.
+
+SlowQueryMiddleware оборачивает все подключения на время запроса
+(connection.execute_wrapper) и записывает запросы дольше
+SLOW_QUERY_THRESHOLD_MS миллисекунд: представление, отпечаток
+нормализованного SQL, длительность и план выполнения. План снимается на
+том же подключении сразу после запроса и не чаще раза в
+SLOW_QUERY_PLAN_INTERVAL секунд для отпечатка, чтобы при медленной
+базе не добавлять ей лишней работы. Записи попадают
+в журнал config.slow_queries и построчно в JSON-файл SLOW_QUERY_LOG,
+по которому python manage.py slow_queries строит отчет.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+SPACE_RE = re.compile(r"\s+")
+EXPLAINABLE = ("SELECT", "WITH")
+PLAN_KEY = "slow_queries:plan:{}"
+
+_write_lock = threading.Lock()
+
+
+def normalize_sql(sql):
+    """Заменяет значения в SQL на ? и сворачивает списки IN.
+
+    Запросы, отличающиеся только значениями параметров и длиной списков
+    идентификаторов, нормализуются в одну строку.
+
+    Аргументы:
+        sql (str): Текст запроса с параметрами %s.
+
+    Возвращает:
+        str: Нормализованный текст запроса.
+    """
+    sql = STRING_RE.sub("?", sql).replace("%s", "?")
+    sql = NUMBER_RE.sub("?", sql)
+    sql = IN_LIST_RE.sub("(...)", sql)
+    return SPACE_RE.sub(" ", sql).strip()
+
+
+def sql_fingerprint(sql):
+    """Возвращает отпечаток нормализованного текста запроса."""
+    return hashlib.sha1(normalize_sql(sql).encode()).hexdigest()[:16]
+
+
+def explain(connection, sql, params):
+    """Возвращает план выполнения запроса или None.
+
+    План запрашивается без ANALYZE, то есть запрос повторно не
+    выполняется. Используется то же подключение, что и для запроса:
+    внутри транзакции план снимается в точке сохранения, чтобы ошибка
+    EXPLAIN не прервала транзакцию. В прерванной транзакции план не
+    снимается.
+
+    Аргументы:
+        connection (BaseDatabaseWrapper): Подключение, выполнившее запрос.
+        sql (str): Текст запроса с параметрами %s.
+        params (list): Параметры запроса.
+
+    Возвращает:
+        str | None: План выполнения или None, если его не удалось получить.
+    """
+    if connection.needs_rollback:
+        return None
+    prefix = connection.ops.explain_query_prefix()
+    try:
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(f"{prefix} {sql}", params)
+                rows = cursor.fetchall()
+    except DatabaseError:
+        return None
+    return "\n".join(" ".join(str(value) for value in row) for row in rows)
+
+
+def should_explain(fingerprint):
+    """Проверяет, пора ли снова снимать план запроса с этим отпечатком."""
+    return cache.add(
+        PLAN_KEY.format(fingerprint), True, settings.SLOW_QUERY_PLAN_INTERVAL
+    )
+
+
+def write_record(record):
+    """Записывает медленный запрос в журнал и в файл SLOW_QUERY_LOG."""
+    logger.warning(
+        "Медленный запрос %s (%.1f мс) в %s",
+        record["fingerprint"],
+        record["duration_ms"],
+        record["view"],
+    )
+    if not settings.SLOW_QUERY_LOG:
+        return
+    path = Path(settings.SLOW_QUERY_LOG)
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with _write_lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as log:
+            log.write(line + "\n")
+
+
+def read_records(path):
+    """Читает записи медленных запросов из файла.
+
+    Аргументы:
+        path (str): Путь к файлу журнала.
+
+    Возвращает:
+        list: Записи в порядке записи, пустой список, если файла нет.
+    """
+    path = Path(path)
+    if not path.exists():
+        return []
+    with path.open(encoding="utf-8") as log:
+        return [json.loads(line) for line in log if line.strip()]
+
+
+def aggregate(records):
+    """Группирует медленные запросы по отпечатку.
+
+    Аргументы:
+        records (list): Записи медленных запросов.
+
+    Возвращает:
+        list: Группы с количеством, суммарной, средней и наибольшей
+        длительностью, представлениями и планом самого долгого запроса
+        по убыванию суммарной длительности.
+    """
+    groups = {}
+    for record in records:
+        group = groups.setdefault(
+            record["fingerprint"],
+            {
+                "fingerprint": record["fingerprint"],
+                "sql": record["sql"],
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "views": {},
+                "plan": None,
+            },
+        )
+        group["count"] += 1
+        group["total_ms"] += record["duration_ms"]
+        views = group["views"]
+        views[record["view"]] = views.get(record["view"], 0) + 1
+        if record["duration_ms"] >= group["max_ms"]:
+            group["max_ms"] = record["duration_ms"]
+            group["plan"] = record.get("plan") or group["plan"]
+    for group in groups.values():
+        group["avg_ms"] = group["total_ms"] / group["count"]
+    return sorted(groups.values(), key=lambda group: -group["total_ms"])
+
+
+def view_name(request):
+    """Возвращает имя маршрута запроса или его путь."""
+    match = getattr(request, "resolver_match", None)
+    return (match.view_name if match else None) or request.path
+
+
+class SlowQueryLogger:
+    """Обертка выполнения запросов, записывающая медленные запросы.
+
+    Атрибуты:
+        request (HttpRequest): Запрос, во время которого выполняются
+            запросы к базе данных. Имя представления определяется в
+            момент записи, когда маршрут уже найден.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.explaining:
+            # Запросы самого EXPLAIN не записываются.
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = (time.perf_counter() - started) * 1000
+        if duration >= settings.SLOW_QUERY_THRESHOLD_MS:
+            connection = context["connection"]
+            fingerprint = sql_fingerprint(sql)
+            plan = None
+            if (
+                not many
+                and sql.lstrip().upper().startswith(EXPLAINABLE)
+                and should_explain(fingerprint)
+            ):
+                self.explaining = True
+                try:
+                    plan = explain(connection, sql, params)
+                finally:
+                    self.explaining = False
+            write_record(
+                {
+                    "time": timezone.now().isoformat(),
+                    "view": view_name(self.request),
+                    "alias": connection.alias,
+                    "fingerprint": fingerprint,
+                    "sql": normalize_sql(sql),
+                    "duration_ms": round(duration, 3),
+                    "plan": plan,
+                }
+            )
+        return result
+
+
+class SlowQueryMiddleware:
+    """Подключает SlowQueryLogger ко всем базам данных на время запроса."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        wrapper = SlowQueryLogger(request)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(wrapper))
+            return self.get_response(request)
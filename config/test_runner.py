@@ -0,0 +1,94 @@
+"""
+Запуск тестов с отчетом о времени.
+
+После прогона выводится время подготовки баз данных, выполнения тестов и
+всего прогона, а при последовательном запуске - самые долгие тесты.
+Подключается настройкой TEST_RUNNER.
+"""
+
+import time
+import unittest
+
+from django.test.runner import DiscoverRunner
+
+
+class TimedTextTestResult(unittest.TextTestResult):
+    """Результат прогона, запоминающий длительность каждого теста."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.durations = []
+        self._started = None
+
+    def startTest(self, test):
+        self._started = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        self.durations.append((time.perf_counter() - self._started, test.id()))
+
+
+class TimedTestRunner(DiscoverRunner):
+    """Запуск тестов с отчетом о времени прогона.
+
+    При параллельном запуске (--parallel) события тестов приходят из
+    дочерних процессов пачками, поэтому выводится только время прогона.
+    """
+
+    def __init__(self, slowest=10, **kwargs):
+        super().__init__(**kwargs)
+        self.slowest = slowest
+        self.timings = {}
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--slowest",
+            type=int,
+            default=10,
+            help="Количество самых долгих тестов в отчете, 0 - не выводить.",
+        )
+
+    def get_resultclass(self):
+        return super().get_resultclass() or TimedTextTestResult
+
+    def setup_databases(self, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().setup_databases(**kwargs)
+        finally:
+            self.timings["Подготовка баз данных"] = time.perf_counter() - started
+
+    def run_suite(self, suite, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().run_suite(suite, **kwargs)
+        finally:
+            self.timings["Выполнение тестов"] = time.perf_counter() - started
+
+    def run_tests(self, test_labels, **kwargs):
+        started = time.perf_counter()
+        self._result = None
+        try:
+            return super().run_tests(test_labels, **kwargs)
+        finally:
+            self.timings["Всего"] = time.perf_counter() - started
+            self.report()
+
+    def suite_result(self, suite, result, **kwargs):
+        self._result = result
+        return super().suite_result(suite, result, **kwargs)
+
+    def report(self):
+        """Выводит время прогона и самые долгие тесты."""
+        lines = [f"{name}: {seconds:.2f} с" for name, seconds in self.timings.items()]
+        durations = getattr(self._result, "durations", None)
+        if self.slowest and durations and self.parallel <= 1:
+            lines.append("Самые долгие тесты:")
+            lines.extend(
+                f"{seconds:8.3f} с  {test_id}"
+                for seconds, test_id in sorted(durations, reverse=True)[: self.slowest]
+            )
+        self.log("\n".join(lines))
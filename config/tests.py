@@ -0,0 +1,450 @@
+import asyncio
+import gzip
+import threading
+import time
+import tempfile
+import zlib
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from config.checks import check_shared_cache
+from config.compression import CompressionMiddleware
+from config.db_router import (ReadYourWritesMiddleware, ReplicaRouter,
+                              is_pinned, replica_reads)
+from config.events import LocalBroker
+from config.management.commands.startup_profile import parse_importtime
+from config.profiling import StackSampler, read_profiles
+from config.slow_queries import normalize_sql, read_records, sql_fingerprint
+from task_tracker.models import Task
+from users.models import User
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+class SchemaTestCase(APITestCase):
+    """Тесты для собранной схемы OpenAPI."""
+
+    @skipUnless(
+        connection.vendor == "postgresql",
+        "Ограничения числовых полей в схеме зависят от базы данных.",
+    )
+    def test_schema_is_up_to_date(self):
+        """Тест на актуальность схемы.
+
+        Проверяет, что сохраненная схема совпадает с текущим кодом.
+        Схема собирается для PostgreSQL.
+        """
+        call_command("openapi_schema", "--check")
+
+    def test_schema_etag(self):
+        """Тест на отдачу схемы с ETag.
+
+        Проверяет, что схема отдается с ETag и долгим кэшированием,
+        а повторный запрос с If-None-Match получает 304.
+        """
+        response = self.client.get("/swagger/?format=openapi")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("max-age", response["Cache-Control"])
+        response = self.client.get(
+            "/swagger/?format=openapi", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get("/redoc/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ChecksTestCase(SimpleTestCase):
+    """Тесты для системных проверок проекта."""
+
+    def test_shared_cache(self):
+        """Тест на предупреждение о кэше, не общем для процессов."""
+        self.assertEqual(
+            [warning.id for warning in check_shared_cache(None)], ["config.W001"]
+        )
+        dummy = {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+        with override_settings(CACHES={"default": dummy}):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+class StartupProfileTestCase(SimpleTestCase):
+    """Тесты для профиля запуска."""
+
+    def test_parse_importtime(self):
+        """Тест разбора вывода -X importtime.
+
+        Проверяет, что строки с временем импорта разбираются, а заголовок
+        и посторонние строки пропускаются.
+        """
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   yaml.error\n"
+            "import time:       300 |        420 | yaml\n"
+            "Traceback (most recent call last):\n"
+        )
+        self.assertEqual(
+            parse_importtime(output),
+            [("yaml.error", 120, 120), ("yaml", 300, 420)],
+        )
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class ReplicaRouterTestCase(APITestCase):
+    """Тесты для маршрутизации чтения на реплики.
+
+    Чтобы проверить чтение с настоящей репликой, задайте
+    POSTGRES_REPLICA_HOSTS (например, localhost).
+    """
+
+    databases = "__all__"
+
+    def setUp(self):
+        cache.clear()
+
+    def test_router(self):
+        """Тест на выбор базы данных.
+
+        Проверяет, что на реплику уходит только чтение внутри
+        replica_reads(), а запись и миграции остаются на основной базе.
+        """
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(Task), "default")
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Task), "replica_1")
+            self.assertEqual(router.db_for_write(Task), "default")
+        self.assertEqual(router.db_for_read(Task), "default")
+        self.assertFalse(router.allow_migrate("replica_1", "task_tracker"))
+        self.assertTrue(router.allow_migrate("default", "task_tracker"))
+
+    def test_read_your_writes(self):
+        """Тест на закрепление клиента за основной базой после записи.
+
+        Проверяет, что после создания задачи клиент закреплен за основной
+        базой и следующий список читается с нее.
+        """
+        request = RequestFactory().get("/")
+        self.assertFalse(is_pinned(request))
+        response = self.client.post(
+            reverse("task_tracker:task-create"),
+            {"name": "Задача", "status": "start"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(is_pinned(request))
+        response = self.client.get(reverse("task_tracker:task-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_bulk_post_does_not_pin(self):
+        """Тест на пакетное получение POST-запросом.
+
+        Проверяет, что POST к представлению с pins_primary = False не
+        закрепляет клиента за основной базой, а изменяющий POST закрепляет.
+        """
+
+        def get_response(request):
+            request.resolver_match = resolve(request.path)
+            return HttpResponse()
+
+        middleware = ReadYourWritesMiddleware(get_response)
+        request = RequestFactory().post(reverse("task_tracker:task-bulk"))
+        middleware(request)
+        self.assertFalse(is_pinned(request))
+        middleware(RequestFactory().post(reverse("task_tracker:task-create")))
+        self.assertTrue(is_pinned(request))
+
+    @skipUnless(settings.DATABASE_REPLICAS, "реплики не настроены")
+    def test_list_reads_replica(self):
+        """Тест на чтение списка задач с реплики."""
+        replica = connections[settings.DATABASE_REPLICAS[0]]
+        with CaptureQueriesContext(replica) as queries:
+            response = self.client.get(reverse("task_tracker:task-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(queries.captured_queries)
+
+
+class CompressionTestCase(SimpleTestCase):
+    """Тесты для сжатия ответов."""
+
+    def compress(self, response, encoding):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_compress(self):
+        """Тест на сжатие ответа gzip.
+
+        Проверяет слабый ETag сжатого ответа, случайные байты в заголовке
+        gzip (защита от BREACH), дополнение заголовка Server-Timing и
+        пропуск тел меньше COMPRESSION_MIN_SIZE.
+        """
+        content = b'{"name": "task"}' * 1000
+        bodies = set()
+        for _ in range(5):
+            response = HttpResponse(
+                content, headers={"ETag": '"1"', "Server-Timing": "db;dur=1"}
+            )
+            response = self.compress(response, "gzip, br;q=0")
+            self.assertEqual(response["Content-Encoding"], "gzip")
+            self.assertEqual(gzip.decompress(response.content), content)
+            bodies.add(response.content)
+        self.assertGreater(len(bodies), 1)
+        self.assertEqual(response["ETag"], 'W/"1"')
+        self.assertTrue(response["Server-Timing"].startswith("db;dur=1, compress;"))
+        response = self.compress(HttpResponse(b"{}"), "gzip")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    @skipUnless(brotli, "пакет brotli не установлен")
+    def test_compress_brotli(self):
+        """Тест на выбор Brotli по весам q в Accept-Encoding."""
+        content = b'{"name": "task"}' * 1000
+        response = self.compress(HttpResponse(content), "gzip, br;q=0.9")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        response = self.compress(HttpResponse(content), "br;q=0.1, gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        response = self.compress(HttpResponse(content), "gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.content), content)
+        self.assertIn("compress;dur=", response["Server-Timing"])
+        response = self.compress(HttpResponse(content), "gzip;q=0.5, *")
+        self.assertEqual(response["Content-Encoding"], "br")
+
+    def test_compress_stream(self):
+        """Тест на сжатие потокового ответа по частям.
+
+        Проверяет, что каждое событие text/event-stream можно распаковать
+        сразу после получения его части, не дожидаясь следующих.
+        """
+        events = [b"data: %d\n\n" % number for number in range(100)]
+        encodings = ["gzip"] + (["br"] if brotli else [])
+        for encoding in encodings:
+            with self.subTest(encoding=encoding):
+                response = self.compress(
+                    StreamingHttpResponse(
+                        iter(events), content_type="text/event-stream"
+                    ),
+                    encoding,
+                )
+                self.assertEqual(response["Content-Encoding"], encoding)
+                if encoding == "gzip":
+                    decompress = zlib.decompressobj(31).decompress
+                else:
+                    decompress = brotli.Decompressor().process
+                chunks = iter(response.streaming_content)
+                with self.assertLogs("config.compression", "INFO"):
+                    for event in events:
+                        data = b""
+                        while not data:
+                            data = decompress(next(chunks))
+                        self.assertEqual(data, event)
+                    for chunk in chunks:
+                        self.assertEqual(decompress(chunk), b"")
+
+
+@override_settings(THROTTLE_RATES={"user": (20, 1), "anon": (20, 1)})
+class ThrottlingTestCase(APITestCase):
+    """Тесты для ограничения частоты и параллельности запросов."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_token_bucket(self):
+        """Тест на ведро токенов.
+
+        Проверяет, что запрос к трекеру стоит 10 токенов, а после исчерпания
+        ведра клиент получает 429 с заголовком Retry-After.
+        """
+        url = reverse("task_tracker:tracker")
+        for _ in range(2):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "10")
+
+    def test_token_bucket_refill(self):
+        """Тест на наполнение ведра.
+
+        Проверяет, что ключ ведра истекает, когда ведро снова наполняется,
+        и следующий запрос отсчитывает TAT от текущего времени одним incr.
+        """
+        url = reverse("task_tracker:tracker")
+        key = "throttle:bucket:ip:127.0.0.1"
+        now = time.time()
+        with mock.patch("time.time", return_value=now):
+            self.client.get(url)
+            self.assertEqual(cache.get(key), int(now * 1000) + 10000)
+        with mock.patch("time.time", return_value=now + 11):
+            self.assertIsNone(cache.get(key))
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+            self.assertEqual(cache.get(key), int((now + 11) * 1000) + 10000)
+
+    def test_concurrency_limit(self):
+        """Тест на предел параллельных тяжелых запросов."""
+        key = "throttle:inflight:TaskImportantListAPIView:ip:127.0.0.1"
+        cache.set(key, 2)
+        response = self.client.get(reverse("task_tracker:tracker"))
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(cache.get(key), 2)
+        cache.set(key, 1)
+        response = self.client.get(reverse("task_tracker:tracker"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(cache.get(key), 1)
+
+
+class SlowQueryTestCase(APITestCase):
+    """Тесты для журнала медленных запросов."""
+
+    def test_fingerprint(self):
+        """Тест на нормализацию запроса: значения и длина списков IN
+        не влияют на отпечаток."""
+        first = "SELECT * FROM task WHERE id IN (%s, %s) AND name = 'a'  LIMIT 21"
+        second = "SELECT * FROM task WHERE id IN (%s) AND name = 'b' LIMIT 5"
+        self.assertEqual(
+            normalize_sql(first),
+            "SELECT * FROM task WHERE id IN (...) AND name = ? LIMIT ?",
+        )
+        self.assertEqual(sql_fingerprint(first), sql_fingerprint(second))
+
+    def test_slow_query_log(self):
+        """Тест на запись медленных запросов и отчет по ним.
+
+        С нулевым порогом каждый запрос списка задач попадает в журнал
+        с именем маршрута, план выполнения снимается на том же подключении
+        один раз для отпечатка, отчет группирует повторы по отпечатку.
+        """
+        cache.clear()
+        Task.objects.create(name="Задача", status="todo")
+        with tempfile.TemporaryDirectory() as directory:
+            log = Path(directory) / "slow.jsonl"
+            with self.assertLogs("config.slow_queries", "WARNING"), override_settings(
+                SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_LOG=log
+            ), mock.patch.object(connections, "create_connection") as create:
+                for _ in range(2):
+                    response = self.client.get(reverse("task_tracker:task-list"))
+                    self.assertEqual(response.status_code, status.HTTP_200_OK)
+            create.assert_not_called()
+            records = read_records(log)
+            selects = [r for r in records if r["sql"].startswith("SELECT")]
+            self.assertTrue(selects)
+            self.assertEqual(selects[0]["view"], "task_tracker:task-list")
+            self.assertIn("scan", selects[0]["plan"].lower())
+            fingerprint = selects[0]["fingerprint"]
+            plans = [r["plan"] for r in selects if r["fingerprint"] == fingerprint]
+            self.assertEqual(len(plans), 2)
+            self.assertIsNone(plans[1])
+            output = StringIO()
+            call_command("slow_queries", file=log, plan=True, reset=True, stdout=output)
+            self.assertIn(f"{fingerprint}  всего", output.getvalue())
+            self.assertIn("task_tracker:task-list (2)", output.getvalue())
+            self.assertFalse(log.exists())
+
+
+class ProfilingTestCase(APITestCase):
+    """Тесты для выборочного профилирования запросов."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_stack_sampler(self):
+        """Тест на снятие стеков потока в свернутом формате."""
+        sampler = StackSampler(threading.get_ident(), 0.001)
+        sampler.start()
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            pass
+        stacks = sampler.stop()
+        stack, _ = stacks.most_common(1)[0]
+        self.assertTrue(stack.endswith("config.tests:test_stack_sampler"))
+
+    def test_profile_request(self):
+        """Тест на профилирование запроса по заголовку X-Profile.
+
+        Проверяет, что заголовок действует только для сотрудников, профиль
+        записывается с именем маршрута, а отчет сохраняет свернутые стеки
+        с именем маршрута в корне.
+        """
+        url = reverse("task_tracker:tracker")
+        user = User.objects.create(email="staff@example.com")
+        with tempfile.TemporaryDirectory() as directory:
+            log = Path(directory) / "profiles.jsonl"
+            folded = Path(directory) / "tracker.folded"
+            with override_settings(PROFILING_LOG=log, PROFILING_INTERVAL_MS=1):
+                self.client.force_authenticate(user=user)
+                response = self.client.get(url, HTTP_X_PROFILE="1")
+                self.assertFalse(response.has_header("X-Profile-Samples"))
+                user.is_staff = True
+                user.save()
+                response = self.client.get(url, HTTP_X_PROFILE="1")
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertTrue(response.has_header("X-Profile-Samples"))
+            profiles = read_profiles(log)
+            self.assertEqual(len(profiles), 1)
+            self.assertEqual(profiles[0]["url_name"], "task_tracker:tracker")
+            output = StringIO()
+            call_command(
+                "profile_report", file=log, folded=folded, reset=True, stdout=output
+            )
+            self.assertIn("task_tracker:tracker: запросов 1", output.getvalue())
+            for line in folded.read_text().splitlines():
+                self.assertTrue(line.startswith("task_tracker:tracker;"))
+            self.assertFalse(log.exists())
+
+    def test_profile_request_bad_credentials(self):
+        """Тест на заголовок X-Profile с неверными учетными данными.
+
+        Проверяет, что ошибка аутентификации при проверке сотрудника не
+        превращается в 500: ответ такой же, как без заголовка.
+        """
+        url = reverse("task_tracker:tracker")
+        headers = {"HTTP_AUTHORIZATION": "Basic Zm9vOmJhcg=="}
+        expected = self.client.get(url, **headers).status_code
+        response = self.client.get(url, HTTP_X_PROFILE="1", **headers)
+        self.assertEqual(response.status_code, expected)
+        self.assertFalse(response.has_header("X-Profile-Samples"))
+
+
+class EventBrokerTestCase(SimpleTestCase):
+    """Тесты для брокера событий."""
+
+    def test_backpressure(self):
+        """Тест на переполнение очереди подписчика: старые события
+        отбрасываются, а подписчик узнает, сколько событий пропущено."""
+        broker = LocalBroker()
+        subscription = broker.subscribe(lambda event: event["id"] > 0, maxsize=2)
+        for pk in range(5):
+            broker.publish({"type": "task.saved", "id": pk})
+        events, dropped = subscription.get(0)
+        self.assertEqual([event["id"] for event in events], [3, 4])
+        self.assertEqual(dropped, 2)
+        subscription.close()
+        self.assertFalse(broker.active)
+
+    def test_async_subscription(self):
+        """Тест на получение события из другого потока в цикле asyncio."""
+        broker = LocalBroker()
+        subscription = broker.subscribe()
+
+        async def receive():
+            asyncio.get_running_loop().call_later(
+                0.01,
+                lambda: threading.Thread(
+                    target=broker.publish, args=({"type": "employee.saved", "id": 1},)
+                ).start(),
+            )
+            return await subscription.aget(5)
+
+        events, dropped = asyncio.run(receive())
+        self.assertEqual(events, [{"type": "employee.saved", "id": 1}])
+        self.assertEqual(dropped, 0)
@@ -0,0 +1,118 @@
+"""
+Ограничение частоты и параллельности запросов к API.
+
+TokenBucketThrottle ведет для каждого клиента ведро токенов: запрос к
+представлению стоит throttle_cost токенов (по умолчанию 1), ведро
+пополняется с постоянной скоростью до своей емкости. Состояние ведра
+хранится в кэше одним счетчиком и меняется только атомарными операциями
+add/incr/decr. Ограничение общее для нескольких воркеров только с общим
+кэшем (Redis, Memcached): с LocMemCache у каждого процесса свое ведро,
+об этом предупреждает проверка config.W001.
+
+ConcurrencyLimitMixin ограничивает количество одновременно выполняемых
+тяжелых запросов одного клиента. Превышение любого ограничения дает
+ответ 429 с заголовком Retry-After.
+"""
+
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+
+def client_ident(throttle, request):
+    """Возвращает идентификатор клиента: пользователя или IP-адрес."""
+    if request.user and request.user.is_authenticated:
+        return f"user:{request.user.pk}", "user"
+    return f"ip:{throttle.get_ident(request)}", "anon"
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Ведро токенов на клиента с весами запросов по представлениям.
+
+    Реализовано как GCRA: в кэше хранится теоретическое время прибытия
+    (TAT) в миллисекундах. Запрос стоимостью cost сдвигает TAT на
+    cost * interval, где interval - время пополнения одного токена, и
+    допускается, если TAT опережает текущее время не больше чем на
+    емкость ведра. Емкость и скорость пополнения задаются в
+    THROTTLE_RATES отдельно для пользователей и анонимных клиентов.
+
+    Ключ живет, пока ведро не наполнится (TAT не отстанет от текущего
+    времени), поэтому TAT сдвигается одним incr: устаревший TAT не
+    догоняется отдельной записью, истекший ключ заново создается
+    add с текущим временем.
+    """
+
+    cache_format = "throttle:bucket:{}"
+
+    def allow_request(self, request, view):
+        ident, scope = client_ident(self, request)
+        capacity, refill_rate = settings.THROTTLE_RATES[scope]
+        interval = 1000 / refill_rate
+        cost = getattr(view, "throttle_cost", 1)
+        step = round(cost * interval)
+        key = self.cache_format.format(ident)
+        now = int(time.time() * 1000)
+        timeout = math.ceil(capacity / refill_rate) + 1
+        cache.add(key, now, timeout)
+        try:
+            tat = cache.incr(key, step)
+        except ValueError:
+            # Ключ истек между add и incr.
+            cache.add(key, now + step, timeout)
+            tat = now + step
+        allowed_until = now + round(capacity * interval)
+        if tat > allowed_until:
+            cache.decr(key, step)
+            self.wait_seconds = (tat - allowed_until) / 1000
+            return False
+        # Ключ истекает, когда ведро снова наполнится.
+        cache.touch(key, max(math.ceil((tat - now) / 1000), 1))
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class ConcurrencyLimitMixin:
+    """Примесь, ограничивающая число параллельных запросов клиента.
+
+    Представление задает max_concurrency. Слот занимается после проверки
+    аутентификации и частоты запросов и освобождается по окончании
+    обработки. Счетчик в кэше имеет время жизни, поэтому слоты, не
+    освобожденные из-за падения воркера, со временем освобождаются сами.
+    """
+
+    max_concurrency = None
+    cache_format = "throttle:inflight:{}:{}"
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.max_concurrency is None:
+            return
+        ident, _ = client_ident(BaseThrottle(), request)
+        key = self.cache_format.format(type(self).__name__, ident)
+        timeout = settings.THROTTLE_INFLIGHT_TIMEOUT
+        cache.add(key, 0, timeout)
+        try:
+            inflight = cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, timeout)
+            inflight = 1
+        self._inflight_key = key
+        if inflight > self.max_concurrency:
+            raise Throttled(wait=settings.THROTTLE_CONCURRENCY_RETRY_AFTER)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            key = self.__dict__.pop("_inflight_key", None)
+            if key is not None:
+                try:
+                    cache.decr(key)
+                except ValueError:
+                    pass
@@ -0,0 +1,49 @@
+"""
+Триграммные индексы для поиска в админке.
+
+Поиск admin (icontains) на PostgreSQL выполняется как
+UPPER(поле) LIKE UPPER(%s), поэтому индексы строятся по UPPER(поле)
+с классом операторов gin_trgm_ops. На других СУБД и без расширения
+pg_trgm индексы не создаются.
+"""
+
+from django.db import migrations
+
+
+def trigram_indexes(table, indexes):
+    """Возвращает операцию миграции, создающую триграммные индексы.
+
+    Аргументы:
+        table (str): Имя таблицы.
+        indexes (dict): Колонки по имени индекса.
+
+    Возвращает:
+        RunPython: Операция создания индексов с обратной операцией удаления.
+    """
+
+    def create(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+            )
+            if cursor.fetchone() is None:
+                return
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        qn = schema_editor.quote_name
+        for name, column in indexes.items():
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS {qn(name)} ON {qn(table)} "
+                f"USING gin (UPPER({qn(column)}) gin_trgm_ops)"
+            )
+
+    def drop(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for name in indexes:
+            schema_editor.execute(
+                f"DROP INDEX IF EXISTS {schema_editor.quote_name(name)}"
+            )
+
+    return migrations.RunPython(create, drop)
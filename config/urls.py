@@ -1,34 +1,36 @@
 from django.contrib import admin
-from django.urls import include, path
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
-
-# Представление схемы для документации API
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Документация API",
-        default_version="v1",
-        description="Описание вашего API",
-        terms_of_service="https://www.example.com/policies/terms/",
-        contact=openapi.Contact(email="contact@example.com"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+from django.urls import path
+
+from config.urls_api import urlpatterns as api_urlpatterns
+
+
+def lazy_schema_view(renderer):
+    """Создает представление документации, импортирующее drf-yasg при первом запросе.
+
+    Аргументы:
+        renderer (str): Интерфейс документации, 'swagger' или 'redoc'.
+
+    Возвращает:
+        function: Представление Django.
+    """
+    view = None
+
+    def schema(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            from config.schema import SchemaView
+
+            view = SchemaView.with_ui(renderer, cache_timeout=0)
+        return view(request, *args, **kwargs)
+
+    return schema
+
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("users/", include("users.urls", namespace="users")),
-    path("employees/", include("employees.urls", namespace="employees")),
-    path("task_tracker/", include("task_tracker.urls", namespace="task_tracker")),
-    path(
-        "swagger/",
-        schema_view.with_ui("swagger", cache_timeout=0),
-        name="schema-swagger-ui",
-    ),
-    path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
+    *api_urlpatterns,
+    path("swagger/", lazy_schema_view("swagger"), name="schema-swagger-ui"),
+    path("redoc/", lazy_schema_view("redoc"), name="schema-redoc"),
 ]
 
 """
@@ -44,4 +46,6 @@ urlpatterns = [
 - ReDoc для документации API: доступен по адресу /redoc/
 
 Документация API генерируется с использованием библиотеки drf-yasg и доступна публично.
+Схема собирается заранее командой openapi_schema и отдается из файла.
+Модули drf-yasg импортируются только при первом обращении к документации.
 """
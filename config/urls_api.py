@@ -0,0 +1,16 @@
+from django.urls import include, path
+
+urlpatterns = [
+    path("users/", include("users.urls", namespace="users")),
+    path("employees/", include("employees.urls", namespace="employees")),
+    path("task_tracker/", include("task_tracker.urls", namespace="task_tracker")),
+]
+
+"""
+Конфигурация URL только для API.
+
+Используется облегченным профилем настроек config.settings_api: без
+административного интерфейса и документации API, чтобы воркеры,
+обслуживающие только API, не импортировали admin и drf-yasg при запуске.
+Основная конфигурация config.urls включает эти же шаблоны.
+"""
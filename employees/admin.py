@@ -1,4 +1,6 @@
 from django.contrib import admin
+
+from config.paginators import EstimatedCountPaginator
 from employees.models import Employee
 
 
@@ -14,6 +16,16 @@ class EmployeeAdmin(admin.ModelAdmin):
             - id: Уникальный идентификатор сотрудника.
             - full_name: Полное имя сотрудника.
             - post: Должность сотрудника.
+        search_fields (tuple): Поля поиска, поиск использует триграммные индексы.
+            Также используются автодополнением в форме задачи.
+        paginator (EstimatedCountPaginator): Пагинатор с оценочным количеством строк.
+        show_full_result_count (bool): Отключает дополнительный COUNT(*) при фильтрации.
+
+    Фильтра по должности нет: для списка значений фильтр выполнял бы
+    SELECT DISTINCT по всей таблице на каждой странице списка.
     """
 
     list_display = ("id", "full_name", "post")
+    search_fields = ("full_name", "post")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,204 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import PercentRank, Rank, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from employees.models import Employee
+from task_tracker.models import ArchivedTask, Task
+
+PERIODS = {"week": TruncWeek, "month": TruncMonth}
+
+GROUPS = {
+    "employee": ("employee_id", "employee__full_name", "employee__post"),
+    "post": ("employee__post",),
+}
+
+
+def next_bucket(period, bucket):
+    """Возвращает начало следующего интервала.
+
+    Аргументы:
+        period (str): Размер интервала, 'week' или 'month'.
+        bucket (date): Начало текущего интервала.
+
+    Возвращает:
+        date: Начало следующего интервала.
+    """
+    if period == "week":
+        return bucket + timedelta(days=7)
+    return (bucket.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def bucket_starts(period, date_from, date_to):
+    """Возвращает начала всех интервалов, пересекающих диапазон дат.
+
+    Аргументы:
+        period (str): Размер интервала, 'week' или 'month'.
+        date_from (date): Начало диапазона.
+        date_to (date): Конец диапазона включительно.
+
+    Возвращает:
+        list: Начала интервалов по возрастанию.
+    """
+    if period == "week":
+        bucket = date_from - timedelta(days=date_from.weekday())
+    else:
+        bucket = date_from.replace(day=1)
+    buckets = []
+    while bucket <= date_to:
+        buckets.append(bucket)
+        bucket = next_bucket(period, bucket)
+    return buckets
+
+
+def _bucket_counts(model, period, group_by, date_from, date_to, today):
+    """Возвращает группирующий запрос статистики по таблице задач model.
+
+    Аргументы:
+        model (Model): Task или ArchivedTask.
+        period (str): Размер интервала, 'week' или 'month'.
+        group_by (str): Группировка, 'employee' или 'post'.
+        date_from (date): Начало первого интервала.
+        date_to (date): Начало интервала, следующего за последним.
+        today (date): Текущая дата для подсчета просроченных задач.
+
+    Возвращает:
+        QuerySet: Строки статистики без сортировки.
+    """
+    return (
+        model.objects.filter(
+            employee__isnull=False, deadline__gte=date_from, deadline__lt=date_to
+        )
+        .annotate(bucket=PERIODS[period]("deadline"))
+        .values("bucket", *GROUPS[group_by])
+        .annotate(
+            active=Count("pk", filter=Q(status="start")),
+            finished=Count("pk", filter=Q(status="finish")),
+            overdue=Count("pk", filter=Q(status="start", deadline__lt=today)),
+        )
+        .order_by()
+    )
+
+
+def _query_buckets(period, group_by, date_from, date_to, today):
+    """Считает задачи по интервалам одним группирующим запросом.
+
+    Завершенные задачи, перенесенные в архив, учитываются вместе
+    с задачами трекера: строки обеих таблиц объединяются UNION ALL
+    и складываются по интервалу и группе.
+
+    Аргументы:
+        period (str): Размер интервала, 'week' или 'month'.
+        group_by (str): Группировка, 'employee' или 'post'.
+        date_from (date): Начало первого интервала.
+        date_to (date): Начало интервала, следующего за последним.
+        today (date): Текущая дата для подсчета просроченных задач.
+
+    Возвращает:
+        dict: Строки статистики по началу интервала.
+    """
+    args = (period, group_by, date_from, date_to, today)
+    rows = (
+        _bucket_counts(Task, *args)
+        .union(_bucket_counts(ArchivedTask, *args), all=True)
+        .order_by("bucket", *GROUPS[group_by])
+    )
+    result = {}
+    merged = {}
+    for row in rows:
+        key = tuple(row[field] for field in ("bucket", *GROUPS[group_by]))
+        if key in merged:
+            for field in ("active", "finished", "overdue"):
+                merged[key][field] += row[field]
+            continue
+        bucket = row.pop("bucket")
+        if group_by == "employee":
+            row["employee"] = row.pop("employee_id")
+            row["full_name"] = row.pop("employee__full_name")
+        row["post"] = row.pop("employee__post")
+        merged[key] = row
+        result.setdefault(bucket, []).append(row)
+    return result
+
+
+def workload_analytics(period, group_by, date_from, date_to):
+    """Возвращает загрузку сотрудников по интервалам сроков исполнения.
+
+    Для каждого интервала (неделя или месяц по полю deadline) считается
+    количество активных, завершенных и просроченных задач по сотрудникам
+    или должностям, включая задачи в архиве. Результат каждого интервала кэшируется отдельно
+    на ANALYTICS_CACHE_TIMEOUT секунд, а недостающие интервалы считаются
+    одним запросом.
+
+    Аргументы:
+        period (str): Размер интервала, 'week' или 'month'.
+        group_by (str): Группировка, 'employee' или 'post'.
+        date_from (date): Начало диапазона.
+        date_to (date): Конец диапазона включительно.
+
+    Возвращает:
+        list: Интервалы со статистикой по возрастанию даты.
+    """
+    today = timezone.localdate()
+    buckets = bucket_starts(period, date_from, date_to)
+    keys = {
+        bucket: f"employees:analytics:{period}:{group_by}:{bucket}:{today}"
+        for bucket in buckets
+    }
+    cached = cache.get_many(keys.values())
+    missing = [bucket for bucket in buckets if keys[bucket] not in cached]
+    if missing:
+        computed = _query_buckets(
+            period,
+            group_by,
+            missing[0],
+            next_bucket(period, missing[-1]),
+            today,
+        )
+        fresh = {keys[bucket]: computed.get(bucket, []) for bucket in missing}
+        cache.set_many(fresh, settings.ANALYTICS_CACHE_TIMEOUT)
+        cached.update(fresh)
+    return [{"bucket": bucket, "rows": cached[keys[bucket]]} for bucket in buckets]
+
+
+def employee_ranking(top=None, offset=0, limit=None):
+    """Возвращает рейтинг сотрудников по количеству активных задач.
+
+    Ранги считаются в базе данных оконными функциями RANK и PERCENT_RANK
+    по всем сотрудникам с активными задачами и отдельно внутри каждой
+    должности. Отбор лучших по должности и срез выполняются в том же
+    SQL запросе, поэтому из базы данных читается только нужная часть.
+
+    Аргументы:
+        top (int): Сколько лучших сотрудников оставить в каждой должности.
+        offset (int): Сколько строк пропустить.
+        limit (int): Сколько строк вернуть, по умолчанию все.
+
+    Возвращает:
+        QuerySet: Сотрудники с полями active_tasks_count, rank, percent_rank,
+        post_rank и post_percent_rank по убыванию количества активных задач.
+    """
+    order_by = F("active_tasks_count").desc()
+    queryset = (
+        Employee.objects.annotate(
+            active_tasks_count=Count("tasks", filter=Q(tasks__status="start"))
+        )
+        .filter(active_tasks_count__gt=0)
+        .annotate(
+            rank=Window(Rank(), order_by=order_by),
+            percent_rank=Window(PercentRank(), order_by=order_by),
+            post_rank=Window(Rank(), partition_by=F("post"), order_by=order_by),
+            post_percent_rank=Window(
+                PercentRank(), partition_by=F("post"), order_by=order_by
+            ),
+        )
+        .order_by("-active_tasks_count", "pk")
+    )
+    if top is not None:
+        queryset = queryset.filter(post_rank__lte=top)
+    if limit is None:
+        return queryset[offset:]
+    return queryset[offset : offset + limit]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.2 on 2026-10-19 17:17
+
+from django.db import migrations, models
+
+from config.trigram import trigram_indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0002_version"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(fields=["post"], name="employee_post_idx"),
+        ),
+        trigram_indexes(
+            "employees_employee",
+            {
+                "employee_full_name_trgm_idx": "full_name",
+                "employee_post_trgm_idx": "post",
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.2 on 2026-10-19 17:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0003_admin_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(
+                fields=["id"], include=("version",), name="employee_id_version_idx"
+            ),
+        ),
+    ]
@@ -12,6 +12,7 @@ class Employee(models.Model):
     Атрибуты:
         full_name (CharField): Полное имя сотрудника, максимальная длина - 100 символов.
         post (CharField): Должность сотрудника, максимальная длина - 100 символов.
+        version (PositiveIntegerField): Версия записи, увеличивается при каждом изменении.
     """
 
     full_name = models.CharField(
@@ -20,13 +21,33 @@ class Employee(models.Model):
     post = models.CharField(
         max_length=100, verbose_name="Post", help_text="Введите должность", **NULLABLE
     )
+    version = models.PositiveIntegerField(
+        default=1, verbose_name="Version", help_text="Версия записи"
+    )
 
     def __str__(self):
         """Возвращает полное имя сотрудника как строковое представление."""
         return self.full_name
 
+    def save(self, *args, **kwargs):
+        """Сохраняет сотрудника, увеличивая версию при изменении существующей записи.
+
+        Версия не проверяется: конфликты изменений отсекаются только в API
+        (config.concurrency).
+        """
+        if not self._state.adding:
+            self.version += 1
+        super().save(*args, **kwargs)
+
     class Meta:
         """Метаданные для модели Employee."""
 
         verbose_name = "Employee"
         verbose_name_plural = "Employees"
+        indexes = [
+            models.Index(fields=["post"], name="employee_post_idx"),
+            # Покрывающий индекс для условных GET/HEAD.
+            models.Index(
+                fields=["id"], include=["version"], name="employee_id_version_idx"
+            ),
+        ]
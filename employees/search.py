@@ -0,0 +1,211 @@
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+
+from employees.models import Employee
+
+
+def tokenize(*values):
+    """Разбивает строки на слова в нижнем регистре.
+
+    Аргументы:
+        values (str): Строки, например ФИО и должность.
+
+    Возвращает:
+        set: Слова всех непустых строк.
+    """
+    return {word for value in values if value for word in value.lower().split()}
+
+
+class EmployeeIndex:
+    """Префиксный индекс сотрудников в памяти процесса.
+
+    Слова ФИО и должности всех сотрудников хранятся в отсортированном
+    списке пар (слово, id), поиск по префиксу выполняется бинарным поиском.
+    Индекс строится при первом запросе в фоновом потоке и перестраивается
+    раз в EMPLOYEE_INDEX_TTL секунд, пока он строится, поиск выполняется
+    в базе данных. Между перестроениями индекс обновляется обработчиками
+    сигналов сотрудника, изменения, пришедшие во время перестроения,
+    применяются к новому индексу перед его заменой.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = []
+        self._records = {}
+        self._built_at = None
+        self._building = False
+        self._pending = None
+
+    @property
+    def is_warm(self):
+        """Проверяет, построен ли индекс."""
+        return self._built_at is not None
+
+    def build(self):
+        """Строит индекс по всем сотрудникам одним запросом.
+
+        Изменения сотрудников, пришедшие от сигналов во время запроса,
+        копятся в _pending и накладываются на прочитанные записи: иначе
+        замена индекса затерла бы их данными, прочитанными раньше.
+        """
+        with self._lock:
+            self._pending = {}
+        try:
+            records = {
+                pk: (full_name, post)
+                for pk, full_name, post in Employee.objects.values_list(
+                    "pk", "full_name", "post"
+                ).iterator()
+            }
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            for pk, values in self._pending.items():
+                if values is None:
+                    records.pop(pk, None)
+                else:
+                    records[pk] = values
+            self._pending = None
+            self._records = records
+            self._entries = sorted(
+                (word, pk)
+                for pk, values in records.items()
+                for word in tokenize(*values)
+            )
+            self._built_at = time.monotonic()
+            self._building = False
+
+    def ensure_built(self):
+        """Запускает построение индекса в фоне, если он пуст или устарел."""
+        with self._lock:
+            fresh = (
+                self._built_at is not None
+                and time.monotonic() - self._built_at < settings.EMPLOYEE_INDEX_TTL
+            )
+            if fresh or self._building:
+                return
+            self._building = True
+        threading.Thread(target=self._build_in_thread, daemon=True).start()
+
+    def update(self, pk, full_name, post):
+        """Добавляет или обновляет сотрудника в построенном индексе."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending[pk] = (full_name, post)
+            if self._built_at is None:
+                return
+            self._remove(pk)
+            self._records[pk] = (full_name, post)
+            for word in tokenize(full_name, post):
+                insort(self._entries, (word, pk))
+
+    def remove(self, pk):
+        """Удаляет сотрудника из построенного индекса."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending[pk] = None
+            if self._built_at is not None:
+                self._remove(pk)
+
+    def search(self, query, limit):
+        """Ищет сотрудников, у которых каждое слово запроса начинает слово
+        ФИО или должности.
+
+        Аргументы:
+            query (str): Строка поиска.
+            limit (int): Наибольшее количество результатов.
+
+        Возвращает:
+            list: Кортежи (id, full_name, post) в порядке найденных слов.
+        """
+        words = sorted(tokenize(query), key=len, reverse=True)
+        if not words:
+            return []
+        first, rest = words[0], words[1:]
+        results, seen = [], set()
+        with self._lock:
+            position = bisect_left(self._entries, (first,))
+            while position < len(self._entries) and len(results) < limit:
+                word, pk = self._entries[position]
+                position += 1
+                if not word.startswith(first):
+                    break
+                if pk in seen:
+                    continue
+                seen.add(pk)
+                full_name, post = self._records[pk]
+                tokens = tokenize(full_name, post)
+                if all(any(token.startswith(w) for token in tokens) for w in rest):
+                    results.append((pk, full_name, post))
+        return results
+
+    def _remove(self, pk):
+        """Удаляет слова сотрудника из индекса, блокировка уже захвачена."""
+        values = self._records.pop(pk, None)
+        if values is None:
+            return
+        for word in tokenize(*values):
+            position = bisect_left(self._entries, (word, pk))
+            if position < len(self._entries) and self._entries[position] == (word, pk):
+                del self._entries[position]
+
+    def _build_in_thread(self):
+        """Строит индекс из фонового потока."""
+        close_old_connections()
+        try:
+            self.build()
+        except Exception:
+            with self._lock:
+                self._building = False
+            raise
+        finally:
+            close_old_connections()
+
+
+employee_index = EmployeeIndex()
+
+
+def autocomplete(query, limit):
+    """Подсказки сотрудников по началу слов ФИО или должности.
+
+    Пока индекс в памяти не построен, запрос выполняется в базе данных
+    с тем же условием, что и в индексе: каждое слово запроса начинает
+    слово ФИО или должности. Поиск по вхождению отбирает строки по
+    триграммным индексам, регулярное выражение оставляет совпадения
+    с началом слова.
+
+    Аргументы:
+        query (str): Строка поиска.
+        limit (int): Наибольшее количество результатов.
+
+    Возвращает:
+        dict: Источник результатов ('index' или 'db') и список сотрудников.
+    """
+    employee_index.ensure_built()
+    if employee_index.is_warm:
+        source, rows = "index", employee_index.search(query, limit)
+    else:
+        condition = Q()
+        for word in query.split():
+            pattern = r"(^|\s)" + re.escape(word)
+            condition &= Q(full_name__icontains=word, full_name__iregex=pattern) | Q(
+                post__icontains=word, post__iregex=pattern
+            )
+        source = "db"
+        rows = Employee.objects.filter(condition).order_by("full_name", "pk")
+        rows = rows.values_list("pk", "full_name", "post")[:limit]
+    return {
+        "source": source,
+        "results": [
+            {"id": pk, "full_name": full_name, "post": post}
+            for pk, full_name, post in rows
+        ],
+    }
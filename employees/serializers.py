@@ -1,5 +1,10 @@
-from rest_framework.fields import SerializerMethodField
-from rest_framework.serializers import ModelSerializer
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.fields import (CharField, ChoiceField, DateField,
+                                   FloatField, IntegerField)
+from rest_framework.serializers import (ModelSerializer, Serializer,
+                                        ValidationError)
 
 from employees.models import Employee
 from task_tracker.serializers import TaskSerializer
@@ -18,6 +23,7 @@ class EmployeeSerializer(ModelSerializer):
     class Meta:
         model = Employee
         fields = "__all__"
+        read_only_fields = ("version",)
 
 
 class EmployeeTaskSerializer(TaskSerializer):
@@ -28,12 +34,21 @@ class EmployeeTaskSerializer(TaskSerializer):
 
     Атрибуты:
         tasks (list): Список задач, связанных с работником.
-        active_tasks_count (int): Количество активных задач у работника.
+        active_tasks_count (int): Количество активных задач у работника,
+            та же аннотация, по которой считаются места.
+        rank (int): Место работника по количеству активных задач.
+        percent_rank (float): Относительное место от 0 (первое) до 1 (последнее).
+        post_rank (int): Место работника внутри его должности.
+        post_percent_rank (float): Относительное место внутри должности.
         Meta (class): Определяет модель и поля, которые будут сериализованы.
     """
 
     tasks = TaskSerializer(many=True, read_only=True)
-    active_tasks_count = SerializerMethodField()
+    active_tasks_count = IntegerField(read_only=True)
+    rank = IntegerField(read_only=True)
+    percent_rank = FloatField(read_only=True)
+    post_rank = IntegerField(read_only=True)
+    post_percent_rank = FloatField(read_only=True)
 
     class Meta:
         model = Employee
@@ -43,15 +58,62 @@ class EmployeeTaskSerializer(TaskSerializer):
             "post",
             "tasks",
             "active_tasks_count",
+            "rank",
+            "percent_rank",
+            "post_rank",
+            "post_percent_rank",
         )
 
-    def get_active_tasks_count(self, obj):
-        """Возвращает количество активных задач у работника.
 
-        Аргументы:
-            obj (Employee): Экземпляр модели Employee.
+class WorkloadAnalyticsQuerySerializer(Serializer):
+    """Сериализатор параметров аналитики загрузки сотрудников.
+
+    Атрибуты:
+        period (ChoiceField): Размер интервала, неделя или месяц.
+        group_by (ChoiceField): Группировка по сотруднику или должности.
+        date_from (DateField): Начало диапазона сроков, по умолчанию год назад.
+        date_to (DateField): Конец диапазона сроков, по умолчанию сегодня.
+    """
+
+    MAX_RANGE = timedelta(days=5 * 366)
+
+    period = ChoiceField(choices=("week", "month"), default="week")
+    group_by = ChoiceField(choices=("employee", "post"), default="employee")
+    date_from = DateField(required=False)
+    date_to = DateField(required=False)
+
+    def validate(self, attrs):
+        """Заполняет диапазон по умолчанию и ограничивает его длину."""
+        attrs.setdefault("date_to", timezone.localdate())
+        attrs.setdefault("date_from", attrs["date_to"] - timedelta(days=365))
+        if attrs["date_from"] > attrs["date_to"]:
+            raise ValidationError("date_from не может быть позже date_to.")
+        if attrs["date_to"] - attrs["date_from"] > self.MAX_RANGE:
+            raise ValidationError("Диапазон не может превышать пять лет.")
+        return attrs
+
+
+class EmployeeRankingQuerySerializer(Serializer):
+    """Сериализатор параметров рейтинга работников.
+
+    Атрибуты:
+        top (IntegerField): Сколько лучших работников оставить в каждой должности.
+        offset (IntegerField): Сколько строк пропустить.
+        limit (IntegerField): Сколько строк вернуть.
+    """
+
+    top = IntegerField(required=False, min_value=1)
+    offset = IntegerField(default=0, min_value=0)
+    limit = IntegerField(required=False, min_value=1, max_value=500)
+
+
+class AutocompleteQuerySerializer(Serializer):
+    """Сериализатор параметров подсказок сотрудников.
+
+    Атрибуты:
+        q (CharField): Начало слов ФИО или должности.
+        limit (IntegerField): Наибольшее количество подсказок.
+    """
 
-        Возвращает:
-            int: Количество активных задач.
-        """
-        return obj.tasks.count()  # Предполагается, что у объекта есть связь с задачами
+    q = CharField(max_length=100)
+    limit = IntegerField(default=10, min_value=1, max_value=50)
@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from employees.models import Employee
+from employees.search import employee_index
+
+
+@receiver(post_save, sender=Employee)
+def employee_saved(sender, instance, **kwargs):
+    """Обновляет сотрудника в индексе подсказок после фиксации транзакции."""
+    pk, full_name, post = instance.pk, instance.full_name, instance.post
+    transaction.on_commit(lambda: employee_index.update(pk, full_name, post))
+
+
+@receiver(post_delete, sender=Employee)
+def employee_deleted(sender, instance, **kwargs):
+    """Удаляет сотрудника из индекса подсказок после фиксации транзакции."""
+    pk = instance.pk
+    transaction.on_commit(lambda: employee_index.remove(pk))
@@ -1,23 +1,30 @@
+from unittest import mock
+
+from django.core.cache import cache
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from employees.models import Employee
-from task_tracker.models import Task
+from employees.search import EmployeeIndex
+from task_tracker.models import ArchivedTask, Task
 
 
 class EmployeeTestCase(APITestCase):
     """Тесты для модели работника."""
 
-    def setUp(self):
-        """Предварительная настройка для тестов.
-
-        Создает тестового работника, который будет использоваться в тестах.
-        """
-        self.employee = Employee.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        """Создает тестового работника один раз для всех тестов класса."""
+        cls.employee = Employee.objects.create(
             full_name="Тест имя", post="Тест должность"
         )
 
+    def setUp(self):
+        """Очищает кэш перед каждым тестом."""
+        cache.clear()
+
     def test_employee_create(self):
         """Тест на создание нового работника.
 
@@ -26,7 +33,8 @@ class EmployeeTestCase(APITestCase):
         """
         url = reverse("employees:employee-create")
         data = {"full_name": "Гладков Сергей", "post": "developer"}
-        response = self.client.post(url, data, format="json")
+        with self.assertNumQueries(1):
+            response = self.client.post(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response.data["full_name"], "Гладков Сергей")
         self.assertEqual(response.data["post"], "developer")
@@ -39,11 +47,25 @@ class EmployeeTestCase(APITestCase):
         корректно возвращается через API.
         """
         url = reverse("employees:employee-retrieve", args=(self.employee.id,))
-        response = self.client.get(url, format="json")
+        with self.assertNumQueries(2):
+            response = self.client.get(url, format="json")
         data = response.json()
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(data["full_name"], self.employee.full_name)
         self.assertEqual(data["post"], self.employee.post)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_employee_bulk_retrieve(self):
+        """Тест на пакетное получение работников по списку из тела запроса."""
+        url = reverse("employees:employee-bulk")
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                url, {"ids": [999999, self.employee.id]}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["id"], self.employee.id)
+        self.assertEqual(response.data["missing"], [999999])
 
     def test_employee_update(self):
         """Тест на обновление информации о работнике.
@@ -52,13 +74,45 @@ class EmployeeTestCase(APITestCase):
         через API и возвращаемые данные соответствуют ожидаемым.
         """
         url = reverse("employees:employee-update", args=(self.employee.id,))
-        response = self.client.patch(
-            url, data={"full_name": "updated name", "post": "update developer"}
-        )
+        with self.assertNumQueries(2):
+            response = self.client.patch(
+                url, data={"full_name": "updated name", "post": "update developer"}
+            )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["full_name"], "updated name")
         self.assertEqual(response.data["post"], "update developer")
 
+    def test_employee_update_conflict(self):
+        """Тест на конфликт версий при обновлении работника.
+
+        Проверяет, что обновление с устаревшей версией в If-Match
+        возвращает 412, с некорректным If-Match или несколькими версиями
+        в нем - 400, а для несуществующего работника - 404.
+        """
+        self.employee.full_name = "changed name"
+        self.employee.save()
+        url = reverse("employees:employee-update", args=(self.employee.id,))
+        with self.assertNumQueries(2):
+            response = self.client.patch(
+                url, data={"full_name": "updated name"}, HTTP_IF_MATCH='"1"'
+            )
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        response = self.client.patch(
+            url, data={"full_name": "updated name"}, HTTP_IF_MATCH='"v1"'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.patch(
+            url, data={"full_name": "updated name"}, HTTP_IF_MATCH='"1", "2"'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.full_name, "changed name")
+        url = reverse("employees:employee-update", args=(self.employee.id + 1,))
+        response = self.client.patch(
+            url, data={"full_name": "updated name"}, HTTP_IF_MATCH='"1"'
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_employee_delete(self):
         """Тест на удаление работника.
 
@@ -66,7 +120,8 @@ class EmployeeTestCase(APITestCase):
         и что количество работников в базе данных уменьшается.
         """
         url = reverse("employees:employee-delete", args=(self.employee.id,))
-        response = self.client.delete(url, format="json")
+        with self.assertNumQueries(4):
+            response = self.client.delete(url, format="json")
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(Employee.objects.count(), 0)
 
@@ -77,7 +132,8 @@ class EmployeeTestCase(APITestCase):
         через API и что количество работников соответствует ожидаемому.
         """
         url = reverse("employees:employee-list")
-        response = self.client.get(url, format="json")
+        with self.assertNumQueries(1):
+            response = self.client.get(url, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(Employee.objects.count(), 1)
 
@@ -95,7 +151,168 @@ class EmployeeTestCase(APITestCase):
             parent_task=None,
         )
         url = reverse("employees:employee-task")
-        response = self.client.get(url, format="json")
+        with self.assertNumQueries(2):
+            response = self.client.get(url, format="json")
         data = response.json()
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(data[0]["active_tasks_count"], 1)
+
+    def test_employee_task_ranking(self):
+        """Тест рейтинга работников по активным задачам.
+
+        Проверяет места по всей организации и внутри должности, отбор
+        лучших в каждой должности и срез рейтинга одним запросом.
+        """
+        second = Employee.objects.create(full_name="Второй", post="Тест должность")
+        other = Employee.objects.create(full_name="Другой", post="Другая должность")
+        for employee, count in ((self.employee, 3), (second, 1), (other, 2)):
+            for number in range(count):
+                Task.objects.create(name=f"{employee.id}-{number}", employee=employee)
+        url = reverse("employees:employee-task")
+        data = self.client.get(url).json()
+        self.assertEqual(
+            [(row["id"], row["rank"], row["post_rank"]) for row in data],
+            [(self.employee.id, 1, 1), (other.id, 2, 1), (second.id, 3, 2)],
+        )
+        self.assertEqual(data[2]["percent_rank"], 1.0)
+        data = self.client.get(url, {"top": 1}).json()
+        self.assertEqual([row["id"] for row in data], [self.employee.id, other.id])
+        with self.assertNumQueries(2):
+            data = self.client.get(url, {"offset": 1, "limit": 1}).json()
+        self.assertEqual([row["id"] for row in data], [other.id])
+
+    def test_employee_task_ranking_finished(self):
+        """Тест на количество активных задач в рейтинге.
+
+        Проверяет, что завершенные задачи не попадают в количество
+        активных задач, по которому считаются места.
+        """
+        other = Employee.objects.create(full_name="Другой", post="Тест должность")
+        Task.objects.create(name="Активная 1", employee=self.employee)
+        Task.objects.create(name="Активная 2", employee=other)
+        Task.objects.create(name="Активная 3", employee=other)
+        for number in range(3):
+            Task.objects.create(
+                name=f"Завершенная {number}", employee=self.employee, status="finish"
+            )
+        url = reverse("employees:employee-task")
+        data = self.client.get(url).json()
+        self.assertEqual(
+            [(row["id"], row["active_tasks_count"]) for row in data],
+            [(other.id, 2), (self.employee.id, 1)],
+        )
+        self.assertEqual(len(data[1]["tasks"]), 4)
+
+    def test_employee_analytics(self):
+        """Тест аналитики загрузки работников.
+
+        Проверяет, что задачи распределяются по неделям срока исполнения
+        и что считаются активные, завершенные и просроченные задачи,
+        в том числе задачи в архиве.
+        """
+        for deadline, task_status in (
+            ("2024-01-01", "start"),
+            ("2024-01-03", "finish"),
+            ("2024-01-10", "start"),
+        ):
+            Task.objects.create(
+                name=f"Задача {deadline}",
+                employee=self.employee,
+                deadline=deadline,
+                status=task_status,
+            )
+        ArchivedTask.objects.create(
+            id=Task.objects.latest("pk").pk + 1,
+            name="Архивная задача",
+            employee=self.employee,
+            deadline="2024-01-02",
+            status="finish",
+            archived_at=timezone.now(),
+        )
+        url = reverse("employees:employee-analytics")
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                url, {"date_from": "2024-01-01", "date_to": "2024-01-14"}
+            )
+        data = response.json()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(data["buckets"]), 2)
+        first_week = data["buckets"][0]
+        self.assertEqual(first_week["bucket"], "2024-01-01")
+        self.assertEqual(
+            first_week["rows"],
+            [
+                {
+                    "employee": self.employee.id,
+                    "full_name": "Тест имя",
+                    "post": "Тест должность",
+                    "active": 1,
+                    "finished": 2,
+                    "overdue": 1,
+                }
+            ],
+        )
+        response = self.client.get(url, {"group_by": "post", "period": "month"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_employee_autocomplete(self):
+        """Тест подсказок сотрудников.
+
+        Проверяет поиск по началу слов в базе данных, пока индекс не
+        построен, поиск по префиксам в построенном индексе и обновление
+        индекса сигналами. Тест работает с отдельным индексом, чтобы не
+        менять общий индекс процесса.
+        """
+        index = EmployeeIndex()
+        patch_search = mock.patch("employees.search.employee_index", index)
+        patch_signals = mock.patch("employees.signals.employee_index", index)
+        with patch_search, patch_signals:
+            self.check_autocomplete(index)
+
+    def check_autocomplete(self, index):
+        """Проверяет подсказки с индексом index."""
+        Employee.objects.create(full_name="Иванов Петр", post="Разработчик")
+        Employee.objects.create(full_name="Иванова Анна", post="Аналитик")
+        url = reverse("employees:employee-autocomplete")
+        with mock.patch.object(index, "ensure_built"):
+            with self.assertNumQueries(1):
+                response = self.client.get(url, {"q": "Иван"})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data["source"], "db")
+            self.assertEqual(len(response.data["results"]), 2)
+            response = self.client.get(url, {"q": "ванов"})
+            self.assertEqual(response.data["results"], [])
+
+        index.build()
+        response = self.client.get(url, {"q": "иван раз"})
+        self.assertEqual(response.data["source"], "index")
+        self.assertEqual(
+            [row["full_name"] for row in response.data["results"]], ["Иванов Петр"]
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee.full_name = "Иванцов Тест"
+            self.employee.save()
+        response = self.client.get(url, {"q": "иванц"})
+        self.assertEqual(response.data["results"][0]["id"], self.employee.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee.delete()
+        response = self.client.get(url, {"q": "иванц"})
+        self.assertEqual(response.data["results"], [])
+
+    def test_employee_index_rebuild(self):
+        """Тест на перестроение индекса подсказок.
+
+        Проверяет, что изменение сотрудника, пришедшее во время чтения
+        сотрудников из базы, не теряется при замене индекса.
+        """
+        index = EmployeeIndex()
+        rows = list(Employee.objects.values_list("pk", "full_name", "post"))
+
+        def values_list(*fields):
+            index.update(self.employee.pk, "Петров Новый", "Тест должность")
+            return mock.Mock(iterator=lambda: iter(rows))
+
+        with mock.patch.object(Employee.objects, "values_list", values_list):
+            index.build()
+        self.assertEqual(index.search("петров", 10)[0][0], self.employee.pk)
+        self.assertEqual(index.search("тест имя", 10), [])
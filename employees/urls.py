@@ -1,9 +1,12 @@
 from django.urls import path
 
 from employees.apps import EmployeesConfig
-from employees.views import (EmployeeCreateAPIView, EmployeeDestroyAPIView,
+from employees.views import (EmployeeAutocompleteAPIView,
+                             EmployeeBulkRetrieveAPIView,
+                             EmployeeCreateAPIView, EmployeeDestroyAPIView,
                              EmployeeListAPIView, EmployeeRetrieveAPIView,
-                             EmployeeTaskListAPIView, EmployeeUpdateAPIView)
+                             EmployeeTaskListAPIView, EmployeeUpdateAPIView,
+                             EmployeeWorkloadAnalyticsAPIView)
 
 app_name = EmployeesConfig.name
 
@@ -11,7 +14,18 @@ urlpatterns = [
     path("create/", EmployeeCreateAPIView.as_view(), name="employee-create"),
     path("list/", EmployeeListAPIView.as_view(), name="employee-list"),
     path("<int:pk>/", EmployeeRetrieveAPIView.as_view(), name="employee-retrieve"),
+    path("bulk/", EmployeeBulkRetrieveAPIView.as_view(), name="employee-bulk"),
     path("update/<int:pk>/", EmployeeUpdateAPIView.as_view(), name="employee-update"),
     path("delete/<int:pk>/", EmployeeDestroyAPIView.as_view(), name="employee-delete"),
     path("employee_task/", EmployeeTaskListAPIView.as_view(), name="employee-task"),
+    path(
+        "analytics/",
+        EmployeeWorkloadAnalyticsAPIView.as_view(),
+        name="employee-analytics",
+    ),
+    path(
+        "autocomplete/",
+        EmployeeAutocompleteAPIView.as_view(),
+        name="employee-autocomplete",
+    ),
 ]
\ No newline at end of file
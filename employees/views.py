@@ -1,13 +1,24 @@
-from django.db.models import Count, Q
 from rest_framework.generics import (CreateAPIView, DestroyAPIView,
                                      ListAPIView, RetrieveAPIView,
                                      UpdateAPIView)
-
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from config.concurrency import ConditionalRetrieveMixin, OptimisticUpdateMixin
+from config.db_router import ReplicaReadMixin
+from config.idempotency import IdempotencyMixin
+from config.object_cache import BulkRetrieveMixin
+from config.throttling import ConcurrencyLimitMixin
+from employees.analytics import employee_ranking, workload_analytics
 from employees.models import Employee
-from employees.serializers import EmployeeSerializer, EmployeeTaskSerializer
+from employees.search import autocomplete
+from employees.serializers import (AutocompleteQuerySerializer,
+                                   EmployeeRankingQuerySerializer,
+                                   EmployeeSerializer, EmployeeTaskSerializer,
+                                   WorkloadAnalyticsQuerySerializer)
 
 
-class EmployeeCreateAPIView(CreateAPIView):
+class EmployeeCreateAPIView(IdempotencyMixin, CreateAPIView):
     """Создание нового работника.
 
     Это представление обрабатывает запросы на создание нового работника
@@ -21,7 +32,7 @@ class EmployeeCreateAPIView(CreateAPIView):
     serializer_class = EmployeeSerializer
 
 
-class EmployeeListAPIView(ListAPIView):
+class EmployeeListAPIView(ReplicaReadMixin, ListAPIView):
     """Просмотр списка работников.
 
     Это представление возвращает список всех работников в системе.
@@ -37,12 +48,15 @@ class EmployeeListAPIView(ListAPIView):
     queryset = Employee.objects.all()
 
 
-class EmployeeRetrieveAPIView(RetrieveAPIView):
+class EmployeeRetrieveAPIView(
+    ReplicaReadMixin, ConditionalRetrieveMixin, RetrieveAPIView
+):
     """Просмотр информации о работнике.
 
     Это представление возвращает детальную информацию о конкретном работнике
     по его идентификатору. Использует сериализатор EmployeeSerializer для
-    преобразования данных в формат JSON.
+    преобразования данных в формат JSON. Поддерживает условные запросы
+    по ETag (If-None-Match) и HEAD.
 
     Атрибуты:
         serializer_class (EmployeeSerializer): Сериализатор для отображения работника.
@@ -53,12 +67,30 @@ class EmployeeRetrieveAPIView(RetrieveAPIView):
     queryset = Employee.objects.all()
 
 
-class EmployeeUpdateAPIView(UpdateAPIView):
+class EmployeeBulkRetrieveAPIView(ReplicaReadMixin, BulkRetrieveMixin, APIView):
+    """Пакетное получение работников.
+
+    Это представление возвращает работников по списку идентификаторов
+    (?ids=1,2,3 или POST {"ids": [...]}) в порядке запроса через общий
+    с просмотром работника кэш, ненайденные идентификаторы перечисляются
+    в missing.
+
+    Атрибуты:
+        serializer_class (EmployeeSerializer): Сериализатор для отображения работников.
+        queryset (QuerySet): Запрос для получения всех работников.
+    """
+
+    serializer_class = EmployeeSerializer
+    queryset = Employee.objects.all()
+
+
+class EmployeeUpdateAPIView(IdempotencyMixin, OptimisticUpdateMixin, UpdateAPIView):
     """Редактирование информации о работнике.
 
     Это представление обрабатывает запросы на обновление информации о работнике
     в системе. Использует сериализатор EmployeeSerializer для валидации и
-    сохранения измененных данных.
+    сохранения измененных данных. Запись выполняется с проверкой версии
+    (If-Match), при конфликте возвращается 412.
 
     Атрибуты:
         serializer_class (EmployeeSerializer): Сериализатор для редактирования работника.
@@ -82,16 +114,21 @@ class EmployeeDestroyAPIView(DestroyAPIView):
     queryset = Employee.objects.all()
 
 
-class EmployeeTaskListAPIView(ListAPIView):
+class EmployeeTaskListAPIView(ReplicaReadMixin, ListAPIView):
     """Просмотр списка работников с подсчетом активных задач.
 
     Это представление возвращает список работников, у которых есть активные задачи.
     Использует сериализатор EmployeeTaskSerializer для отображения работников
-    с количеством активных задач.
+    с количеством активных задач и местом в рейтинге.
+
+    Параметры запроса:
+        top: Сколько лучших работников оставить в каждой должности.
+        offset, limit: Срез рейтинга.
 
     Атрибуты:
         queryset (QuerySet): Запрос для получения всех работников.
         serializer_class (EmployeeTaskSerializer): Сериализатор для отображения работников с задачами.
+        throttle_cost (int): Стоимость запроса в токенах ограничения частоты.
 
     Методы:
         get_queryset(): Переопределяет метод для получения работников с подсчетом активных задач.
@@ -99,20 +136,81 @@ class EmployeeTaskListAPIView(ListAPIView):
 
     queryset = Employee.objects.all()
     serializer_class = EmployeeTaskSerializer
+    throttle_cost = 5
 
     def get_queryset(self):
-        """Возвращает список работников с подсчетом активных задач.
+        """Возвращает рейтинг работников с подсчетом активных задач.
 
-        Этот метод аннотирует queryset работников, добавляя количество активных задач
-        и фильтруя работников, у которых есть хотя бы одна активная задача.
+        Этот метод аннотирует queryset работников количеством активных задач
+        и местами в рейтинге по всей организации и внутри должности, оставляя
+        работников, у которых есть хотя бы одна активная задача. Параметры
+        top, offset и limit ограничивают выборку в том же запросе.
 
         Возвращает:
             QuerySet: Работники с активными задачами, отсортированные по количеству активных задач.
         """
-        return (
-            Employee.objects.annotate(
-                active_tasks_count=Count("tasks", filter=Q(tasks__status="start"))
-            )
-            .filter(active_tasks_count__gt=0)
-            .order_by("-active_tasks_count")
+        serializer = EmployeeRankingQuerySerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        # Количество активных задач берется из аннотации рейтинга, задачи
+        # подгружаются только для вложенного списка tasks сотрудников среза.
+        return employee_ranking(**serializer.validated_data).prefetch_related(
+            "tasks"
         )
+
+
+class EmployeeWorkloadAnalyticsAPIView(
+    ReplicaReadMixin, ConcurrencyLimitMixin, APIView
+):
+    """Аналитика загрузки сотрудников во времени.
+
+    Это представление возвращает количество активных, завершенных и
+    просроченных задач по сотрудникам или должностям, сгруппированное
+    по неделям или месяцам срока исполнения.
+
+    Параметры запроса:
+        period: 'week' или 'month'.
+        group_by: 'employee' или 'post'.
+        date_from, date_to: Диапазон сроков исполнения (YYYY-MM-DD).
+    """
+
+    throttle_cost = 5
+    max_concurrency = 2
+
+    def get(self, request):
+        """Возвращает статистику загрузки по интервалам."""
+        serializer = WorkloadAnalyticsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        return Response(
+            {
+                "period": params["period"],
+                "group_by": params["group_by"],
+                "buckets": workload_analytics(
+                    params["period"],
+                    params["group_by"],
+                    params["date_from"],
+                    params["date_to"],
+                ),
+            }
+        )
+
+
+class EmployeeAutocompleteAPIView(APIView):
+    """Подсказки сотрудников для выбора исполнителя.
+
+    Это представление возвращает сотрудников, у которых каждое слово
+    запроса начинает слово ФИО или должности. Поиск выполняется по
+    префиксному индексу в памяти процесса, а пока он не построен -
+    в базе данных.
+
+    Параметры запроса:
+        q: Строка поиска.
+        limit: Наибольшее количество подсказок (по умолчанию 10).
+    """
+
+    def get(self, request):
+        """Возвращает подсказки сотрудников."""
+        serializer = AutocompleteQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        return Response(autocomplete(params["q"], params["limit"]))
@@ -1,4 +1,6 @@
 from django.contrib import admin
+
+from config.paginators import EstimatedCountPaginator
 from task_tracker.models import Task
 
 
@@ -7,12 +9,25 @@ class TaskAdmin(admin.ModelAdmin):
     """Админ-интерфейс для модели Task.
 
     Этот класс управляет отображением и поведением модели Task в админ-панели Django.
-    Он настраивает, какие поля будут отображаться в списке задач, а также может
-    включать дополнительные настройки для фильтрации, поиска и редактирования задач.
+    Он настраивает, какие поля будут отображаться в списке задач, а также
+    фильтрацию, поиск и редактирование задач на больших таблицах.
 
     Атрибуты:
         list_display (tuple): Параметр, определяющий, какие поля модели
                               будут отображаться в списке задач в админке.
+        list_select_related (tuple): Связи, загружаемые в запросе списка одним JOIN.
+        list_filter (tuple): Фильтры по индексированным полям статуса и срока.
+        search_fields (tuple): Поля поиска, поиск использует триграммный индекс.
+        autocomplete_fields (tuple): Поля-ссылки с автодополнением вместо
+                                     выпадающего списка всех записей.
+        paginator (EstimatedCountPaginator): Пагинатор с оценочным количеством строк.
+        show_full_result_count (bool): Отключает дополнительный COUNT(*) при фильтрации.
     """
 
-    list_display = ("id", "name", "deadline", "status")
+    list_display = ("id", "name", "deadline", "status", "employee", "parent_task")
+    list_select_related = ("employee", "parent_task")
+    list_filter = ("status", "deadline")
+    search_fields = ("name",)
+    autocomplete_fields = ("parent_task", "employee")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
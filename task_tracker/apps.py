@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TaskTrackerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "task_tracker"
+
+    def ready(self):
+        """Подключает обработчики сигналов приложения."""
+        import task_tracker.signals  # noqa: F401
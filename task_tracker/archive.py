@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from task_tracker.events import publish_on_commit, task_event
+from task_tracker.models import ArchivedTask, Task
+from task_tracker.snapshot import mark_tracker_dirty
+
+# Колонки, переносимые из таблицы задач в архив без изменений.
+ARCHIVED_COLUMNS = (
+    "id",
+    "name",
+    "parent_task_id",
+    "employee_id",
+    "deadline",
+    "status",
+    "version",
+    "finished_at",
+)
+
+
+def archivable_tasks(horizon):
+    """Возвращает задачи, которые можно перенести в архив.
+
+    Переносятся завершенные задачи, завершенные раньше horizon и не
+    имеющие подзадач в таблице задач. Родитель становится доступным для
+    переноса после того, как в архив ушли все его подзадачи.
+
+    Аргументы:
+        horizon (datetime): Граница времени завершения.
+
+    Возвращает:
+        QuerySet: Задачи для переноса, отсортированные по идентификатору.
+    """
+    return (
+        Task.objects.filter(status="finish", finished_at__lt=horizon)
+        .exclude(Exists(Task.objects.filter(parent_task=OuterRef("pk"))))
+        .order_by("pk")
+    )
+
+
+def archive_batch(horizon_days, batch_size):
+    """Переносит в архив одну пачку завершенных задач.
+
+    Пачка блокируется (SKIP LOCKED там, где поддерживается), копируется
+    в архив запросом INSERT ... SELECT и удаляется из таблицы задач
+    в одной транзакции. После фиксации транзакции снимок трекера
+    помечается устаревшим, а подписчикам публикуются события task.deleted.
+
+    Аргументы:
+        horizon_days (int): Сколько дней задача должна быть завершена.
+        batch_size (int): Максимальный размер пачки.
+
+    Возвращает:
+        int: Количество перенесенных задач.
+    """
+    now = timezone.now()
+    horizon = now - timedelta(days=horizon_days)
+    qn = connection.ops.quote_name
+    columns = ", ".join(qn(column) for column in ARCHIVED_COLUMNS)
+    with transaction.atomic():
+        queryset = archivable_tasks(horizon)
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        rows = list(
+            queryset.values_list("pk", "parent_task_id", "employee_id", "status")[
+                :batch_size
+            ]
+        )
+        if not rows:
+            return 0
+        ids = [row[0] for row in rows]
+        placeholders = ", ".join(["%s"] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {qn(ArchivedTask._meta.db_table)} "
+                f"({columns}, {qn('archived_at')}) "
+                f"SELECT {columns}, %s FROM {qn(Task._meta.db_table)} "
+                f"WHERE id IN ({placeholders})",
+                [now, *ids],
+            )
+            cursor.execute(
+                f"DELETE FROM {qn(Task._meta.db_table)} WHERE id IN ({placeholders})",
+                ids,
+            )
+        parent_ids = {row[1] for row in rows}
+        transaction.on_commit(lambda: mark_tracker_dirty(*ids, *parent_ids))
+        publish_on_commit(task_event("task.deleted", *row) for row in rows)
+    return len(ids)
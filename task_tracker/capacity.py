@@ -0,0 +1,208 @@
+"""
+Офлайн-расчет кандидатов в исполнители для всех важных задач.
+
+Это пакетный аналог трекера (/task_tracker/tracker/) для ночного
+планирования загрузки. Задачи читаются из базы данных один раз пачками
+по первичному ключу в колонки NumPy, загрузка сотрудников, минимумы,
+загрузка по должностям и исполнители подзадач считаются векторными
+группировками, а результат записывается в CapacityPlan пачками. В памяти
+одновременно находятся только колонки сотрудников, идентификаторы
+активных задач без исполнителя и одна пачка задач.
+"""
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from employees.models import Employee
+from task_tracker.models import CapacityPlan, Task
+
+# Строк в одном INSERT: PostgreSQL ограничивает количество параметров запроса.
+WRITE_BATCH_SIZE = 1000
+
+
+def _column(values):
+    """Возвращает колонку идентификаторов, пустые значения заменяются на 0."""
+    return np.fromiter((value or 0 for value in values), dtype=np.int64)
+
+
+def _read_chunks(queryset, fields, batch_size):
+    """Читает колонки queryset пачками по возрастанию первичного ключа.
+
+    Следующая пачка выбирается условием pk > последнего прочитанного,
+    поэтому каждая пачка читается по индексу без OFFSET.
+
+    Возвращает:
+        generator: Для каждой пачки кортеж колонок: первичный ключ и fields.
+    """
+    last = 0
+    while True:
+        rows = list(
+            queryset.filter(pk__gt=last)
+            .order_by("pk")
+            .values_list("pk", *fields)[:batch_size]
+        )
+        if not rows:
+            return
+        last = rows[-1][0]
+        yield tuple(_column(column) for column in zip(*rows))
+
+
+def employee_loads(employee_ids, batch_size):
+    """Считает загрузку сотрудников и активные задачи без исполнителя.
+
+    Аргументы:
+        employee_ids (ndarray): Отсортированные идентификаторы сотрудников.
+        batch_size (int): Размер пачки чтения.
+
+    Возвращает:
+        tuple: Количество активных задач каждого сотрудника и
+        отсортированные идентификаторы активных задач без исполнителя.
+    """
+    loads = np.zeros(len(employee_ids), dtype=np.int64)
+    unassigned = []
+    active = Task.objects.filter(status="start")
+    for pks, employees in _read_chunks(active, ["employee_id"], batch_size):
+        assigned = employees != 0
+        loads += np.bincount(
+            np.searchsorted(employee_ids, employees[assigned]),
+            minlength=len(employee_ids),
+        )
+        unassigned.append(pks[~assigned])
+    return loads, np.concatenate(unassigned) if unassigned else _column([])
+
+
+def post_loads(posts, loads):
+    """Группирует загрузку сотрудников по должностям.
+
+    Аргументы:
+        posts (list): Должности сотрудников.
+        loads (ndarray): Загрузка сотрудников в том же порядке.
+
+    Возвращает:
+        list: Для каждой должности количество сотрудников, суммарная,
+        наименьшая загрузка и количество наименее загруженных.
+    """
+    if not posts:
+        return []
+    names, codes = np.unique(np.array(posts, dtype=object), return_inverse=True)
+    minima = np.full(len(names), np.iinfo(np.int64).max)
+    np.minimum.at(minima, codes, loads)
+    return [
+        {
+            "post": name,
+            "employees": int(employees),
+            "active_tasks": int(total),
+            "min_load": int(minimum),
+            "least_loaded": int(least),
+        }
+        for name, employees, total, minimum, least in zip(
+            names,
+            np.bincount(codes),
+            np.bincount(codes, weights=loads).astype(np.int64),
+            minima,
+            np.bincount(codes, weights=loads == minima[codes]).astype(np.int64),
+        )
+    ]
+
+
+def _plan_rows(parents, children, employee_ids, loads, min_load, computed_at):
+    """Строит строки плана для пачки активных задач без исполнителя.
+
+    Аргументы:
+        parents (ndarray): Отсортированные задачи пачки.
+        children (QuerySet): Активные подзадачи с исполнителем.
+        employee_ids (ndarray): Отсортированные идентификаторы сотрудников.
+        loads (ndarray): Загрузка сотрудников.
+        min_load (int): Наименьшая загрузка.
+        computed_at (datetime): Время расчета.
+
+    Возвращает:
+        list: Несохраненные строки CapacityPlan важных задач пачки.
+    """
+    rows = children.filter(
+        parent_task_id__gte=parents[0], parent_task_id__lte=parents[-1]
+    ).values_list("parent_task_id", "employee_id")
+    pairs = np.array(list(rows), dtype=np.int64).reshape(-1, 2)
+    pairs = pairs[np.isin(pairs[:, 0], parents)]
+    if not len(pairs):
+        return []
+    # Уникальные пары (задача, исполнитель) отсортированы по задаче,
+    # затем по исполнителю, группы задач режутся по смене задачи.
+    pairs = np.unique(pairs, axis=0)
+    bounds = np.flatnonzero(np.diff(pairs[:, 0])) + 1
+    extra = loads[np.searchsorted(employee_ids, pairs[:, 1])] != min_load
+    least_loaded = employee_ids[loads == min_load].tolist()
+    return [
+        CapacityPlan(
+            task_id=int(task_id),
+            candidates=least_loaded + executors[is_extra].tolist(),
+            executors=executors.tolist(),
+            min_load=min_load,
+            computed_at=computed_at,
+        )
+        for task_id, executors, is_extra in zip(
+            pairs[np.r_[0, bounds], 0],
+            np.split(pairs[:, 1], bounds),
+            np.split(extra, bounds),
+        )
+    ]
+
+
+def build_capacity_plan(batch_size):
+    """Пересчитывает план загрузки для всех важных задач.
+
+    Важные задачи и кандидаты определяются так же, как в трекере
+    (important_tasks и suggest_employees): активная задача без
+    исполнителя с активными подзадачами, кандидаты - наименее загруженные
+    сотрудники и исполнители подзадач. Строки плана обновляются пачками
+    в отдельных транзакциях, по окончании удаляются строки задач, не
+    попавших в расчет.
+
+    Аргументы:
+        batch_size (int): Размер пачки чтения и записи.
+
+    Возвращает:
+        dict: Итоги расчета: количество сотрудников, активных задач без
+        исполнителя, важных задач, наименьшая загрузка и загрузка по
+        должностям.
+    """
+    computed_at = timezone.now()
+    employees = list(Employee.objects.order_by("pk").values_list("pk", "post"))
+    employee_ids = _column(pk for pk, _ in employees)
+    loads, unassigned = employee_loads(employee_ids, batch_size)
+    min_load = int(loads.min()) if len(employee_ids) else 0
+    children = Task.objects.filter(status="start", employee__isnull=False)
+    planned = 0
+    if len(employee_ids):
+        for start in range(0, len(unassigned), batch_size):
+            plans = _plan_rows(
+                unassigned[start : start + batch_size],
+                children,
+                employee_ids,
+                loads,
+                min_load,
+                computed_at,
+            )
+            with transaction.atomic():
+                CapacityPlan.objects.bulk_create(
+                    plans,
+                    batch_size=WRITE_BATCH_SIZE,
+                    update_conflicts=True,
+                    unique_fields=["task_id"],
+                    update_fields=[
+                        "candidates",
+                        "executors",
+                        "min_load",
+                        "computed_at",
+                    ],
+                )
+            planned += len(plans)
+    CapacityPlan.objects.filter(computed_at__lt=computed_at).delete()
+    return {
+        "employees": len(employee_ids),
+        "unassigned": len(unassigned),
+        "planned": planned,
+        "min_load": min_load,
+        "posts": post_loads([post or "" for _, post in employees], loads),
+    }
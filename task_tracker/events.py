@@ -0,0 +1,82 @@
+from django.db import transaction
+
+from config.events import get_broker
+from task_tracker.models import Task
+
+
+def task_event(event_type, task_id, parent_id, employee_id, status, version=None):
+    """Возвращает событие изменения задачи.
+
+    Событие содержит только поля для фильтрации, полные данные клиент
+    получает через /task_tracker/bulk/.
+    """
+    return {
+        "type": event_type,
+        "id": task_id,
+        "parent_task": parent_id,
+        "employee": employee_id,
+        "status": status,
+        "version": version,
+    }
+
+
+def publish_on_commit(events):
+    """Публикует события после фиксации транзакции."""
+    events = list(events)
+
+    def publish():
+        broker = get_broker()
+        for event in events:
+            broker.publish(event)
+
+    if events:
+        transaction.on_commit(publish)
+
+
+def publish_task_ids(task_ids):
+    """Публикует изменения задач, записанных без сигналов (bulk_update).
+
+    Задачи читаются одним запросом и только если у брокера есть
+    подписчики.
+    """
+    if not task_ids or not get_broker().active:
+        return
+    rows = Task.objects.filter(pk__in=task_ids).values_list(
+        "id", "parent_task_id", "employee_id", "status", "version"
+    )
+    publish_on_commit(task_event("task.saved", *row) for row in rows)
+
+
+class TaskEventFilter:
+    """Фильтр событий подписчика.
+
+    Атрибуты:
+        employee (int): Только задачи исполнителя и события самого сотрудника.
+        subtree (set): Идентификаторы задач поддерева. Пополняется задачами,
+            появившимися в поддереве после подписки, задачи, перенесенные
+            из поддерева, остаются в нем до переподключения.
+        statuses (set): Только задачи с этими статусами.
+    """
+
+    def __init__(self, employee=None, subtree=None, statuses=None):
+        self.employee = employee
+        self.subtree = set(subtree) if subtree is not None else None
+        self.statuses = set(statuses) if statuses else None
+
+    def __call__(self, event):
+        if event["type"].startswith("employee."):
+            return (
+                self.subtree is None
+                and self.statuses is None
+                and self.employee in (None, event["id"])
+            )
+        if self.subtree is not None:
+            if (
+                event["id"] not in self.subtree
+                and event["parent_task"] not in self.subtree
+            ):
+                return False
+            self.subtree.add(event["id"])
+        if self.employee is not None and event["employee"] != self.employee:
+            return False
+        return self.statuses is None or event["status"] in self.statuses
@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from task_tracker.archive import archive_batch
+
+
+class Command(BaseCommand):
+    """Переносит завершенные задачи в архив пачками.
+
+    Подходит для запуска по расписанию или фоновым процессом: между
+    пачками можно делать паузу, чтобы не нагружать базу данных.
+    """
+
+    help = "Переносит завершенные задачи старше горизонта в архивную таблицу."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--horizon-days",
+            type=int,
+            default=settings.TASK_ARCHIVE_HORIZON_DAYS,
+            help="Сколько дней задача должна быть завершена.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.TASK_ARCHIVE_BATCH_SIZE,
+            help="Размер пачки.",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Пауза между пачками в секундах.",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=0,
+            help="Максимальное количество пачек, 0 - без ограничения.",
+        )
+
+    def handle(self, *args, **options):
+        total = batches = 0
+        while not options["max_batches"] or batches < options["max_batches"]:
+            moved = archive_batch(options["horizon_days"], options["batch_size"])
+            if not moved:
+                break
+            total += moved
+            batches += 1
+            time.sleep(options["pause"])
+        self.stdout.write(f"Перенесено в архив задач: {total} (пачек: {batches}).")
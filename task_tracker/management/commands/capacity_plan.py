@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from task_tracker.capacity import build_capacity_plan
+
+
+class Command(BaseCommand):
+    """Пересчитывает план загрузки для всех важных задач.
+
+    Предназначена для запуска по расписанию (например, ночью): задачи
+    читаются пачками, поэтому расход памяти не зависит от размера
+    таблицы задач. После расчета выводится загрузка по должностям.
+    """
+
+    help = "Рассчитывает кандидатов в исполнители для всех важных задач."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.CAPACITY_PLAN_BATCH_SIZE,
+            help="Размер пачки.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = build_capacity_plan(options["batch_size"])
+        self.stdout.write(
+            f"Сотрудников: {result['employees']}, наименьшая загрузка: "
+            f"{result['min_load']}, задач без исполнителя: {result['unassigned']}, "
+            f"важных задач в плане: {result['planned']} "
+            f"({time.perf_counter() - started:.1f} с)."
+        )
+        for post in result["posts"]:
+            self.stdout.write(
+                f"{post['post'] or '-'}: сотрудников {post['employees']}, "
+                f"активных задач {post['active_tasks']}, наименьшая загрузка "
+                f"{post['min_load']} (у {post['least_loaded']})"
+            )
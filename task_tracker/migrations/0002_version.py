@@ -0,0 +1,20 @@
+# Generated by Django 4.2.2 on 2026-10-19 17:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_tracker", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="version",
+            field=models.PositiveIntegerField(
+                default=1, help_text="Версия записи", verbose_name="Version"
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.2 on 2026-10-19 17:17
+
+from django.db import migrations, models
+
+from config.trigram import trigram_indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_tracker", "0002_version"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["status", "deadline"], name="task_status_deadline_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["deadline"], name="task_deadline_idx"),
+        ),
+        trigram_indexes("task_tracker_task", {"task_name_trgm_idx": "name"}),
+    ]
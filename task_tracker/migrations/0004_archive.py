@@ -0,0 +1,98 @@
+# Generated by Django 4.2.2 on 2026-10-19 17:24
+
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def fill_finished_at(apps, schema_editor):
+    """Отмечает уже завершенные задачи временем применения миграции."""
+    Task = apps.get_model("task_tracker", "Task")
+    Task.objects.filter(status="finish", finished_at__isnull=True).update(
+        finished_at=timezone.now()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employees", "0003_admin_indexes"),
+        ("task_tracker", "0003_admin_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedTask",
+            fields=[
+                (
+                    "id",
+                    models.BigIntegerField(
+                        primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, verbose_name="Name")),
+                (
+                    "parent_task_id",
+                    models.BigIntegerField(
+                        blank=True, null=True, verbose_name="Parent task"
+                    ),
+                ),
+                (
+                    "deadline",
+                    models.DateField(blank=True, null=True, verbose_name="Deadline"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("start", "start"), ("finish", "finish")],
+                        max_length=10,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "version",
+                    models.PositiveIntegerField(default=1, verbose_name="Version"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Finished at"
+                    ),
+                ),
+                ("archived_at", models.DateTimeField(verbose_name="Archived at")),
+            ],
+            options={
+                "verbose_name": "Archived task",
+                "verbose_name_plural": "Archived tasks",
+            },
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="finished_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Время завершения задачи",
+                null=True,
+                verbose_name="Finished at",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["status", "finished_at"], name="task_status_finished_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedtask",
+            name="employee",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="archived_tasks",
+                to="employees.employee",
+                verbose_name="Executor",
+            ),
+        ),
+        migrations.RunPython(fill_finished_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.2 on 2026-10-19 17:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_tracker", "0004_archive"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["id"], include=("version",), name="task_id_version_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.2 on 2026-10-19 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_tracker", "0005_version_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="task",
+            name="status",
+            field=models.CharField(
+                choices=[("start", "start"), ("finish", "finish")],
+                default="start",
+                help_text="Введите статус",
+                max_length=10,
+                verbose_name="Status",
+            ),
+        ),
+    ]
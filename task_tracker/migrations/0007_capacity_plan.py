@@ -0,0 +1,41 @@
+# Generated by Django 4.2.2 on 2026-10-19 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("task_tracker", "0006_status_max_length"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CapacityPlan",
+            fields=[
+                (
+                    "task_id",
+                    models.BigIntegerField(
+                        primary_key=True, serialize=False, verbose_name="Task"
+                    ),
+                ),
+                (
+                    "candidates",
+                    models.JSONField(default=list, verbose_name="Candidates"),
+                ),
+                ("executors", models.JSONField(default=list, verbose_name="Executors")),
+                (
+                    "min_load",
+                    models.PositiveIntegerField(default=0, verbose_name="Minimal load"),
+                ),
+                (
+                    "computed_at",
+                    models.DateTimeField(db_index=True, verbose_name="Computed at"),
+                ),
+            ],
+            options={
+                "verbose_name": "Capacity plan",
+                "verbose_name_plural": "Capacity plans",
+            },
+        ),
+    ]
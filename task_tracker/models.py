@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from employees.models import Employee
 
 NULLABLE = {"blank": True, "null": True}
@@ -25,6 +26,8 @@ class Task(models.Model):
         employee (ForeignKey): Исполнитель задачи, связанный с моделью Employee.
         deadline (DateField): Срок исполнения задачи.
         status (str): Статус задачи, может быть 'start' или 'finish'.
+        version (int): Версия записи, увеличивается при каждом изменении.
+        finished_at (datetime): Время завершения задачи, пусто у активных задач.
     """
 
     name = models.CharField(
@@ -49,11 +52,18 @@ class Task(models.Model):
         verbose_name="Deadline", help_text="Введите срок исполнения", **NULLABLE
     )
     status = models.CharField(
+        max_length=10,
         choices=TASK_STATUS,
         default=TASK_STATUS[0][0],
         verbose_name="Status",
         help_text="Введите статус",
     )
+    version = models.PositiveIntegerField(
+        default=1, verbose_name="Version", help_text="Версия записи"
+    )
+    finished_at = models.DateTimeField(
+        verbose_name="Finished at", help_text="Время завершения задачи", **NULLABLE
+    )
 
     def __str__(self):
         """Возвращает строковое представление задачи.
@@ -63,8 +73,117 @@ class Task(models.Model):
         """
         return self.name
 
+    def save(self, *args, **kwargs):
+        """Сохраняет задачу, увеличивая версию при изменении существующей записи
+        и отмечая время завершения задачи.
+
+        Версия не проверяется: конфликты изменений отсекаются только в API
+        (config.concurrency).
+        """
+        if not self._state.adding:
+            self.version += 1
+        if self.status != "finish":
+            self.finished_at = None
+        elif self.finished_at is None:
+            self.finished_at = timezone.now()
+        super().save(*args, **kwargs)
+
     class Meta:
         """Метаданные модели Task."""
 
         verbose_name = "Task"
         verbose_name_plural = "Tasks"
+        indexes = [
+            models.Index(
+                fields=["status", "deadline"], name="task_status_deadline_idx"
+            ),
+            models.Index(fields=["deadline"], name="task_deadline_idx"),
+            models.Index(
+                fields=["status", "finished_at"], name="task_status_finished_idx"
+            ),
+            # Покрывающий индекс для условных GET/HEAD: версия задачи
+            # читается по идентификатору без обращения к таблице.
+            models.Index(
+                fields=["id"], include=["version"], name="task_id_version_idx"
+            ),
+        ]
+
+
+class ArchivedTask(models.Model):
+    """Модель архивной задачи.
+
+    Завершенные задачи старше TASK_ARCHIVE_HORIZON_DAYS переносятся сюда
+    командой archive_tasks, чтобы таблица активных задач оставалась небольшой.
+    Идентификатор задачи при переносе сохраняется.
+
+    Атрибуты:
+        id (BigIntegerField): Идентификатор исходной задачи.
+        name (str): Наименование задачи.
+        parent_task_id (BigIntegerField): Идентификатор родительской задачи,
+            которая может находиться как в активной, так и в архивной таблице.
+        employee (ForeignKey): Исполнитель задачи.
+        deadline (DateField): Срок исполнения задачи.
+        status (str): Статус задачи на момент переноса.
+        version (int): Версия записи на момент переноса.
+        finished_at (datetime): Время завершения задачи.
+        archived_at (datetime): Время переноса в архив.
+    """
+
+    id = models.BigIntegerField(primary_key=True, verbose_name="ID")
+    name = models.CharField(max_length=100, verbose_name="Name")
+    parent_task_id = models.BigIntegerField(verbose_name="Parent task", **NULLABLE)
+    employee = models.ForeignKey(
+        Employee,
+        verbose_name="Executor",
+        related_name="archived_tasks",
+        on_delete=models.CASCADE,
+        **NULLABLE
+    )
+    deadline = models.DateField(verbose_name="Deadline", **NULLABLE)
+    status = models.CharField(max_length=10, choices=TASK_STATUS, verbose_name="Status")
+    version = models.PositiveIntegerField(default=1, verbose_name="Version")
+    finished_at = models.DateTimeField(verbose_name="Finished at", **NULLABLE)
+    archived_at = models.DateTimeField(verbose_name="Archived at")
+
+    def __str__(self):
+        """Возвращает наименование архивной задачи."""
+        return self.name
+
+    class Meta:
+        """Метаданные модели ArchivedTask."""
+
+        verbose_name = "Archived task"
+        verbose_name_plural = "Archived tasks"
+
+
+class CapacityPlan(models.Model):
+    """Модель строки плана загрузки.
+
+    Строки пересчитываются для всех важных задач командой capacity_plan,
+    строки задач, переставших быть важными, удаляются при следующем
+    расчете.
+
+    Атрибуты:
+        task_id (BigIntegerField): Идентификатор важной задачи.
+        candidates (JSONField): Идентификаторы кандидатов в исполнители:
+            наименее загруженные сотрудники, затем исполнители подзадач.
+        executors (JSONField): Идентификаторы исполнителей активных подзадач.
+        min_load (int): Наименьшее количество активных задач у сотрудника.
+        computed_at (datetime): Время расчета.
+    """
+
+    task_id = models.BigIntegerField(primary_key=True, verbose_name="Task")
+    candidates = models.JSONField(default=list, verbose_name="Candidates")
+    executors = models.JSONField(default=list, verbose_name="Executors")
+    min_load = models.PositiveIntegerField(default=0, verbose_name="Minimal load")
+    computed_at = models.DateTimeField(verbose_name="Computed at", db_index=True)
+
+    def __str__(self):
+        """Возвращает идентификатор задачи плана."""
+        return str(self.task_id)
+
+    class Meta:
+        """Метаданные модели CapacityPlan."""
+
+        verbose_name = "Capacity plan"
+        verbose_name_plural = "Capacity plans"
@@ -0,0 +1,164 @@
+from collections import deque
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from task_tracker.subtree import subtree_query
+
+SCHEDULE_KEY = "task_tracker:schedule:{}:{}:{}:{}:{}"
+
+
+def tree_fingerprint(task_id):
+    """Возвращает отпечаток дерева задачи.
+
+    Отпечаток меняется при любом изменении задач дерева (растет версия),
+    добавлении и удалении задач, поэтому служит ключом кэша расписания.
+
+    Аргументы:
+        task_id (int): Идентификатор корня дерева.
+
+    Возвращает:
+        tuple: Количество задач, сумма версий и сумма идентификаторов.
+    """
+    return subtree_query(
+        task_id,
+        "SELECT COUNT(*), COALESCE(SUM(version), 0), COALESCE(SUM(id), 0) "
+        "FROM {table} WHERE id IN (SELECT id FROM subtree)",
+    )[0]
+
+
+def compute_schedule(task_id, today=None):
+    """Считает расписание дерева задачи.
+
+    Дерево загружается одним запросом, дальше расчет идет в памяти за
+    линейное время. Подзадачи должны быть завершены раньше родителя,
+    а каждая активная задача занимает TASK_SCHEDULE_DURATION_DAYS дней
+    после завершения всех своих подзадач:
+
+    - самое раннее завершение считается снизу вверх: для завершенной задачи
+      это дата завершения, для активной - максимум по подзадачам (или
+      сегодня) плюс длительность;
+    - самое позднее завершение считается сверху вниз: это минимум из своего
+      срока и самого позднего начала родителя;
+    - резерв - разница между ними в днях, отрицательный резерв означает,
+      что срок будет сорван;
+    - критический путь идет от корня через подзадачи с самым поздним ранним
+      завершением, именно они определяют завершение всего дерева.
+
+    Аргументы:
+        task_id (int): Идентификатор корня дерева.
+        today (date): Текущая дата, по умолчанию сегодня.
+
+    Возвращает:
+        dict | None: Расписание или None, если задача не найдена.
+    """
+    rows = subtree_query(
+        task_id,
+        "SELECT id, parent_task_id, name, deadline, status, finished_at "
+        "FROM {table} WHERE id IN (SELECT id FROM subtree) ORDER BY id",
+    )
+    if not rows:
+        return None
+    today = today or timezone.localdate()
+    duration = timedelta(days=settings.TASK_SCHEDULE_DURATION_DAYS)
+    zero = timedelta()
+    tasks = {row[0]: row for row in rows}
+    children = {pk: [] for pk in tasks}
+    for pk, parent_id, *_ in rows:
+        if pk != task_id and parent_id in children:
+            children[parent_id].append(pk)
+
+    # Порядок обхода в ширину: родители раньше подзадач.
+    order, queue = [], deque([task_id])
+    while queue:
+        pk = queue.popleft()
+        order.append(pk)
+        queue.extend(children[pk])
+
+    latest = {}
+    for pk in order:
+        _, parent_id, _, deadline, _, _ = tasks[pk]
+        bounds = [deadline] if deadline else []
+        if pk != task_id and latest[parent_id] is not None:
+            # Подзадача должна быть завершена до начала работы над родителем.
+            parent_active = tasks[parent_id][4] != "finish"
+            bounds.append(latest[parent_id] - (duration if parent_active else zero))
+        latest[pk] = min(bounds) if bounds else None
+
+    earliest = {}
+    for pk in reversed(order):
+        _, _, _, _, status, finished_at = tasks[pk]
+        if finished_at and timezone.is_naive(finished_at):
+            # SQLite отдает время из сырого запроса в UTC без часового пояса.
+            finished_at = timezone.make_aware(finished_at, dt_timezone.utc)
+        if status == "finish":
+            earliest[pk] = (
+                timezone.localtime(finished_at).date() if finished_at else today
+            )
+        else:
+            start = max((earliest[child] for child in children[pk]), default=today)
+            earliest[pk] = max(start, today) + duration
+
+    critical_path = [task_id]
+    while children[critical_path[-1]]:
+        critical_path.append(
+            max(children[critical_path[-1]], key=lambda child: earliest[child])
+        )
+
+    result, conflicts = [], []
+    for pk in order:
+        _, parent_id, name, deadline, status, _ = tasks[pk]
+        parent_deadline = tasks[parent_id][3] if pk != task_id else None
+        exceeds_parent = bool(
+            deadline and parent_deadline and deadline > parent_deadline
+        )
+        if exceeds_parent:
+            conflicts.append(pk)
+        slack = (latest[pk] - earliest[pk]).days if latest[pk] else None
+        result.append(
+            {
+                "id": pk,
+                "name": name,
+                "parent_task": parent_id,
+                "deadline": deadline,
+                "status": status,
+                "earliest_finish": earliest[pk],
+                "latest_finish": latest[pk],
+                "slack": slack,
+                "at_risk": slack is not None and slack < 0,
+                "deadline_exceeds_parent": exceeds_parent,
+            }
+        )
+    return {
+        "root": task_id,
+        "finish": earliest[task_id],
+        "critical_path": critical_path,
+        "deadline_conflicts": conflicts,
+        "tasks": result,
+    }
+
+
+def get_schedule(task_id):
+    """Возвращает расписание дерева задачи из кэша или считает его.
+
+    Ключ кэша включает отпечаток дерева и текущую дату, поэтому
+    расписание пересчитывается при любом изменении дерева.
+
+    Аргументы:
+        task_id (int): Идентификатор корня дерева.
+
+    Возвращает:
+        dict | None: Расписание или None, если задача не найдена.
+    """
+    count, versions, ids = tree_fingerprint(task_id)
+    if not count:
+        return None
+    key = SCHEDULE_KEY.format(task_id, count, versions, ids, timezone.localdate())
+    schedule = cache.get(key)
+    if schedule is None:
+        schedule = compute_schedule(task_id)
+        cache.set(key, schedule, settings.TASK_SCHEDULE_CACHE_TIMEOUT)
+    return schedule
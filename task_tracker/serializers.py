@@ -1,9 +1,11 @@
-from rest_framework.fields import SerializerMethodField
-from rest_framework.serializers import ModelSerializer
+from django.conf import settings
+from rest_framework.fields import (CharField, ChoiceField, IntegerField,
+                                   ListField, SerializerMethodField)
+from rest_framework.serializers import ModelSerializer, Serializer
 from rest_framework.validators import UniqueTogetherValidator
 
-from employees.models import Employee
-from task_tracker.models import Task
+from task_tracker.models import TASK_STATUS, ArchivedTask, Task
+from task_tracker.services import get_workload, suggest_employees
 from task_tracker.validators import NameValidator
 
 
@@ -21,12 +23,24 @@ class TaskSerializer(ModelSerializer):
     class Meta:
         model = Task
         fields = "__all__"
+        read_only_fields = ("version", "finished_at")
         validators = [
             NameValidator(field="name"),
             UniqueTogetherValidator(fields=["name"], queryset=Task.objects.all()),
         ]
 
 
+class ArchivedTaskSerializer(ModelSerializer):
+    """Сериализатор архивной задачи.
+
+    Архивные задачи доступны только для чтения.
+    """
+
+    class Meta:
+        model = ArchivedTask
+        fields = "__all__"
+
+
 class MainTaskSerializer(ModelSerializer):
     """Сериализатор для поиска менее загруженных сотрудников.
 
@@ -57,24 +71,55 @@ class MainTaskSerializer(ModelSerializer):
         имеющих наименьшую загрузку. Также добавляет сотрудников, которые
         являются исполнителями дочерних задач текущей задачи.
 
+        Загрузка сотрудников берется из контекста ("workload"), если она уже
+        посчитана, иначе вычисляется одним агрегирующим запросом.
+
         Аргументы:
             task (Task): Экземпляр текущей задачи, для которой ищутся доступные сотрудники.
 
         Возвращает:
             list: Список имен сотрудников с наименьшей загрузкой.
         """
-        employees = Employee.objects.all()
-        emp_data = {}
-        for emp in employees:
-            list_task = emp.tasks.filter(status="start")
-            emp_data[emp.pk] = len(list_task)
-        min_count = min(emp_data.values())
-        available_employees = [
-            emp.full_name for emp in employees if emp_data[emp.pk] == min_count
-        ]
-        for emp in employees:
-            tasks = Task.objects.filter(parent_task=task.id)
-            for t in tasks:
-                if t.employee == emp and emp.full_name not in available_employees:
-                    available_employees.append(emp.full_name)
-        return available_employees
+        workload = self.context.get("workload")
+        if workload is None:
+            workload = get_workload()
+        executor_ids = {
+            child.employee_id for child in task.other.all() if child.employee_id
+        }
+        return suggest_employees(workload, executor_ids)
+
+
+class TaskStatusSerializer(Serializer):
+    """Сериализатор смены статуса задачи без проверки остальных полей.
+
+    Атрибуты:
+        status (ChoiceField): Новый статус задачи.
+    """
+
+    status = ChoiceField(choices=TASK_STATUS)
+
+
+class RecommendationQuerySerializer(Serializer):
+    """Сериализатор параметров подбора исполнителей.
+
+    Атрибуты:
+        k (IntegerField): Количество кандидатов, не больше RECOMMENDATION_MAX_K.
+        post (CharField): Предпочтительная должность исполнителя.
+    """
+
+    k = IntegerField(default=5, min_value=1, max_value=settings.RECOMMENDATION_MAX_K)
+    post = CharField(required=False)
+
+
+class TaskEventQuerySerializer(Serializer):
+    """Сериализатор фильтров потока событий.
+
+    Атрибуты:
+        employee (IntegerField): Только задачи исполнителя и события сотрудника.
+        subtree (IntegerField): Только задачи дерева с этим корнем.
+        status (ListField): Только задачи с этими статусами (?status=start).
+    """
+
+    employee = IntegerField(required=False, min_value=1)
+    subtree = IntegerField(required=False, min_value=1)
+    status = ListField(child=ChoiceField(choices=TASK_STATUS), required=False)
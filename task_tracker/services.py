@@ -0,0 +1,129 @@
+import heapq
+
+from django.conf import settings
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+
+from employees.models import Employee
+from task_tracker.models import Task
+
+
+def important_tasks():
+    """Возвращает важные задачи без дублей.
+
+    Важной считается активная задача без исполнителя, у которой есть хотя бы
+    одна активная подзадача с назначенным исполнителем. Условие на подзадачи
+    проверяется через EXISTS, поэтому каждая задача попадает в выборку
+    ровно один раз, независимо от количества подходящих подзадач.
+
+    Возвращает:
+        QuerySet: Важные задачи, отсортированные по идентификатору.
+    """
+    active_children = Task.objects.filter(
+        parent_task=OuterRef("pk"), employee__isnull=False, status="start"
+    )
+    return Task.objects.filter(
+        Exists(active_children), employee__isnull=True, status="start"
+    ).order_by("pk")
+
+
+def get_workload():
+    """Возвращает загрузку всех сотрудников одним агрегирующим запросом.
+
+    Возвращает:
+        list: Кортежи (id, full_name, active_tasks_count) в порядке id.
+    """
+    return list(
+        Employee.objects.annotate(
+            active_tasks_count=Count("tasks", filter=Q(tasks__status="start"))
+        )
+        .order_by("pk")
+        .values_list("pk", "full_name", "active_tasks_count")
+    )
+
+
+def suggest_employees(workload, executor_ids):
+    """Определяет сотрудников, которым можно поручить задачу.
+
+    Это сотрудники с наименьшим количеством активных задач, а также
+    исполнители подзадач текущей задачи.
+
+    Аргументы:
+        workload (list): Загрузка сотрудников, результат get_workload().
+        executor_ids (set): Идентификаторы исполнителей подзадач.
+
+    Возвращает:
+        list: Список имен сотрудников.
+    """
+    if not workload:
+        return []
+    min_count = min(count for _, _, count in workload)
+    available_employees = [name for _, name, count in workload if count == min_count]
+    for pk, name, _ in workload:
+        if pk in executor_ids and name not in available_employees:
+            available_employees.append(name)
+    return available_employees
+
+
+def recommend_employees(task, k, post=None):
+    """Подбирает k лучших кандидатов в исполнители задачи.
+
+    Показатели всех сотрудников считаются одним агрегирующим запросом:
+    количество активных и просроченных задач и количество задач среди
+    соседних (с тем же родителем) и дочерних задач. Оценка складывается
+    из показателей с весами RECOMMENDATION_WEIGHTS и бонуса за совпадение
+    должности, лучшие k отбираются кучей без сортировки всего списка.
+
+    Аргументы:
+        task (Task): Задача, для которой подбираются исполнители.
+        k (int): Количество кандидатов.
+        post (str): Должность, совпадение с которой повышает оценку.
+
+    Возвращает:
+        list: Кандидаты по убыванию оценки.
+    """
+    weights = settings.RECOMMENDATION_WEIGHTS
+    related = Q(tasks__parent_task_id=task.pk)
+    if task.parent_task_id is not None:
+        related |= Q(tasks__parent_task_id=task.parent_task_id) & ~Q(tasks__pk=task.pk)
+    rows = (
+        Employee.objects.annotate(
+            active_tasks=Count("tasks", filter=Q(tasks__status="start")),
+            overdue_tasks=Count(
+                "tasks",
+                filter=Q(
+                    tasks__status="start", tasks__deadline__lt=timezone.localdate()
+                ),
+            ),
+            related_tasks=Count("tasks", filter=related),
+        )
+        .values_list(
+            "pk", "full_name", "post", "active_tasks", "overdue_tasks", "related_tasks"
+        )
+        .iterator()
+    )
+
+    def score(row):
+        _, _, employee_post, active, overdue, related_count = row
+        return (
+            related_count * weights["related"]
+            - active * weights["active"]
+            - overdue * weights["overdue"]
+            + (weights["post"] if post and employee_post == post else 0)
+        )
+
+    best = heapq.nlargest(k, rows, key=lambda row: (score(row), -row[0]))
+    return [
+        {
+            "id": pk,
+            "full_name": full_name,
+            "post": employee_post,
+            "active_tasks": active,
+            "overdue_tasks": overdue,
+            "related_tasks": related_count,
+            "score": score(
+                (pk, full_name, employee_post, active, overdue, related_count)
+            ),
+        }
+        for pk, full_name, employee_post, active, overdue, related_count in best
+    ]
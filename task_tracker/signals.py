@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from employees.models import Employee
+from task_tracker.events import publish_on_commit, task_event
+from task_tracker.models import Task
+from task_tracker.snapshot import mark_tracker_dirty
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_changed(sender, instance, **kwargs):
+    """Помечает в снимке трекера измененную задачу и ее родителя.
+
+    Отметка ставится после фиксации транзакции: иначе снимок, обновленный
+    до фиксации, прочитал бы старые данные и снял бы отметку.
+    """
+    task_ids = (instance.pk, instance.parent_task_id)
+    transaction.on_commit(lambda: mark_tracker_dirty(*task_ids))
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def publish_task_event(sender, instance, signal, **kwargs):
+    """Публикует событие изменения задачи после фиксации транзакции."""
+    event_type = "task.deleted" if signal is post_delete else "task.saved"
+    publish_on_commit(
+        [
+            task_event(
+                event_type,
+                instance.pk,
+                instance.parent_task_id,
+                instance.employee_id,
+                instance.status,
+                instance.version,
+            )
+        ]
+    )
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def employee_changed(sender, instance, **kwargs):
+    """Помечает снимок трекера устаревшим после фиксации транзакции."""
+    transaction.on_commit(mark_tracker_dirty)
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def publish_employee_event(sender, instance, signal, **kwargs):
+    """Публикует событие изменения сотрудника после фиксации транзакции."""
+    event_type = "employee.deleted" if signal is post_delete else "employee.saved"
+    publish_on_commit([{"type": event_type, "id": instance.pk}])
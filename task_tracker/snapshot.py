@@ -0,0 +1,166 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from task_tracker.models import Task
+from task_tracker.serializers import MainTaskSerializer
+from task_tracker.services import get_workload, important_tasks, suggest_employees
+
+SNAPSHOT_KEY = "task_tracker:tracker_snapshot"
+# Счетчик отметок, сами отметки и время первой непримененной отметки.
+# Каждая отметка хранится под своим ключом, поэтому параллельные
+# отметки не теряются, а обновление снимка удаляет только прочитанные.
+DIRTY_SEQ_KEY = "task_tracker:tracker_dirty_seq"
+DIRTY_MARK_KEY = "task_tracker:tracker_dirty:{}"
+DIRTY_SINCE_KEY = "task_tracker:tracker_dirty_since"
+# Время хранения отметки: непримененная дольше отметка считается
+# потерянной, и снимок строится заново.
+DIRTY_MARK_TIMEOUT = 24 * 60 * 60
+# При большем количестве непримененных отметок снимок строится заново,
+# а не читается каждая отметка.
+DIRTY_MARKS_MAX = 1000
+
+
+def mark_tracker_dirty(*task_ids):
+    """Помечает снимок трекера как устаревший.
+
+    Идентификаторы измененных задач накапливаются до следующего обновления,
+    чтобы пересчитать только затронутые строки. Вызов без аргументов
+    означает, что изменилась только загрузка сотрудников.
+
+    Аргументы:
+        task_ids (int): Идентификаторы измененных задач.
+    """
+    cache.add(DIRTY_SEQ_KEY, 0, None)
+    seq = cache.incr(DIRTY_SEQ_KEY)
+    ids = {pk for pk in task_ids if pk is not None}
+    cache.set(DIRTY_MARK_KEY.format(seq), ids, DIRTY_MARK_TIMEOUT)
+    cache.add(DIRTY_SINCE_KEY, time.time(), None)
+
+
+def _consume_marks(applied):
+    """Забирает отметки, сделанные после отметки applied.
+
+    Время первой отметки сбрасывается до чтения счетчика: отметки,
+    сделанные после чтения, выставят его заново и будут применены при
+    следующем обновлении.
+
+    Аргументы:
+        applied (int): Номер последней примененной отметки, None - снимок
+            строится заново и отметки не нужны.
+
+    Возвращает:
+        tuple: Номер последней учтенной отметки и идентификаторы
+        измененных задач, None, если снимок нужно построить заново.
+    """
+    cache.delete(DIRTY_SINCE_KEY)
+    seq = cache.get(DIRTY_SEQ_KEY) or 0
+    if applied is None or seq - applied > DIRTY_MARKS_MAX:
+        return seq, None
+    keys = [DIRTY_MARK_KEY.format(number) for number in range(applied + 1, seq + 1)]
+    marks = cache.get_many(keys)
+    cache.delete_many(keys)
+    if len(marks) < len(keys):
+        return seq, None
+    return seq, set().union(*marks.values())
+
+
+def _build_rows(queryset, workload):
+    """Сериализует важные задачи в строки снимка.
+
+    Аргументы:
+        queryset (QuerySet): Важные задачи, которые нужно пересчитать.
+        workload (list): Загрузка сотрудников, результат get_workload().
+
+    Возвращает:
+        dict: Строки снимка по идентификатору задачи.
+    """
+    rows = {}
+    for task in queryset.prefetch_related("other"):
+        children = task.other.all()
+        rows[task.pk] = {
+            "data": MainTaskSerializer(task, context={"workload": workload}).data,
+            "children": {child.pk for child in children},
+            "executors": {child.employee_id for child in children if child.employee_id},
+        }
+    return rows
+
+
+def refresh_tracker_snapshot(snapshot=None):
+    """Обновляет снимок трекера и сохраняет его в кэш.
+
+    Без предыдущего снимка, а также если отметок об изменениях слишком
+    много или часть из них потеряна, строится полный снимок. Иначе пересчитываются только
+    строки, затронутые измененными задачами: сами задачи, их родители и
+    задачи, в подзадачах которых они числились. Список подходящих
+    сотрудников пересчитывается для всех строк в памяти по свежей
+    загрузке, без дополнительных запросов.
+
+    Аргументы:
+        snapshot (dict): Предыдущий снимок.
+
+    Возвращает:
+        dict: Обновленный снимок.
+    """
+    applied, dirty_ids = _consume_marks(snapshot and snapshot["applied"])
+    if dirty_ids is None:
+        snapshot = None
+    workload = get_workload()
+    if snapshot is None:
+        rows = _build_rows(important_tasks(), workload)
+    else:
+        rows = snapshot["rows"]
+        affected = set(dirty_ids or ())
+        if affected:
+            affected.update(
+                Task.objects.filter(
+                    pk__in=dirty_ids, parent_task__isnull=False
+                ).values_list("parent_task_id", flat=True)
+            )
+            affected.update(
+                pk for pk, row in rows.items() if row["children"] & dirty_ids
+            )
+            for pk in affected:
+                rows.pop(pk, None)
+            rows.update(
+                _build_rows(important_tasks().filter(pk__in=affected), workload)
+            )
+    result = []
+    for pk in sorted(rows):
+        row = rows[pk]
+        row["data"]["available_employees"] = suggest_employees(
+            workload, row["executors"]
+        )
+        result.append(row["data"])
+    snapshot = {
+        "built_at": time.time(),
+        "applied": applied,
+        "rows": rows,
+        "result": result,
+    }
+    cache.set(SNAPSHOT_KEY, snapshot, None)
+    return snapshot
+
+
+def get_tracker_snapshot():
+    """Возвращает готовый результат трекера.
+
+    Снимок обновляется только если с момента первого непримененного
+    изменения прошло не меньше TRACKER_SNAPSHOT_MAX_STALENESS секунд,
+    иначе отдается как есть. Между процессами снимок и отметки
+    согласованы только через общий кэш (Redis, Memcached).
+
+    Возвращает:
+        list: Важные задачи с подзадачами и подходящими сотрудниками.
+    """
+    snapshot = cache.get(SNAPSHOT_KEY)
+    if snapshot is None:
+        return refresh_tracker_snapshot()["result"]
+    since = cache.get(DIRTY_SINCE_KEY)
+    if (
+        since is not None
+        and time.time() - since >= settings.TRACKER_SNAPSHOT_MAX_STALENESS
+    ):
+        snapshot = refresh_tracker_snapshot(snapshot)
+    return snapshot["result"]
@@ -0,0 +1,226 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connections, router, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from task_tracker.events import publish_task_ids
+from task_tracker.models import Task
+from task_tracker.snapshot import mark_tracker_dirty
+
+
+class StatusWriteBuffer:
+    """Буфер смены статусов задач с пакетной записью.
+
+    Изменения статусов копятся в памяти процесса и записываются раз
+    в TASK_STATUS_BUFFER_INTERVAL_MS миллисекунд, одним UPDATE на каждый
+    статус пачки. Несколько изменений одной задачи в пределах пачки
+    схлопываются в последнее.
+
+    В надежном режиме (TASK_STATUS_BUFFER_DURABLE) ответ отдается только
+    после записи пачки: первый запрос пачки выжидает интервал и записывает
+    ее в своем потоке, остальные ждут результата (групповая фиксация).
+    Иначе запрос получает ответ сразу, а пачку записывает фоновый таймер.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._pending = {}
+        self._batch = 0
+        self._completed = {}
+        self._flush_scheduled = False
+        self._timer = None
+        self._stats = {"batches": 0, "tasks": 0, "last_batch": 0, "max_batch": 0}
+
+    def submit(self, task_id, status):
+        """Ставит смену статуса задачи в очередь.
+
+        Аргументы:
+            task_id (int): Идентификатор задачи.
+            status (str): Новый статус.
+
+        Возвращает:
+            int | None: Размер записанной пачки в надежном режиме или None,
+            если запись отложена.
+        """
+        durable = settings.TASK_STATUS_BUFFER_DURABLE
+        with self._condition:
+            self._pending[task_id] = status
+            batch = self._batch
+            leader = not self._flush_scheduled
+            self._flush_scheduled = True
+            if not durable:
+                if leader:
+                    self._timer = threading.Timer(
+                        self._interval(), self._flush_in_thread
+                    )
+                    self._timer.daemon = True
+                    self._timer.start()
+                return None
+            if not leader:
+                while batch not in self._completed:
+                    self._condition.wait()
+                return self._result(batch)
+        time.sleep(self._interval())
+        self.flush()
+        with self._condition:
+            return self._result(batch)
+
+    def flush(self):
+        """Записывает накопленные изменения, по UPDATE на каждый статус.
+
+        Возвращает:
+            int: Размер записанной пачки.
+        """
+        with self._condition:
+            pending, self._pending = self._pending, {}
+            batch = self._batch
+            self._batch += 1
+            self._flush_scheduled = False
+        error = None
+        try:
+            self._write(pending)
+        except Exception as exc:
+            error = exc
+        with self._condition:
+            self._completed[batch] = (len(pending), error)
+            # Результаты старых пачек больше никто не ждет.
+            self._completed.pop(batch - 100, None)
+            if error is None and pending:
+                self._stats["batches"] += 1
+                self._stats["tasks"] += len(pending)
+                self._stats["last_batch"] = len(pending)
+                self._stats["max_batch"] = max(self._stats["max_batch"], len(pending))
+            self._condition.notify_all()
+        if error is not None:
+            raise error
+        return len(pending)
+
+    def stop(self):
+        """Отменяет отложенную запись фоновым таймером.
+
+        Накопленные изменения не записываются, при необходимости перед
+        остановкой вызывается flush().
+        """
+        with self._condition:
+            timer, self._timer = self._timer, None
+            self._flush_scheduled = False
+        if timer is not None:
+            timer.cancel()
+
+    def stats(self):
+        """Возвращает статистику записанных пачек.
+
+        Возвращает:
+            dict: Количество пачек и задач, размер последней, средней и
+            наибольшей пачки.
+        """
+        with self._condition:
+            stats = dict(self._stats)
+        stats["avg_batch"] = (
+            round(stats["tasks"] / stats["batches"], 2) if stats["batches"] else 0
+        )
+        return stats
+
+    def _interval(self):
+        """Возвращает интервал записи пачек в секундах."""
+        return settings.TASK_STATUS_BUFFER_INTERVAL_MS / 1000
+
+    def _result(self, batch):
+        """Возвращает размер пачки или пробрасывает ошибку ее записи."""
+        size, error = self._completed[batch]
+        if error is not None:
+            raise error
+        return size
+
+    def _write(self, pending):
+        """Записывает статусы задач без загрузки их из базы данных.
+
+        На каждый статус выполняется один UPDATE, который обновляет только
+        задачи с другим статусом: повторная передача того же статуса не
+        увеличивает версию и не сдвигает время завершения. Снимок трекера
+        и подписчики событий узнают только о действительно измененных
+        задачах.
+        """
+        now = timezone.now()
+        changed = []
+        for status in set(pending.values()):
+            task_ids = [pk for pk, value in pending.items() if value == status]
+            changed.extend(_update_status(task_ids, status, now))
+        if changed:
+            mark_tracker_dirty(*changed)
+            publish_task_ids(changed)
+
+    def _flush_in_thread(self):
+        """Записывает пачку из фонового потока таймера."""
+        close_old_connections()
+        try:
+            self.flush()
+        finally:
+            close_old_connections()
+
+
+def _update_status(task_ids, status, now):
+    """Меняет статус задач и возвращает идентификаторы измененных.
+
+    На PostgreSQL и SQLite измененные задачи возвращает тот же запрос
+    UPDATE ... RETURNING id, на остальных базах они выбираются
+    с блокировкой перед обновлением.
+
+    Аргументы:
+        task_ids (list): Идентификаторы задач.
+        status (str): Новый статус.
+        now (datetime): Время завершения для задач, завершенных впервые.
+
+    Возвращает:
+        list: Идентификаторы задач, статус которых изменился.
+    """
+    using = router.db_for_write(Task)
+    connection = connections[using]
+    if connection.vendor not in ("postgresql", "sqlite"):
+        with transaction.atomic(using=using):
+            changed = list(
+                Task.objects.using(using)
+                .select_for_update()
+                .filter(pk__in=task_ids)
+                .exclude(status=status)
+                .values_list("pk", flat=True)
+            )
+            Task.objects.using(using).filter(pk__in=changed).update(
+                status=status,
+                finished_at=(
+                    Coalesce(F("finished_at"), Value(now))
+                    if status == "finish"
+                    else None
+                ),
+                version=F("version") + 1,
+            )
+        return changed
+    meta = Task._meta
+    qn = connection.ops.quote_name
+    status_column = qn(meta.get_field("status").column)
+    finished_column = qn(meta.get_field("finished_at").column)
+    version_column = qn(meta.get_field("version").column)
+    finished_at = meta.get_field("finished_at").get_db_prep_save(now, connection)
+    if status == "finish":
+        finished = f"COALESCE({finished_column}, %s)"
+        params = [status, finished_at]
+    else:
+        finished = "NULL"
+        params = [status]
+    placeholders = ", ".join(["%s"] * len(task_ids))
+    sql = (
+        f"UPDATE {qn(meta.db_table)} SET {status_column} = %s, "
+        f"{finished_column} = {finished}, {version_column} = {version_column} + 1 "
+        f"WHERE {qn(meta.pk.column)} IN ({placeholders}) AND {status_column} <> %s "
+        f"RETURNING {qn(meta.pk.column)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + task_ids + [status])
+        return [row[0] for row in cursor.fetchall()]
+
+
+status_buffer = StatusWriteBuffer()
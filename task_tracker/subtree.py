@@ -0,0 +1,128 @@
+from django.db import connection, connections, router, transaction
+from django.utils import timezone
+
+from task_tracker.events import publish_on_commit, task_event
+from task_tracker.models import Task
+from task_tracker.snapshot import mark_tracker_dirty
+
+SUBTREE_CTE = (
+    "WITH RECURSIVE subtree(id) AS ("
+    "SELECT id FROM {table} WHERE id = %s "
+    "UNION SELECT t.id FROM {table} t JOIN subtree s ON t.parent_task_id = s.id) "
+)
+
+
+def _execute_subtree(statement, params):
+    """Выполняет запрос над задачей и всеми ее потомками.
+
+    Множество задач поддерева вычисляется рекурсивным CTE subtree, поэтому
+    потомки не загружаются в память. UNION защищает от зацикленных цепочек.
+
+    Аргументы:
+        statement (str): Запрос UPDATE/DELETE с RETURNING, использующий subtree.
+        params (list): Параметры запроса, первым идет идентификатор корня.
+
+    Возвращает:
+        list: Строки, возвращенные RETURNING.
+    """
+    table = connection.ops.quote_name(Task._meta.db_table)
+    sql = SUBTREE_CTE.format(table=table) + statement.format(table=table)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def subtree_query(task_id, statement):
+    """Выполняет запрос над деревом задачи на базе данных для чтения."""
+    connection = connections[router.db_for_read(Task)]
+    table = connection.ops.quote_name(Task._meta.db_table)
+    sql = SUBTREE_CTE.format(table=table) + statement.format(table=table)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [task_id])
+        return cursor.fetchall()
+
+
+def _workload_delta(rows, delta):
+    """Считает изменение количества активных задач по сотрудникам.
+
+    Аргументы:
+        rows (list): Строки (id, parent_task_id, employee_id, ...) задач.
+        delta (int): Изменение количества активных задач на одну строку.
+
+    Возвращает:
+        dict: Изменение загрузки по идентификатору сотрудника.
+    """
+    workload_delta = {}
+    for row in rows:
+        employee_id = row[2]
+        if employee_id is not None:
+            workload_delta[employee_id] = workload_delta.get(employee_id, 0) + delta
+    return workload_delta
+
+
+def _mark_dirty_on_commit(rows):
+    """Помечает в снимке трекера измененные задачи и их родителей после коммита."""
+    task_ids = {row[0] for row in rows} | {row[1] for row in rows}
+    transaction.on_commit(lambda: mark_tracker_dirty(*task_ids))
+
+
+def set_subtree_status(task_id, status):
+    """Меняет статус задачи и всех ее потомков одним запросом.
+
+    Задачи, у которых статус уже совпадает с новым, не затрагиваются,
+    версия остальных увеличивается, а время завершения отмечается
+    или сбрасывается.
+
+    Аргументы:
+        task_id (int): Идентификатор корневой задачи.
+        status (str): Новый статус, 'start' или 'finish'.
+
+    Возвращает:
+        dict | None: Количество измененных задач и изменение загрузки
+        сотрудников или None, если задача не найдена.
+    """
+    finished_at = timezone.now() if status == "finish" else None
+    with transaction.atomic():
+        if not Task.objects.filter(pk=task_id).exists():
+            return None
+        rows = _execute_subtree(
+            "UPDATE {table} SET status = %s, version = version + 1, finished_at = %s "
+            "WHERE id IN (SELECT id FROM subtree) AND status <> %s "
+            "RETURNING id, parent_task_id, employee_id, version",
+            [task_id, status, finished_at, status],
+        )
+        _mark_dirty_on_commit(rows)
+        publish_on_commit(
+            task_event("task.saved", pk, parent_id, employee_id, status, version)
+            for pk, parent_id, employee_id, version in rows
+        )
+    return {
+        "tasks": len(rows),
+        "workload_delta": _workload_delta(rows, -1 if status == "finish" else 1),
+    }
+
+
+def delete_subtree(task_id):
+    """Удаляет задачу и всех ее потомков одним запросом.
+
+    В отличие от on_delete=CASCADE, потомки не загружаются в память.
+
+    Аргументы:
+        task_id (int): Идентификатор корневой задачи.
+
+    Возвращает:
+        dict | None: Количество удаленных задач и изменение загрузки
+        сотрудников или None, если задача не найдена.
+    """
+    with transaction.atomic():
+        rows = _execute_subtree(
+            "DELETE FROM {table} WHERE id IN (SELECT id FROM subtree) "
+            "RETURNING id, parent_task_id, employee_id, status",
+            [task_id],
+        )
+        if not rows:
+            return None
+        _mark_dirty_on_commit(rows)
+        publish_on_commit(task_event("task.deleted", *row) for row in rows)
+    active_rows = [row for row in rows if row[3] == "start"]
+    return {"tasks": len(rows), "workload_delta": _workload_delta(active_rows, -1)}
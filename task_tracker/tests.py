@@ -1,20 +1,37 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from config.events import get_broker
 from employees.models import Employee
-from task_tracker.models import Task
+from task_tracker.models import ArchivedTask, CapacityPlan, Task
+from task_tracker.serializers import TaskSerializer
+from task_tracker.services import get_workload, important_tasks, suggest_employees
+from task_tracker.snapshot import (DIRTY_MARK_KEY, DIRTY_SINCE_KEY,
+                                   _consume_marks, mark_tracker_dirty,
+                                   refresh_tracker_snapshot)
+from task_tracker.status_buffer import StatusWriteBuffer
+from task_tracker.views import TaskCreateAPIView
 
 
+@override_settings(TRACKER_SNAPSHOT_MAX_STALENESS=0)
 class TaskTestCase(APITestCase):
     """Тесты для модели задачи."""
 
-    def setUp(self):
-        """Предварительная настройка для тестов.
-
-        Создает тестовую задачу, которая будет использоваться в тестах.
-        """
-        self.task = Task.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        """Создает тестовую задачу один раз для всех тестов класса."""
+        cls.task = Task.objects.create(
             name="Тест задача",
             parent_task=None,
             employee=None,
@@ -22,6 +39,10 @@ class TaskTestCase(APITestCase):
             status="start",
         )
 
+    def setUp(self):
+        """Очищает кэш со снимком трекера перед каждым тестом."""
+        cache.clear()
+
     def test_task_create(self):
         """Тест на создание новой задачи.
 
@@ -36,7 +57,8 @@ class TaskTestCase(APITestCase):
             "deadline": "2024-12-12",
             "status": "start",
         }
-        response = self.client.post(url, data, format="json")
+        with self.assertNumQueries(2):
+            response = self.client.post(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response.data["name"], "Написать программу")
         self.assertEqual(response.data["parent_task"], None)
@@ -45,6 +67,59 @@ class TaskTestCase(APITestCase):
         self.assertEqual(response.data["status"], "start")
         self.assertEqual(Task.objects.count(), 2)
 
+    def test_task_create_idempotent(self):
+        """Тест на идемпотентное создание задачи.
+
+        Проверяет, что повтор запроса с тем же Idempotency-Key возвращает
+        исходный ответ без обращения к базе данных, а повтор с другим
+        телом получает 422.
+        """
+        url = reverse("task_tracker:task-create")
+        data = {"name": "Повторяемая задача", "status": "start"}
+        headers = {"HTTP_IDEMPOTENCY_KEY": "create-1"}
+        response = self.client.post(url, data, format="json", **headers)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        with self.assertNumQueries(0):
+            replay = self.client.post(url, data, format="json", **headers)
+        self.assertEqual(replay.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replay.data, response.data)
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(Task.objects.filter(name=data["name"]).count(), 1)
+        response = self.client.post(
+            url, {**data, "name": "Другая"}, format="json", **headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_task_idempotency_retry(self):
+        """Тест на повтор идемпотентных запросов после ошибки.
+
+        Проверяет, что необработанное исключение снимает блокировку ключа
+        и повтор выполняется, а повтор изменения с другим If-Match не
+        получает сохраненный ответ.
+        """
+        url = reverse("task_tracker:task-create")
+        data = {"name": "Задача после сбоя", "status": "start"}
+        headers = {"HTTP_IDEMPOTENCY_KEY": "create-2"}
+        with mock.patch.object(
+            TaskCreateAPIView, "perform_create", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                self.client.post(url, data, format="json", **headers)
+        response = self.client.post(url, data, format="json", **headers)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        url = reverse("task_tracker:task-update", args=(self.task.id,))
+        headers = {"HTTP_IDEMPOTENCY_KEY": "update-1"}
+        data = {"name": "update task"}
+        response = self.client.patch(
+            url, data, format="json", HTTP_IF_MATCH='"1"', **headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.patch(
+            url, data, format="json", HTTP_IF_MATCH='"2"', **headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
     def test_task_retrieve(self):
         """Тест на получение информации о задаче.
 
@@ -52,7 +127,8 @@ class TaskTestCase(APITestCase):
         корректно возвращается через API.
         """
         url = reverse("task_tracker:task-retrieve", args=(self.task.id,))
-        response = self.client.get(url, format="json")
+        with self.assertNumQueries(2):
+            response = self.client.get(url, format="json")
         data = response.json()
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(data["name"], self.task.name)
@@ -61,6 +137,54 @@ class TaskTestCase(APITestCase):
         self.assertEqual(data["deadline"], self.task.deadline)
         self.assertEqual(data["status"], self.task.status)
 
+    def test_task_retrieve_conditional(self):
+        """Тест на условное получение задачи.
+
+        Проверяет, что ответ содержит ETag, повторный запрос с ним получает
+        304 одним запросом к базе данных, а после изменения задачи снова 200.
+        """
+        url = reverse("task_tracker:task-retrieve", args=(self.task.id,))
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(etag, '"1"')
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.head(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["ETag"], etag)
+        self.task.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["ETag"], '"2"')
+
+    def test_task_bulk_retrieve(self):
+        """Тест на пакетное получение задач.
+
+        Проверяет порядок запроса, список ненайденных задач, ограничение
+        размера пакета и общий с просмотром задачи кэш.
+        """
+        other = Task.objects.create(name="Другая задача")
+        url = reverse("task_tracker:task-bulk")
+        ids = f"{other.id},0,{self.task.id},{other.id}"
+        response = self.client.get(url, {"ids": ids})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        ids = f"{other.id},999999,{self.task.id},{other.id}"
+        response = self.client.get(url, {"ids": ids})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]], [other.id, self.task.id]
+        )
+        self.assertEqual(response.data["missing"], [999999])
+        with self.assertNumQueries(1):
+            self.client.post(url, {"ids": [self.task.id]}, format="json")
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse("task_tracker:task-retrieve", args=(other.id,))
+            )
+        self.assertEqual(response.data["name"], other.name)
+        response = self.client.post(url, {"ids": list(range(1, 502))}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_task_update(self):
         """Тест на обновление информации о задаче.
 
@@ -68,10 +192,55 @@ class TaskTestCase(APITestCase):
         через API и возвращаемые данные соответствуют ожидаемым.
         """
         url = reverse("task_tracker:task-update", args=(self.task.id,))
-        response = self.client.patch(url, {"name": "update task"}, format="json")
+        with self.assertNumQueries(3):
+            response = self.client.patch(url, {"name": "update task"}, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["name"], "update task")
 
+    def test_task_update_if_match(self):
+        """Тест на обновление задачи с проверкой версии.
+
+        Проверяет, что обновление с актуальной версией в If-Match
+        проходит и увеличивает версию, а с устаревшей возвращает 412.
+        """
+        url = reverse("task_tracker:task-update", args=(self.task.id,))
+        with self.assertNumQueries(2):
+            response = self.client.patch(
+                url, {"name": "update task"}, format="json", HTTP_IF_MATCH='"1"'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["version"], 2)
+        self.assertEqual(response["ETag"], '"2"')
+        response = self.client.patch(
+            url, {"name": "stale task"}, format="json", HTTP_IF_MATCH='"1"'
+        )
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.name, "update task")
+
+    def test_task_update_finish_twice(self):
+        """Тест на повторное завершение задачи с проверкой версии.
+
+        Проверяет, что повторная передача status=finish не сдвигает уже
+        отмеченное время завершения, а смена статуса на start его сбрасывает.
+        Время завершения добавляет представление, а не сериализатор.
+        """
+        url = reverse("task_tracker:task-update", args=(self.task.id,))
+        data = {"name": self.task.name, "status": "finish"}
+        serializer = TaskSerializer(self.task, data=data, partial=True)
+        self.assertTrue(serializer.is_valid())
+        self.assertNotIn("finished_at", serializer.validated_data)
+        response = self.client.patch(url, data, format="json", HTTP_IF_MATCH='"1"')
+        finished_at = response.data["finished_at"]
+        self.assertIsNotNone(finished_at)
+        with self.assertNumQueries(2):
+            response = self.client.patch(url, data, format="json", HTTP_IF_MATCH='"2"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["finished_at"], finished_at)
+        data["status"] = "start"
+        response = self.client.patch(url, data, format="json")
+        self.assertIsNone(response.data["finished_at"])
+
     def test_task_delete(self):
         """Тест на удаление задачи.
 
@@ -79,7 +248,8 @@ class TaskTestCase(APITestCase):
         и что количество задач в базе данных уменьшается.
         """
         url = reverse("task_tracker:task-delete", args=(self.task.id,))
-        response = self.client.delete(url, format="json")
+        with self.assertNumQueries(3):
+            response = self.client.delete(url, format="json")
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(Task.objects.count(), 0)
 
@@ -90,10 +260,36 @@ class TaskTestCase(APITestCase):
         через API и что количество задач соответствует ожидаемому.
         """
         url = reverse("task_tracker:task-list")
-        response = self.client.get(url, format="json")
+        with self.assertNumQueries(1):
+            response = self.client.get(url, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(Task.objects.count(), 1)
 
+    def test_task_list_include(self):
+        """Тест на подгрузку связанных объектов в список задач.
+
+        Проверяет, что исполнители и родительские задачи загружаются
+        по одному запросу на связь, не повторяются и не дублируют
+        задачи из основного списка.
+        """
+        employee = Employee.objects.create(full_name="Тест работник")
+        parent = Task.objects.create(name="Родитель", employee=employee)
+        for name in ("Первая", "Вторая"):
+            Task.objects.create(name=name, employee=employee, parent_task=parent)
+        url = reverse("task_tracker:task-list")
+        # Все родители уже есть в списке, поэтому запрос к задачам не нужен.
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {"include": "employee,parent_task"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 4)
+        self.assertEqual(
+            [row["id"] for row in response.data["included"]["employee"]],
+            [employee.id],
+        )
+        self.assertEqual(response.data["included"]["parent_task"], [])
+        response = self.client.get(url, {"include": "manager"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_important_task_list(self):
         """Тест на получение списка менее загруженных сотрудников.
 
@@ -109,7 +305,382 @@ class TaskTestCase(APITestCase):
             parent_task=self.task,
         )
         url = reverse("task_tracker:tracker")
-        response = self.client.get(url, format="json")
+        with self.assertNumQueries(3):
+            response = self.client.get(url, format="json")
         data = response.json()
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(data[0]["available_employees"], ["Тест работник"])
+
+    def test_important_task_list_distinct(self):
+        """Тест на отсутствие дублей в трекере.
+
+        Проверяет, что задача с несколькими активными подзадачами
+        возвращается один раз.
+        """
+        for number in range(3):
+            employee = Employee.objects.create(full_name=f"Работник {number}")
+            Task.objects.create(
+                name=f"Подзадача {number}", employee=employee, parent_task=self.task
+            )
+        url = reverse("task_tracker:tracker")
+        with self.assertNumQueries(3):
+            response = self.client.get(url, format="json")
+        data = response.json()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(data), 1)
+        self.assertEqual(len(data[0]["tasks"]), 3)
+
+    def test_important_task_list_refresh(self):
+        """Тест на обновление снимка трекера.
+
+        Проверяет, что изменения задач и сотрудников попадают в ответ
+        трекера после обновления снимка.
+        """
+        url = reverse("task_tracker:tracker")
+        self.assertEqual(self.client.get(url).json(), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            employee = Employee.objects.create(full_name="Тест работник")
+            child = Task.objects.create(
+                name="Подзадача", employee=employee, parent_task=self.task
+            )
+            Employee.objects.create(full_name="Свободный работник")
+        with self.assertNumQueries(4):
+            data = self.client.get(url).json()
+        self.assertEqual(len(data), 1)
+        self.assertEqual(
+            data[0]["available_employees"], ["Свободный работник", "Тест работник"]
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            child.status = "finish"
+            child.save()
+        self.assertEqual(self.client.get(url).json(), [])
+
+    def test_tracker_dirty_after_commit(self):
+        """Тест на отметку снимка трекера после фиксации транзакции.
+
+        Проверяет, что изменения задачи и сотрудника внутри транзакции
+        помечают снимок устаревшим только после ее фиксации.
+        """
+        employee = Employee.objects.create(full_name="Тест работник")
+        refresh_tracker_snapshot()
+        self.assertIsNone(cache.get(DIRTY_SINCE_KEY))
+        for instance in (self.task, employee):
+            cache.delete(DIRTY_SINCE_KEY)
+            with self.captureOnCommitCallbacks() as callbacks:
+                with transaction.atomic():
+                    instance.save()
+                self.assertIsNone(cache.get(DIRTY_SINCE_KEY))
+            for callback in callbacks:
+                callback()
+            self.assertIsNotNone(cache.get(DIRTY_SINCE_KEY))
+
+    def test_tracker_dirty_marks(self):
+        """Тест на отметки об устаревании снимка трекера.
+
+        Проверяет, что обновление снимка забирает только прочитанные
+        отметки, отметки, сделанные после него, применяются следующим
+        обновлением, а потеря отметки приводит к полному пересчету.
+        """
+        snapshot = refresh_tracker_snapshot()
+        mark_tracker_dirty(self.task.pk)
+        mark_tracker_dirty(None)
+        applied, dirty_ids = _consume_marks(snapshot["applied"])
+        self.assertEqual(dirty_ids, {self.task.pk})
+        self.assertIsNone(cache.get(DIRTY_SINCE_KEY))
+        mark_tracker_dirty(42)
+        self.assertIsNotNone(cache.get(DIRTY_SINCE_KEY))
+        self.assertEqual(_consume_marks(applied), (applied + 1, {42}))
+        mark_tracker_dirty(43)
+        cache.delete(DIRTY_MARK_KEY.format(applied + 2))
+        self.assertEqual(_consume_marks(applied + 1), (applied + 2, None))
+
+    def test_subtree_status(self):
+        """Тест на смену статуса поддерева задач.
+
+        Проверяет, что статус меняется у задачи и всех ее потомков,
+        а в ответе возвращается изменение загрузки сотрудников.
+        """
+        employee = Employee.objects.create(full_name="Тест работник")
+        child = Task.objects.create(
+            name="Подзадача", employee=employee, parent_task=self.task
+        )
+        Task.objects.create(name="Подподзадача", employee=employee, parent_task=child)
+        url = reverse("task_tracker:task-subtree-status", args=(self.task.id,))
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(4):
+                response = self.client.post(url, {"status": "finish"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["tasks"], 3)
+        self.assertEqual(response.data["workload_delta"], {employee.id: -2})
+        self.assertFalse(Task.objects.filter(status="start").exists())
+
+    def test_task_status(self):
+        """Тест на быструю смену статуса задачи.
+
+        Проверяет, что статус записывается пачкой до ответа, версия задачи
+        увеличивается, а размер пачки попадает в ответ и статистику.
+        Повтор того же статуса не меняет версию и время завершения, а для
+        несуществующей задачи возвращается 404.
+        """
+        url = reverse("task_tracker:task-status", args=(self.task.id,))
+        with self.assertNumQueries(2):
+            response = self.client.post(url, {"status": "finish"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["batch_size"], 1)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, "finish")
+        self.assertEqual(self.task.version, 2)
+        finished_at = self.task.finished_at
+        self.assertIsNotNone(finished_at)
+        response = self.client.post(url, {"status": "finish"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.version, 2)
+        self.assertEqual(self.task.finished_at, finished_at)
+        response = self.client.get(reverse("task_tracker:task-status-stats"))
+        self.assertGreaterEqual(response.data["batches"], 1)
+        missing = reverse("task_tracker:task-status", args=(self.task.id + 100,))
+        response = self.client.post(missing, {"status": "finish"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(
+        TASK_STATUS_BUFFER_DURABLE=False, TASK_STATUS_BUFFER_INTERVAL_MS=60000
+    )
+    def test_task_status_coalesce(self):
+        """Тест на схлопывание изменений статуса одной задачи в пачке."""
+        buffer = StatusWriteBuffer()
+        self.addCleanup(buffer.stop)
+        self.assertIsNone(buffer.submit(self.task.id, "finish"))
+        self.assertIsNone(buffer.submit(self.task.id, "start"))
+        with self.assertNumQueries(1):
+            self.assertEqual(buffer.flush(), 1)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, "start")
+        self.assertEqual(self.task.version, 1)
+        self.assertIsNone(self.task.finished_at)
+        self.assertEqual(buffer.stats()["max_batch"], 1)
+
+    @override_settings(
+        TASK_STATUS_BUFFER_DURABLE=False, TASK_STATUS_BUFFER_INTERVAL_MS=60000
+    )
+    def test_task_status_marks_changed_only(self):
+        """Тест на отметку только действительно измененных задач.
+
+        Проверяет, что задача, у которой статус уже совпадает с новым,
+        не попадает в отметки снимка трекера.
+        """
+        finished = Task.objects.create(name="Завершенная задача", status="finish")
+        buffer = StatusWriteBuffer()
+        self.addCleanup(buffer.stop)
+        buffer.submit(self.task.id, "finish")
+        buffer.submit(finished.id, "finish")
+        with mock.patch("task_tracker.status_buffer.mark_tracker_dirty") as mark:
+            with self.assertNumQueries(1):
+                self.assertEqual(buffer.flush(), 2)
+        mark.assert_called_once_with(self.task.id)
+        finished.refresh_from_db()
+        self.assertEqual(finished.version, 1)
+
+    def test_task_schedule(self):
+        """Тест на расписание дерева задач.
+
+        Проверяет раннее и позднее завершение, резерв, критический путь,
+        подзадачи со сроком позже родителя и сброс кэша при изменении дерева.
+        """
+        today = timezone.localdate()
+        self.task.deadline = today + timedelta(days=3)
+        self.task.save()
+        short = Task.objects.create(
+            name="Короткая", parent_task=self.task, deadline=today + timedelta(days=5)
+        )
+        chain = Task.objects.create(name="Цепочка", parent_task=self.task)
+        leaf = Task.objects.create(name="Лист", parent_task=chain)
+        url = reverse("task_tracker:task-schedule", args=(self.task.id,))
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["critical_path"], [self.task.id, chain.id, leaf.id]
+        )
+        self.assertEqual(response.data["deadline_conflicts"], [short.id])
+        self.assertEqual(response.data["finish"], today + timedelta(days=3))
+        tasks = {row["id"]: row for row in response.data["tasks"]}
+        self.assertEqual(tasks[self.task.id]["slack"], 0)
+        self.assertEqual(tasks[short.id]["latest_finish"], today + timedelta(days=2))
+        self.assertEqual(tasks[short.id]["slack"], 1)
+        self.assertEqual(tasks[chain.id]["slack"], 0)
+        self.assertEqual(tasks[leaf.id]["slack"], 0)
+        with self.assertNumQueries(1):
+            self.client.get(url)
+        leaf.status = "finish"
+        leaf.save()
+        response = self.client.get(url)
+        self.assertEqual(response.data["finish"], today + timedelta(days=2))
+
+    @override_settings(EVENTS_STREAM_SECONDS=0.2, EVENTS_HEARTBEAT_SECONDS=0.1)
+    def test_task_events(self):
+        """Тест на поток событий изменений задач.
+
+        Проверяет, что подписчик поддерева получает события о задачах
+        поддерева, включая созданные после подписки подзадачи, не получает
+        события о других задачах, а по истечении времени жизни потока
+        отписывается.
+        """
+        child = Task.objects.create(name="Подзадача", parent_task=self.task)
+        url = reverse("task_tracker:task-events")
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                url, {"subtree": self.task.id}, HTTP_ACCEPT="text/event-stream"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = iter(response.streaming_content)
+        self.assertEqual(next(stream), b"retry: 3000\n\n")
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(name="Другая задача")
+            grandchild = Task.objects.create(name="Подподзадача", parent_task=child)
+            child.status = "finish"
+            child.save()
+        chunk = next(stream).decode()
+        self.assertEqual(chunk.count("event: task.saved"), 2)
+        self.assertIn(f'"id": {grandchild.id}', chunk)
+        self.assertIn(f'"id": {child.id}', chunk)
+        self.assertNotIn("Другая", chunk)
+        rest = b"".join(stream)
+        self.assertIn(b": heartbeat", rest)
+        self.assertNotIn(b"event:", rest)
+        self.assertFalse(get_broker().active)
+        response = self.client.get(url, {"subtree": 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_subtree_delete(self):
+        """Тест на удаление поддерева задач.
+
+        Проверяет, что удаление задачи удаляет и всех ее потомков.
+        """
+        child = Task.objects.create(name="Подзадача", parent_task=self.task)
+        Task.objects.create(name="Подподзадача", parent_task=child)
+        Task.objects.create(name="Другая задача")
+        url = reverse("task_tracker:task-delete", args=(self.task.id,))
+        with self.assertNumQueries(3):
+            response = self.client.delete(url, format="json")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(Task.objects.count(), 1)
+        response = self.client.delete(url, format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_admin_task_changelist(self):
+        """Тест списка задач в админке.
+
+        Проверяет, что список задач с фильтром и поиском открывается
+        и выполняет ограниченное количество запросов.
+        """
+        admin_user = get_user_model().objects.create_superuser(
+            "admin@example.com", "admin"
+        )
+        self.client.force_login(admin_user)
+        url = reverse("admin:task_tracker_task_changelist")
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {"status__exact": "start", "q": "Тест"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertContains(response, self.task.name)
+
+    def test_task_recommend(self):
+        """Тест на подбор исполнителей задачи.
+
+        Проверяет, что совпадение должности перевешивает одну активную
+        задачу, а количество кандидатов ограничено параметром k.
+        """
+        busy = Employee.objects.create(full_name="Занятый", post="developer")
+        Employee.objects.create(full_name="Свободный", post="manager")
+        Employee.objects.create(full_name="Разработчик", post="developer")
+        Task.objects.create(name="Другая задача", employee=busy)
+        url = reverse("task_tracker:task-recommend", args=(self.task.id,))
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {"k": 2, "post": "developer"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [candidate["full_name"] for candidate in response.data],
+            ["Разработчик", "Занятый"],
+        )
+
+    def test_archive_tasks(self):
+        """Тест на перенос завершенных задач в архив.
+
+        Проверяет, что в архив переносятся давно завершенные задачи вместе
+        с подзадачами, а активные и недавно завершенные остаются, что
+        после переноса публикуются события task.deleted, и что архивные
+        задачи доступны через API по запросу.
+        """
+        long_ago = timezone.now() - timedelta(days=365)
+        child = Task.objects.create(name="Подзадача", parent_task=self.task)
+        Task.objects.filter(pk__in=(self.task.pk, child.pk)).update(
+            status="finish", finished_at=long_ago
+        )
+        recent = Task.objects.create(name="Недавняя задача", status="finish")
+        subscription = get_broker().subscribe()
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command("archive_tasks", "--batch-size", "1", stdout=StringIO())
+            events, _ = subscription.get(0)
+        finally:
+            subscription.close()
+        self.assertEqual(
+            [(event["type"], event["id"]) for event in events],
+            [("task.deleted", child.pk), ("task.deleted", self.task.pk)],
+        )
+        self.assertEqual(list(Task.objects.values_list("pk", flat=True)), [recent.pk])
+        self.assertEqual(ArchivedTask.objects.count(), 2)
+        url = reverse("task_tracker:task-retrieve", args=(child.id,))
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {"archived": "true"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["parent_task_id"], self.task.id)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        url = reverse("task_tracker:task-list")
+        response = self.client.get(url, {"archived": "true"})
+        self.assertEqual(len(response.data), 2)
+
+    def test_capacity_plan(self):
+        """Тест на офлайн-расчет плана загрузки.
+
+        Проверяет, что при чтении пачками по одной задаче план совпадает
+        с трекером: в нем только важные задачи, а кандидаты - наименее
+        загруженные сотрудники и исполнители подзадач. Строки задач,
+        переставших быть важными, удаляются при повторном расчете.
+        """
+        busy = Employee.objects.create(full_name="Занятый", post="developer")
+        free = Employee.objects.create(full_name="Свободный", post="developer")
+        manager = Employee.objects.create(full_name="Менеджер", post="manager")
+        Task.objects.create(name="Подзадача 1", parent_task=self.task, employee=busy)
+        Task.objects.create(name="Подзадача 2", parent_task=self.task, employee=busy)
+        other = Task.objects.create(name="Другая задача")
+        Task.objects.create(name="Подзадача 3", parent_task=other, employee=manager)
+        Task.objects.create(name="Без подзадач")
+        out = StringIO()
+        call_command("capacity_plan", "--batch-size", "1", stdout=out)
+        workload = get_workload()
+        names = {pk: name for pk, name, _ in workload}
+        plans = CapacityPlan.objects.order_by("pk")
+        self.assertEqual(
+            [plan.task_id for plan in plans],
+            list(important_tasks().values_list("pk", flat=True)),
+        )
+        for plan in plans:
+            executors = set(
+                Task.objects.filter(parent_task_id=plan.task_id).values_list(
+                    "employee_id", flat=True
+                )
+            )
+            self.assertEqual(
+                [names[pk] for pk in plan.candidates],
+                suggest_employees(workload, executors),
+            )
+        self.assertEqual(plans.get(pk=self.task.pk).candidates, [free.pk, busy.pk])
+        self.assertIn("developer: сотрудников 2, активных задач 2", out.getvalue())
+        other.employee = free
+        other.save()
+        call_command("capacity_plan", stdout=StringIO())
+        self.assertEqual(
+            list(CapacityPlan.objects.values_list("pk", flat=True)), [self.task.pk]
+        )
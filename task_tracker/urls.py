@@ -1,9 +1,13 @@
 from django.urls import path
 
 from task_tracker.apps import TaskTrackerConfig
-from task_tracker.views import (TaskCreateAPIView, TaskDestroyAPIView,
+from task_tracker.views import (TaskBulkRetrieveAPIView, TaskCreateAPIView,
+                                TaskDestroyAPIView, TaskEventStreamAPIView,
                                 TaskImportantListAPIView, TaskListAPIView,
-                                TaskRetrieveAPIView, TaskUpdateAPIView)
+                                TaskRecommendationAPIView, TaskRetrieveAPIView,
+                                TaskScheduleAPIView, TaskStatusAPIView,
+                                TaskStatusStatsAPIView,
+                                TaskSubtreeStatusAPIView, TaskUpdateAPIView)
 
 app_name = TaskTrackerConfig.name
 
@@ -11,7 +15,24 @@ urlpatterns = [
     path("create/", TaskCreateAPIView.as_view(), name="task-create"),
     path("list/", TaskListAPIView.as_view(), name="task-list"),
     path("<int:pk>/", TaskRetrieveAPIView.as_view(), name="task-retrieve"),
+    path("bulk/", TaskBulkRetrieveAPIView.as_view(), name="task-bulk"),
     path("update/<int:pk>/", TaskUpdateAPIView.as_view(), name="task-update"),
     path("delete/<int:pk>/", TaskDestroyAPIView.as_view(), name="task-delete"),
     path("tracker/", TaskImportantListAPIView.as_view(), name="tracker"),
+    path("events/", TaskEventStreamAPIView.as_view(), name="task-events"),
+    path(
+        "subtree/status/<int:pk>/",
+        TaskSubtreeStatusAPIView.as_view(),
+        name="task-subtree-status",
+    ),
+    path("schedule/<int:pk>/", TaskScheduleAPIView.as_view(), name="task-schedule"),
+    path("status/<int:pk>/", TaskStatusAPIView.as_view(), name="task-status"),
+    path(
+        "status/stats/", TaskStatusStatsAPIView.as_view(), name="task-status-stats"
+    ),
+    path(
+        "recommend/<int:pk>/",
+        TaskRecommendationAPIView.as_view(),
+        name="task-recommend",
+    ),
 ]
\ No newline at end of file
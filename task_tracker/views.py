@@ -1,12 +1,39 @@
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.generics import (CreateAPIView, DestroyAPIView,
-                                     ListAPIView, RetrieveAPIView,
-                                     UpdateAPIView)
-
-from task_tracker.models import Task
-from task_tracker.serializers import MainTaskSerializer, TaskSerializer
-
-
-class TaskCreateAPIView(CreateAPIView):
+                                     GenericAPIView, ListAPIView,
+                                     RetrieveAPIView, UpdateAPIView)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from config.concurrency import (ConditionalRetrieveMixin, IfNull,
+                                OptimisticUpdateMixin)
+from config.db_router import ReplicaReadMixin
+from config.events import EventStreamRenderer, event_stream_response
+from config.idempotency import IdempotencyMixin
+from config.object_cache import BulkRetrieveMixin
+from config.throttling import ConcurrencyLimitMixin
+from employees.models import Employee
+from employees.serializers import EmployeeSerializer
+from task_tracker.events import TaskEventFilter
+from task_tracker.models import ArchivedTask, Task
+from task_tracker.serializers import (ArchivedTaskSerializer,
+                                      MainTaskSerializer,
+                                      RecommendationQuerySerializer,
+                                      TaskEventQuerySerializer,
+                                      TaskSerializer, TaskStatusSerializer)
+from task_tracker.schedule import get_schedule
+from task_tracker.services import important_tasks, recommend_employees
+from task_tracker.snapshot import get_tracker_snapshot
+from task_tracker.status_buffer import status_buffer
+from task_tracker.subtree import (delete_subtree, set_subtree_status,
+                                  subtree_query)
+
+
+class TaskCreateAPIView(IdempotencyMixin, CreateAPIView):
     """Создание задачи.
 
     Этот класс предоставляет API для создания новой задачи.
@@ -20,12 +47,98 @@ class TaskCreateAPIView(CreateAPIView):
     serializer_class = TaskSerializer
 
 
-class TaskListAPIView(ListAPIView):
+class ArchivedQueryMixin:
+    """Примесь для чтения архивных задач по запросу.
+
+    Если в запросе передан параметр archived=true, представление работает
+    с таблицей архивных задач и сериализатором ArchivedTaskSerializer.
+    """
+
+    def is_archived_request(self):
+        """Проверяет, запрошены ли архивные задачи."""
+        request = getattr(self, "request", None)
+        return request is not None and request.query_params.get("archived") in (
+            "1",
+            "true",
+        )
+
+    def get_queryset(self):
+        """Возвращает архивные или активные задачи."""
+        if self.is_archived_request():
+            return ArchivedTask.objects.all()
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        """Возвращает сериализатор для архивных или активных задач."""
+        if self.is_archived_request():
+            return ArchivedTaskSerializer
+        return super().get_serializer_class()
+
+
+class IncludeMixin:
+    """Примесь для подгрузки связанных объектов в список задач.
+
+    С параметром include=employee,parent_task ответ списка имеет вид
+    {"results": [...], "included": {"employee": [...], "parent_task": [...]}}.
+    Связанные объекты каждого вида загружаются одним запросом in_bulk
+    и не повторяются, родительские задачи, уже попавшие в results,
+    в included не дублируются.
+    """
+
+    INCLUDES = {
+        "employee": ("employee_id", Employee, EmployeeSerializer),
+        "parent_task": ("parent_task_id", Task, TaskSerializer),
+    }
+
+    def get_includes(self):
+        """Возвращает запрошенные виды связанных объектов."""
+        value = self.request.query_params.get("include", "")
+        includes = [name for name in value.split(",") if name]
+        unknown = set(includes) - set(self.INCLUDES)
+        if unknown:
+            raise ValidationError(
+                {"include": f"Неизвестные связи: {', '.join(sorted(unknown))}."}
+            )
+        return includes
+
+    def list(self, request, *args, **kwargs):
+        """Возвращает список задач и связанные объекты из параметра include."""
+        includes = self.get_includes()
+        if not includes:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        tasks = list(page if page is not None else queryset)
+        primary_ids = {task.pk for task in tasks}
+        included = {}
+        for name in includes:
+            attname, model, serializer_class = self.INCLUDES[name]
+            ids = {getattr(task, attname) for task in tasks} - {None}
+            if model is Task:
+                ids -= primary_ids
+            objects = model.objects.in_bulk(ids)
+            included[name] = serializer_class(
+                [objects[pk] for pk in sorted(objects)], many=True
+            ).data
+        data = {
+            "results": self.get_serializer(tasks, many=True).data,
+            "included": included,
+        }
+        if page is not None:
+            response = self.get_paginated_response(data["results"])
+            response.data["included"] = included
+            return response
+        return Response(data)
+
+
+class TaskListAPIView(ReplicaReadMixin, IncludeMixin, ArchivedQueryMixin, ListAPIView):
     """Просмотр листа задач.
 
     Этот класс предоставляет API для получения списка всех задач.
     Использует сериализатор TaskSerializer для преобразования данных
-    задач в JSON-формат.
+    задач в JSON-формат. С параметром archived=true возвращает архивные задачи,
+    с параметром include=employee,parent_task подгружает исполнителей и
+    родительские задачи.
 
     Атрибуты:
         serializer_class (TaskSerializer): Сериализатор, используемый для отображения задач.
@@ -36,11 +149,15 @@ class TaskListAPIView(ListAPIView):
     queryset = Task.objects.all()
 
 
-class TaskRetrieveAPIView(RetrieveAPIView):
+class TaskRetrieveAPIView(
+    ReplicaReadMixin, ConditionalRetrieveMixin, ArchivedQueryMixin, RetrieveAPIView
+):
     """Просмотр задачи.
 
     Этот класс предоставляет API для получения конкретной задачи по её идентификатору.
     Использует сериализатор TaskSerializer для преобразования данных задачи в JSON-формат.
+    С параметром archived=true ищет задачу в архиве. Поддерживает условные
+    запросы по ETag (If-None-Match) и HEAD.
 
     Атрибуты:
         serializer_class (TaskSerializer): Сериализатор, используемый для отображения задачи.
@@ -51,12 +168,30 @@ class TaskRetrieveAPIView(RetrieveAPIView):
     queryset = Task.objects.all()
 
 
-class TaskUpdateAPIView(UpdateAPIView):
+class TaskBulkRetrieveAPIView(ReplicaReadMixin, BulkRetrieveMixin, APIView):
+    """Пакетное получение задач.
+
+    Этот класс предоставляет API для получения задач по списку
+    идентификаторов (?ids=1,2,3 или POST {"ids": [...]}) одним запросом.
+    Задачи возвращаются в порядке запроса через общий с просмотром задачи
+    кэш, ненайденные идентификаторы перечисляются в missing.
+
+    Атрибуты:
+        serializer_class (TaskSerializer): Сериализатор, используемый для отображения задач.
+        queryset (QuerySet): Набор данных задач, который будет использован для поиска.
+    """
+
+    serializer_class = TaskSerializer
+    queryset = Task.objects.all()
+
+
+class TaskUpdateAPIView(IdempotencyMixin, OptimisticUpdateMixin, UpdateAPIView):
     """Редактирование задачи.
 
     Этот класс предоставляет API для обновления существующей задачи.
     Использует сериализатор TaskSerializer для валидации и сохранения
-    обновленных данных задачи.
+    обновленных данных задачи. Запись выполняется с проверкой версии
+    (If-Match), при конфликте возвращается 412.
 
     Атрибуты:
         serializer_class (TaskSerializer): Сериализатор, используемый для редактирования задачи.
@@ -66,12 +201,28 @@ class TaskUpdateAPIView(UpdateAPIView):
     serializer_class = TaskSerializer
     queryset = Task.objects.all()
 
+    def get_update_values(self, validated_data):
+        """Отмечает время завершения задачи при смене статуса.
+
+        Запись может быть не прочитана, поэтому время завершения
+        записывается, только если в записи его еще нет, и повторное
+        завершение задачи его не меняет.
+        """
+        values = super().get_update_values(validated_data)
+        if "status" in values:
+            if values["status"] != "finish":
+                values["finished_at"] = None
+            else:
+                values["finished_at"] = IfNull(timezone.now())
+        return values
+
 
 class TaskDestroyAPIView(DestroyAPIView):
     """Удаление задачи.
 
-    Этот класс предоставляет API для удаления существующей задачи.
-    Использует queryset для определения задачи, которую необходимо удалить.
+    Этот класс предоставляет API для удаления существующей задачи вместе
+    со всеми ее подзадачами. Поддерево удаляется одним запросом без
+    загрузки потомков в память.
 
     Атрибуты:
         queryset (QuerySet): Набор данных задач, который будет использован для поиска.
@@ -79,36 +230,191 @@ class TaskDestroyAPIView(DestroyAPIView):
 
     queryset = Task.objects.all()
 
+    def destroy(self, request, *args, **kwargs):
+        """Удаляет задачу и ее поддерево."""
+        if delete_subtree(self.kwargs["pk"]) is None:
+            raise NotFound()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class TaskSubtreeStatusAPIView(IdempotencyMixin, GenericAPIView):
+    """Смена статуса поддерева задач.
+
+    Этот класс предоставляет API для завершения или возобновления задачи
+    вместе со всеми ее подзадачами одним запросом к базе данных.
+    В ответе возвращается количество измененных задач и изменение
+    количества активных задач по сотрудникам.
 
-class TaskImportantListAPIView(ListAPIView):
+    Атрибуты:
+        serializer_class (TaskStatusSerializer): Сериализатор нового статуса.
+        queryset (QuerySet): Набор данных задач.
+    """
+
+    serializer_class = TaskStatusSerializer
+    queryset = Task.objects.all()
+
+    def post(self, request, pk):
+        """Меняет статус задачи и всех ее потомков."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = set_subtree_status(pk, serializer.validated_data["status"])
+        if result is None:
+            raise NotFound()
+        return Response(result)
+
+
+class TaskImportantListAPIView(ConcurrencyLimitMixin, ListAPIView):
     """Поиск менее загруженных сотрудников.
 
     Этот класс предоставляет API для получения списка задач, которые
     имеют активные подзадачи и не имеют назначенного исполнителя.
-    Использует сериализатор MainTaskSerializer для преобразования данных
-    задач в JSON-формат.
+    Результат берется из предрасчитанного снимка трекера, который
+    обновляется при изменении задач и сотрудников.
 
     Атрибуты:
         serializer_class (MainTaskSerializer): Сериализатор, используемый для отображения задач.
         queryset (QuerySet): Набор данных задач, который будет возвращен.
+        throttle_cost (int): Стоимость запроса в токенах ограничения частоты.
+        max_concurrency (int): Предел параллельных запросов одного клиента.
 
     Методы:
         get_queryset(): Переопределяет метод для фильтрации задач по определенным критериям.
+        list(): Возвращает готовый результат из снимка трекера.
     """
 
     serializer_class = MainTaskSerializer
     queryset = Task.objects.all()
+    throttle_cost = 10
+    max_concurrency = 2
 
     def get_queryset(self):
         """Фильтрует задачи для получения только тех, которые имеют активные подзадачи
         и не имеют назначенного исполнителя.
 
         Возвращает:
-            QuerySet: Набор отфильтрованных задач.
+            QuerySet: Набор отфильтрованных задач без дублей.
         """
-        return Task.objects.filter(
-            other__employee__isnull=False,
-            other__status="start",
-            employee__isnull=True,
-            status="start",
-        )
+        return important_tasks()
+
+    def list(self, request, *args, **kwargs):
+        """Возвращает список важных задач из снимка трекера."""
+        return Response(get_tracker_snapshot())
+
+
+class TaskRecommendationAPIView(ReplicaReadMixin, APIView):
+    """Подбор исполнителей задачи.
+
+    Этот класс предоставляет API для получения k лучших кандидатов в
+    исполнители задачи с учетом загрузки, просроченных задач, участия
+    в соседних и дочерних задачах и должности.
+
+    Параметры запроса:
+        k: Количество кандидатов (по умолчанию 5).
+        post: Предпочтительная должность исполнителя.
+    """
+
+    throttle_cost = 5
+
+    def get(self, request, pk):
+        """Возвращает лучших кандидатов в исполнители задачи."""
+        serializer = RecommendationQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        task = get_object_or_404(Task, pk=pk)
+        return Response(recommend_employees(task, params["k"], params.get("post")))
+
+
+class TaskScheduleAPIView(ReplicaReadMixin, APIView):
+    """Расписание дерева задачи.
+
+    Этот класс предоставляет API для получения самого раннего и самого
+    позднего завершения, резерва времени и критического пути по задаче
+    и всем ее подзадачам, а также подзадач со сроком позже срока родителя.
+    Расчет кэшируется до изменения дерева.
+    """
+
+    throttle_cost = 5
+
+    def get(self, request, pk):
+        """Возвращает расписание дерева задачи."""
+        schedule = get_schedule(pk)
+        if schedule is None:
+            raise NotFound()
+        return Response(schedule)
+
+
+class TaskStatusAPIView(IdempotencyMixin, APIView):
+    """Быстрая смена статуса задачи.
+
+    Этот класс предоставляет API для смены статуса одной задачи без
+    чтения задачи и проверки остальных полей. Изменения копятся в буфере
+    и записываются в базу данных пачками (см. TASK_STATUS_BUFFER_*).
+    В надежном режиме ответ 200 отдается после записи и содержит размер
+    пачки, иначе сразу отдается ответ 202. Для несуществующей задачи
+    возвращается 404 (проверяется по индексу первичного ключа).
+    """
+
+    def post(self, request, pk):
+        """Ставит смену статуса задачи в очередь на запись."""
+        serializer = TaskStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if not Task.objects.filter(pk=pk).exists():
+            raise NotFound()
+        task_status = serializer.validated_data["status"]
+        batch_size = status_buffer.submit(pk, task_status)
+        if batch_size is None:
+            return Response(
+                {"id": pk, "status": task_status}, status=status.HTTP_202_ACCEPTED
+            )
+        return Response({"id": pk, "status": task_status, "batch_size": batch_size})
+
+
+class TaskStatusStatsAPIView(APIView):
+    """Статистика пакетной записи статусов задач.
+
+    Этот класс предоставляет API для получения количества записанных
+    пачек и задач, а также размеров последней, средней и наибольшей пачки.
+    """
+
+    def get(self, request):
+        """Возвращает статистику буфера статусов."""
+        return Response(status_buffer.stats())
+
+
+class TaskEventStreamAPIView(ReplicaReadMixin, APIView):
+    """Поток изменений задач и сотрудников.
+
+    Этот класс предоставляет API Server-Sent Events (text/event-stream)
+    вместо периодического опроса списков. События task.saved,
+    task.deleted, employee.saved и employee.deleted содержат
+    идентификаторы и статус, полные записи получаются через
+    /task_tracker/bulk/. Событие overflow означает, что клиент не
+    успевал читать поток и часть событий пропущена, данные нужно
+    перечитать.
+
+    Параметры запроса:
+        employee: Только задачи исполнителя и события этого сотрудника.
+        subtree: Только задачи дерева с этим корнем.
+        status: Только задачи с этим статусом, можно указать несколько раз.
+    """
+
+    renderer_classes = (*api_settings.DEFAULT_RENDERER_CLASSES, EventStreamRenderer)
+
+    def get(self, request):
+        """Открывает поток событий с фильтрами из параметров запроса."""
+        serializer = TaskEventQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        subtree = None
+        if "subtree" in params:
+            subtree = [
+                row[0]
+                for row in subtree_query(
+                    params["subtree"],
+                    "SELECT id FROM {table} WHERE id IN (SELECT id FROM subtree)",
+                )
+            ]
+            if not subtree:
+                raise NotFound()
+        match = TaskEventFilter(params.get("employee"), subtree, params.get("status"))
+        return event_stream_response(request._request, match)
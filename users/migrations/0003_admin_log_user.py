@@ -0,0 +1,106 @@
+# Generated by Django 4.2.2 on 2026-10-19 19:40
+
+from django.db import migrations
+
+# Перевод существующей базы на AUTH_USER_MODEL = "users.User".
+#
+# База, созданная до переключения, хранит журнал админки
+# (django_admin_log) с внешним ключом на auth_user. Миграция переносит
+# учетные записи auth_user с email в users_user (вместе с группами и
+# правами, пароли сохраняются), переводит записи журнала на перенесенных
+# пользователей, удаляет записи пользователей без email и перенаправляет
+# внешний ключ на users_user. Сессии удаляются: в них хранятся
+# идентификаторы auth_user. Таблица auth_user не удаляется. В новой
+# базе внешний ключ уже указывает на users_user, и миграция ничего не
+# делает. Поддерживается только PostgreSQL.
+
+
+def _stale_constraints(connection, cursor, table):
+    """Возвращает внешние ключи user_id таблицы table не на users_user."""
+    constraints = connection.introspection.get_constraints(cursor, table)
+    return [
+        name
+        for name, constraint in constraints.items()
+        if constraint["foreign_key"]
+        and constraint["columns"] == ["user_id"]
+        and constraint["foreign_key"][0] != "users_user"
+    ]
+
+
+def repoint_admin_log(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    User = apps.get_model("users", "User")
+    groups = User.groups.through._meta.db_table
+    permissions = User.user_permissions.through._meta.db_table
+    with connection.cursor() as cursor:
+        tables = connection.introspection.table_names(cursor)
+        if "django_admin_log" not in tables or "auth_user" not in tables:
+            return
+        stale = _stale_constraints(connection, cursor, "django_admin_log")
+        if not stale:
+            return
+        # ALTER TABLE невозможен, пока у таблицы есть отложенные проверки
+        # ключей, а старый ключ не дал бы перевести записи журнала.
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        for name in stale:
+            cursor.execute(f'ALTER TABLE django_admin_log DROP CONSTRAINT "{name}"')
+        cursor.execute("""
+            INSERT INTO users_user (
+                password, last_login, is_superuser, first_name, last_name,
+                email, is_staff, is_active, date_joined
+            )
+            SELECT DISTINCT ON (LOWER(a.email))
+                a.password, a.last_login, a.is_superuser, a.first_name,
+                a.last_name, a.email, a.is_staff, a.is_active, a.date_joined
+            FROM auth_user a
+            WHERE a.email <> '' AND NOT EXISTS (
+                SELECT 1 FROM users_user u WHERE LOWER(u.email) = LOWER(a.email)
+            )
+            ORDER BY LOWER(a.email), a.last_login DESC NULLS LAST
+            """)
+        for table, column, source in (
+            (groups, "group_id", "auth_user_groups"),
+            (permissions, "permission_id", "auth_user_user_permissions"),
+        ):
+            cursor.execute(f"""
+                INSERT INTO {table} (user_id, {column})
+                SELECT DISTINCT u.id, s.{column}
+                FROM {source} s
+                JOIN auth_user a ON a.id = s.user_id
+                JOIN users_user u ON LOWER(u.email) = LOWER(a.email)
+                ON CONFLICT DO NOTHING
+                """)
+        cursor.execute("""
+            DELETE FROM django_admin_log l WHERE NOT EXISTS (
+                SELECT 1 FROM auth_user a
+                JOIN users_user u ON LOWER(u.email) = LOWER(a.email)
+                WHERE a.id = l.user_id AND a.email <> ''
+            )
+            """)
+        cursor.execute("""
+            UPDATE django_admin_log l SET user_id = u.id
+            FROM auth_user a
+            JOIN users_user u ON LOWER(u.email) = LOWER(a.email)
+            WHERE a.id = l.user_id
+            """)
+        if "django_session" in tables:
+            cursor.execute("DELETE FROM django_session")
+    schema_editor.execute(
+        "ALTER TABLE django_admin_log ADD CONSTRAINT "
+        "django_admin_log_user_id_users_user_id FOREIGN KEY (user_id) "
+        "REFERENCES users_user (id) DEFERRABLE INITIALLY DEFERRED"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_user_manager"),
+        ("admin", "0003_logentry_add_action_flag_choices"),
+    ]
+
+    operations = [
+        migrations.RunPython(repoint_admin_log, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,37 @@
-from django.contrib.auth.models import AbstractUser, Group, Permission
+from django.contrib.auth.models import (AbstractUser, BaseUserManager, Group,
+                                        Permission)
 from django.db import models
 
 NULLABLE = {"null": True, "blank": True}
 
 
+class UserManager(BaseUserManager):
+    """Менеджер пользователей с email вместо имени пользователя."""
+
+    use_in_migrations = True
+
+    def _create_user(self, email, password, **extra_fields):
+        """Создает и сохраняет пользователя с указанными email и паролем."""
+        if not email:
+            raise ValueError("Необходимо указать email.")
+        user = self.model(email=self.normalize_email(email), **extra_fields)
+        user.set_password(password)
+        user.save(using=self._db)
+        return user
+
+    def create_user(self, email, password=None, **extra_fields):
+        """Создает обычного пользователя."""
+        extra_fields.setdefault("is_staff", False)
+        extra_fields.setdefault("is_superuser", False)
+        return self._create_user(email, password, **extra_fields)
+
+    def create_superuser(self, email, password=None, **extra_fields):
+        """Создает суперпользователя."""
+        extra_fields.setdefault("is_staff", True)
+        extra_fields.setdefault("is_superuser", True)
+        return self._create_user(email, password, **extra_fields)
+
+
 class User(AbstractUser):
     """Модель пользователя, наследующаяся от AbstractUser.
 
@@ -35,6 +63,9 @@ class User(AbstractUser):
     REQUIRED_FIELDS = []
     """Список обязательных полей для создания пользователя."""
 
+    objects = UserManager()
+    """Менеджер, создающий пользователей по email."""
+
     # Переопределяем поля groups и user_permissions
     groups = models.ManyToManyField(
         Group,
@@ -1,3 +1,11 @@
+from importlib import import_module
+from unittest import skipUnless
+
+from django.apps import apps
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
@@ -8,14 +16,15 @@ from users.models import User
 class UserTestCase(APITestCase):
     """Тесты для модели пользователя (User )."""
 
-    def setUp(self):
-        """Предварительная настройка для тестов.
+    @classmethod
+    def setUpTestData(cls):
+        """Создает тестового пользователя один раз для всех тестов класса."""
+        cls.user = User.objects.create(email="test@example.com")
+        cls.user.set_password("test")
+        cls.user.save()
 
-        Создает тестового пользователя и аутентифицирует его для последующих запросов.
-        """
-        self.user = User.objects.create(email="test@example.com")
-        self.user.set_password("test")
-        self.user.save()
+    def setUp(self):
+        """Аутентифицирует тестового пользователя для последующих запросов."""
         self.client = APIClient()
         self.client.force_authenticate(user=self.user)
 
@@ -27,7 +36,8 @@ class UserTestCase(APITestCase):
         """
         url = reverse("users:user-register")
         data = {"email": "user@example.com", "password": "1password1"}
-        response = self.client.post(url, data)
+        with self.assertNumQueries(3):
+            response = self.client.post(url, data)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(User.objects.all().count(), 2)
 
@@ -39,6 +49,93 @@ class UserTestCase(APITestCase):
         """
         url = reverse("users:token_obtain_pair")
         data = {"email": "test@example.com", "password": "test"}
-        response = self.client.post(url, data)
+        with self.assertNumQueries(1):
+            response = self.client.post(url, data)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(bool(response.json().get("access")), True)
+
+
+@skipUnless(
+    connection.vendor == "postgresql", "Миграция выполняется только на PostgreSQL."
+)
+class AdminLogMigrationTestCase(TestCase):
+    """Тесты для перевода существующей базы на модель users.User."""
+
+    def setUp(self):
+        """Воссоздает базу, созданную до переключения AUTH_USER_MODEL:
+        таблицы auth_user и журнал админки с внешним ключом на auth_user."""
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE auth_user (
+                    id integer PRIMARY KEY, password varchar(128) NOT NULL,
+                    last_login timestamptz, is_superuser boolean NOT NULL,
+                    username varchar(150) NOT NULL, first_name varchar(150) NOT NULL,
+                    last_name varchar(150) NOT NULL, email varchar(254) NOT NULL,
+                    is_staff boolean NOT NULL, is_active boolean NOT NULL,
+                    date_joined timestamptz NOT NULL
+                );
+                CREATE TABLE auth_user_groups (
+                    id serial PRIMARY KEY, user_id integer NOT NULL,
+                    group_id integer NOT NULL
+                );
+                CREATE TABLE auth_user_user_permissions (
+                    id serial PRIMARY KEY, user_id integer NOT NULL,
+                    permission_id integer NOT NULL
+                );
+                INSERT INTO auth_user VALUES
+                    (500, 'hash', NULL, true, 'old', '', '', 'old@example.com',
+                     true, true, now()),
+                    (501, 'hash', NULL, false, 'noemail', '', '', '',
+                     true, true, now());
+                """)
+            for name in self.user_foreign_keys(cursor):
+                cursor.execute(f'ALTER TABLE django_admin_log DROP CONSTRAINT "{name}"')
+            cursor.execute(
+                "ALTER TABLE django_admin_log ADD CONSTRAINT admin_log_auth_user "
+                "FOREIGN KEY (user_id) REFERENCES auth_user (id)"
+            )
+            cursor.execute(
+                "INSERT INTO django_admin_log (action_time, user_id, object_repr, "
+                "action_flag, change_message) VALUES "
+                "(now(), 500, 'old', 1, ''), (now(), 501, 'noemail', 1, '')"
+            )
+        self.group = Group.objects.create(name="Менеджеры")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO auth_user_groups (user_id, group_id) VALUES (500, %s)",
+                [self.group.pk],
+            )
+
+    @staticmethod
+    def user_foreign_keys(cursor):
+        """Возвращает внешние ключи user_id журнала админки и их таблицы."""
+        constraints = connection.introspection.get_constraints(
+            cursor, "django_admin_log"
+        )
+        return {
+            name: constraint["foreign_key"][0]
+            for name, constraint in constraints.items()
+            if constraint["foreign_key"] and constraint["columns"] == ["user_id"]
+        }
+
+    def test_repoint_admin_log(self):
+        """Тест на перенос пользователей и журнала админки.
+
+        Проверяет, что пользователь auth_user с email переносится вместе
+        с группами, записи журнала переходят к нему, записи пользователя
+        без email удаляются, а внешний ключ указывает на users_user.
+        """
+        migration = import_module("users.migrations.0003_admin_log_user")
+        with connection.schema_editor() as schema_editor:
+            migration.repoint_admin_log(apps, schema_editor)
+        user = User.objects.get(email="old@example.com")
+        self.assertTrue(user.is_superuser)
+        self.assertEqual(list(user.groups.all()), [self.group])
+        self.assertEqual(
+            list(LogEntry.objects.values_list("user_id", "object_repr")),
+            [(user.pk, "old")],
+        )
+        with connection.cursor() as cursor:
+            self.assertEqual(
+                list(self.user_foreign_keys(cursor).values()), ["users_user"]
+            )